@@ -0,0 +1,498 @@
+"""Persistent AI analysis cache backends.
+
+Every store is a mapping of cache key -> strategy text that writes through to
+disk on assignment, so a new entry costs one small write instead of
+re-pickling the whole cache. 'sqlite' and 'log' are safe to share between
+gunicorn workers; 'pickle' is the original single-process format.
+"""
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process dev server, no cross-process locking
+    fcntl = None
+
+class SQLiteStore(MutableMapping):
+    """AI cache in a SQLite database (WAL mode): concurrent readers, atomic writes"""
+
+    def __init__(self, path, timeout=30):
+        self.path = str(path)
+        self.timeout = timeout
+        self._local = threading.local()
+        self._conn().execute(
+            'CREATE TABLE IF NOT EXISTS ai_cache ('
+            'key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)'
+        )
+
+    def _conn(self):
+        """One connection per thread (and per process, in case we were forked)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get_entry(self, key):
+        """(value, created timestamp) or None"""
+        return self._conn().execute(
+            'SELECT value, created FROM ai_cache WHERE key = ?', (key,)
+        ).fetchone()
+
+    def get_entries(self, keys):
+        """{key: (value, created)} for the keys that exist, one query per 500 keys"""
+        keys = list(keys)
+        found = {}
+        conn = self._conn()
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            rows = conn.execute(
+                f'SELECT key, value, created FROM ai_cache WHERE key IN ({",".join("?" * len(chunk))})', chunk
+            )
+            found.update((key, (value, created)) for key, value, created in rows)
+        return found
+
+    def __getitem__(self, key):
+        entry = self.get_entry(key)
+        if entry is None:
+            raise KeyError(key)
+        return entry[0]
+
+    def __contains__(self, key):
+        return self._conn().execute('SELECT 1 FROM ai_cache WHERE key = ?', (key,)).fetchone() is not None
+
+    def __setitem__(self, key, value):
+        self._conn().execute(
+            'INSERT OR REPLACE INTO ai_cache (key, value, created) VALUES (?, ?, ?)',
+            (key, value, time.time())
+        )
+
+    def __delitem__(self, key):
+        if self._conn().execute('DELETE FROM ai_cache WHERE key = ?', (key,)).rowcount == 0:
+            raise KeyError(key)
+
+    def __iter__(self):
+        return (row[0] for row in self._conn().execute('SELECT key FROM ai_cache').fetchall())
+
+    def __len__(self):
+        return self._conn().execute('SELECT COUNT(*) FROM ai_cache').fetchone()[0]
+
+    def update(self, other=(), **kwargs):
+        """Bulk insert in a single transaction"""
+        now = time.time()
+        items = dict(other, **kwargs)
+        conn = self._conn()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.executemany(
+                'INSERT OR REPLACE INTO ai_cache (key, value, created) VALUES (?, ?, ?)',
+                [(key, value, now) for key, value in items.items()]
+            )
+
+    def flush(self):
+        pass  # Every write is already committed
+
+class AppendLogStore(MutableMapping):
+    """AI cache as an append-only JSON-lines log with compaction.
+
+    Only key -> (offset, length) is held in memory; values are read from the
+    file on demand. Writers append whole lines under an exclusive flock, and
+    every read first indexes whatever other processes appended (or reopens
+    the file after a compaction swapped in a new one).
+    """
+
+    def __init__(self, path, compact_ratio=0.5, compact_min_bytes=1 << 20):
+        self.path = Path(path)
+        self.compact_ratio = compact_ratio
+        self.compact_min_bytes = compact_min_bytes
+        self._lock_path = self.path.with_name(self.path.name + '.lock')
+        self._lock = threading.RLock()
+        self._fd = None
+        self._open()
+
+    def _open(self):
+        if self._fd is not None:
+            os.close(self._fd)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644)
+        self._ino = os.fstat(self._fd).st_ino
+        self._index = {}  # key -> (offset, length, created)
+        self._scanned = 0  # bytes of the file already indexed
+        self._dead = 0  # bytes held by superseded or deleted records
+        self._catch_up()
+
+    def _catch_up(self):
+        """Index records appended since the last scan; reopen if the file was compacted"""
+        try:
+            replaced = os.stat(self.path).st_ino != self._ino
+        except FileNotFoundError:
+            replaced = True
+        if replaced:
+            self._open()
+            return
+
+        size = os.fstat(self._fd).st_size
+        if size <= self._scanned:
+            return
+        data = os.pread(self._fd, size - self._scanned, self._scanned)
+        offset = self._scanned
+        for line in data[:data.rfind(b'\n') + 1].splitlines(keepends=True):
+            self._apply(line, offset)
+            offset += len(line)
+        self._scanned = offset  # A trailing partial line is picked up once it is complete
+
+    def _apply(self, line, offset):
+        try:
+            record = json.loads(line)
+        except ValueError:  # Torn write from a crashed process
+            self._dead += len(line)
+            return
+        old = self._index.pop(record['k'], None)
+        if old is not None:
+            self._dead += old[1]
+        if record.get('d'):
+            self._dead += len(line)
+        else:
+            self._index[record['k']] = (offset, len(line), record['t'])
+
+    @contextmanager
+    def _exclusive(self):
+        """Cross-process write lock (a separate file, so it survives compaction)"""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            fd = os.open(self._lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                yield
+            finally:
+                os.close(fd)
+
+    def _append(self, record):
+        line = (json.dumps(record) + '\n').encode('utf-8')
+        with self._exclusive():
+            self._catch_up()
+            size = os.fstat(self._fd).st_size
+            if size != self._scanned:  # Skip over a torn tail left by a crash
+                self._dead += size - self._scanned
+                self._scanned = size
+            os.write(self._fd, line)
+            self._apply(line, self._scanned)
+            self._scanned += len(line)
+
+            if self._dead >= self.compact_min_bytes and self._dead >= self._scanned * self.compact_ratio:
+                self._compact_locked()
+
+    def compact(self):
+        """Rewrite the log with only live records"""
+        with self._exclusive():
+            self._catch_up()
+            self._compact_locked()
+
+    def _compact_locked(self):
+        tmp = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp, 'wb') as out:
+            for offset, length, _ in sorted(self._index.values()):
+                out.write(os.pread(self._fd, length, offset))
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp, self.path)
+        self._open()
+
+    def _lookup(self, key):
+        with self._lock:
+            self._catch_up()
+            entry = self._index.get(key)
+            if entry is None:
+                return None
+            offset, length, created = entry
+            return json.loads(os.pread(self._fd, length, offset))['v'], created
+
+    def get_entry(self, key):
+        """(value, created timestamp) or None"""
+        return self._lookup(key)
+
+    def get_entries(self, keys):
+        """{key: (value, created)} for the keys that exist (one catch-up for all of them)"""
+        found = {}
+        with self._lock:
+            self._catch_up()
+            for key in keys:
+                entry = self._index.get(key)
+                if entry is not None:
+                    offset, length, created = entry
+                    found[key] = (json.loads(os.pread(self._fd, length, offset))['v'], created)
+        return found
+
+    def __getitem__(self, key):
+        entry = self._lookup(key)
+        if entry is None:
+            raise KeyError(key)
+        return entry[0]
+
+    def __contains__(self, key):
+        with self._lock:
+            self._catch_up()
+            return key in self._index
+
+    def __setitem__(self, key, value):
+        self._append({'k': key, 'v': value, 't': time.time()})
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self._append({'k': key, 'd': 1})
+
+    def __iter__(self):
+        with self._lock:
+            self._catch_up()
+            return iter(list(self._index))
+
+    def __len__(self):
+        with self._lock:
+            self._catch_up()
+            return len(self._index)
+
+    def flush(self):
+        pass  # Every write is already appended
+
+class PickleStore(dict):
+    """The original format: one pickled dict, rewritten whole on every flush"""
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = Path(path)
+        if self.path.exists():
+            with open(self.path, 'rb') as f:
+                self.update(pickle.load(f))
+
+    def get_entry(self, key):
+        return (self[key], None) if key in self else None  # No timestamps in this format
+
+    def get_entries(self, keys):
+        return {key: (self[key], None) for key in keys if key in self}
+
+    def flush(self):
+        # Write to a temp file and swap it in so readers never see a partial pickle
+        tmp = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp, 'wb') as f:
+            pickle.dump(dict(self), f)
+        os.replace(tmp, self.path)
+        print(f"💾 AI cache saved ({len(self)} entries)")
+
+class AICache:
+    """Bounded, TTL- and version-aware front for a persistent store.
+
+    Keys are namespaced by a version hash (model + prompt templates + game
+    knowledge), so changing any of them starts a fresh namespace instead of
+    serving stale text. Recently used entries are kept in a size-bounded LRU;
+    those are re-checked against the store every `refresh` seconds so deletes
+    made by other workers are picked up. Entries older than `ttl` seconds
+    (when set) count as misses and are dropped.
+    """
+
+    def __init__(self, store, version, max_entries=1000, ttl=None, refresh=60):
+        self.store = store
+        self.version = version
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.refresh = refresh
+        self._memory = OrderedDict()  # key -> (value, created, loaded_at)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _store_key(self, key, version=None):
+        return f"{version or self.version}:{key}"
+
+    def _expired(self, created, now):
+        return bool(self.ttl) and created is not None and now - created > self.ttl
+
+    def _remember(self, key, value, created, now):
+        self._memory[key] = (value, created, now)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key, default=None):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and now - entry[2] < self.refresh and not self._expired(entry[1], now):
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self._memory.pop(key, None)
+
+        stored = self.store.get_entry(self._store_key(key))
+        if stored is not None and self._expired(stored[1], now):
+            self.store.pop(self._store_key(key), None)
+            self.expirations += 1
+            stored = None
+
+        with self._lock:
+            if stored is None:
+                self.misses += 1
+                return default
+            self._remember(key, stored[0], stored[1], now)
+            self.hits += 1
+        return stored[0]
+
+    def get_many(self, keys):
+        """{key: value} for the cached keys, with a single store lookup for the ones not in memory"""
+        now = time.time()
+        found = {}
+        missing = []
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                entry = self._memory.get(key)
+                if entry is not None and now - entry[2] < self.refresh and not self._expired(entry[1], now):
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    found[key] = entry[0]
+                else:
+                    self._memory.pop(key, None)
+                    missing.append(key)
+
+        stored = self.store.get_entries([self._store_key(key) for key in missing]) if missing else {}
+
+        expired = []
+        with self._lock:
+            for key in missing:
+                entry = stored.get(self._store_key(key))
+                if entry is not None and self._expired(entry[1], now):
+                    expired.append(key)
+                    entry = None
+                if entry is None:
+                    self.misses += 1
+                    continue
+                self._remember(key, entry[0], entry[1], now)
+                self.hits += 1
+                found[key] = entry[0]
+            self.expirations += len(expired)
+        for key in expired:
+            self.store.pop(self._store_key(key), None)
+        return found
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __setitem__(self, key, value):
+        self.store[self._store_key(key)] = value
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now, now)
+
+    def __delitem__(self, key):
+        with self._lock:
+            self._memory.pop(key, None)
+        del self.store[self._store_key(key)]
+
+    def keys(self):
+        """Keys in the current version"""
+        prefix = self._store_key('')
+        return [key[len(prefix):] for key in self.store if key.startswith(prefix)]
+
+    def __len__(self):
+        return len(self.keys())
+
+    def invalidate(self, match):
+        """Delete current-version entries whose key satisfies match(key); returns the count"""
+        removed = 0
+        for key in self.keys():
+            if match(key):
+                self.store.pop(self._store_key(key), None)
+                removed += 1
+        with self._lock:
+            for key in [key for key in self._memory if match(key)]:
+                del self._memory[key]
+        return removed
+
+    def import_legacy(self, legacy_file=None):
+        """Move unversioned entries (the original pickle's raw keys) into the current version; returns the count
+
+        They come from the store itself (the pickle backend's own file, or an
+        earlier import that kept the raw keys) and, while the store is still
+        empty, from legacy_file. Once moved they are not imported again, so a
+        later version change still starts from a fresh namespace.
+        """
+        entries = {key: self.store[key] for key in list(self.store) if ':' not in key}
+        if not entries and len(self.store) == 0 and legacy_file is not None and Path(legacy_file).exists():
+            with open(legacy_file, 'rb') as f:
+                entries = pickle.load(f)
+        for key, value in entries.items():
+            if self.store.get_entry(self._store_key(key)) is None:
+                self[key] = value
+            self.store.pop(key, None)
+        if entries:
+            self.flush()
+        return len(entries)
+
+    def purge_versions(self, version=None):
+        """Delete entries from one old version, or from every version but the current one"""
+        removed = 0
+        for key in list(self.store):
+            key_version = key.split(':', 1)[0] if ':' in key else None  # Unversioned legacy keys
+            if (key_version == version) if version else (key_version != self.version):
+                self.store.pop(key, None)
+                removed += 1
+        if version == self.version:
+            with self._lock:
+                self._memory.clear()
+        return removed
+
+    def flush(self):
+        flush = getattr(self.store, 'flush', None)
+        if flush is not None:
+            flush()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'version': self.version,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'memory_entries': len(self._memory),
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl
+        }
+
+AI_STORE_FILES = {
+    'sqlite': 'ai_cache.sqlite3',
+    'log': 'ai_cache.log',
+    'pickle': 'ai_cache.pkl'
+}
+
+def open_ai_store(backend, directory):
+    """Open the configured AI cache store (see AICache.import_legacy for the original pickle)"""
+    if backend not in AI_STORE_FILES:
+        raise ValueError(f"Unknown AI cache backend '{backend}' (expected one of {', '.join(AI_STORE_FILES)})")
+
+    path = Path(directory) / AI_STORE_FILES[backend]
+    if backend == 'pickle':
+        return PickleStore(path)
+
+    return SQLiteStore(path) if backend == 'sqlite' else AppendLogStore(path)
@@ -1,4 +1,5 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, has_request_context, request, jsonify, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 import pandas as pd
 import numpy as np
@@ -6,8 +7,37 @@ from anthropic import Anthropic
 from dotenv import load_dotenv
 import os
 import warnings
-import pickle
+import re
+import json
+import hashlib
+import math
+import difflib
+from functools import lru_cache, wraps
+import threading
+import time
+from itertools import islice
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
 from pathlib import Path
+try:
+    import fcntl
+except ImportError:  # Windows: single-process dev server, reloads are not coordinated
+    fcntl = None
+from search_index import FuzzyIndex, NgramIndex
+from ai_store import AICache, open_ai_store
+from snapshot import file_sha256, read_manifest, read_snapshot, write_snapshot
+from ng_scaling import TieredFrames
+from sheet_schema import SCHEMA_VERSION, immune_column, normalize_sheet, read_sheet
+from region_cube import RegionCube
+from http_cache import CachedResponse, ResponseCache, choose_encoding
+from coverage import CacheCoverage
+from metrics import PhaseTimer, Registry
+from matchup import describe as describe_matchup, score_matchup
+from fallback import fallback_strategy
+from circuit import CircuitBreaker
+from ratelimit import FileSlots, MemoryBuckets, RateLimited, RateLimiter, SQLiteBuckets, ThreadSlots
+from werkzeug.middleware.proxy_fix import ProxyFix
 
 # Load environment variables
 load_dotenv()
@@ -18,37 +48,226 @@ warnings.filterwarnings('ignore')
 app = Flask(__name__)
 CORS(app)
 
-# Initialize Claude
-anthropic_client = Anthropic(api_key=os.getenv('ANTHROPIC_API_KEY'))
+# Proxies in front of the app that set X-Forwarded-For (request.remote_addr identifies clients for rate limits).
+# Set it to the hosting platform's proxy depth (1 behind a single edge proxy). Off by default: trusting a header
+# no proxy of ours wrote would let clients pick their own address and dodge the limits
+PROXY_HOPS = int(os.getenv('PROXY_HOPS', 0))
+if PROXY_HOPS:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=PROXY_HOPS)
+
+# Initialize Claude (the SDK's own default timeout is 10 minutes)
+AI_REQUEST_TIMEOUT_SECONDS = float(os.getenv('AI_REQUEST_TIMEOUT_SECONDS', 30))
+AI_MAX_RETRIES = int(os.getenv('AI_MAX_RETRIES', 2))
+anthropic_client = Anthropic(api_key=os.getenv('ANTHROPIC_API_KEY'), timeout=AI_REQUEST_TIMEOUT_SECONDS, max_retries=AI_MAX_RETRIES)
 CLAUDE_MODEL = os.getenv('CLAUDE_MODEL', 'claude-sonnet-4-5-20250929')
 
-# Global data storage
-elden_data = {}
+# Background AI generation (cache misses never block a request thread)
+AI_WORKERS = int(os.getenv('AI_WORKERS', 4))
+AI_MAX_WAIT_SECONDS = 25  # Upper bound for long-polls, below gunicorn's 30s worker timeout
+# Open SSE streams per worker; each holds a gunicorn thread (GUNICORN_THREADS), so leave some for everything else
+SSE_MAX_STREAMS = int(os.getenv('SSE_MAX_STREAMS', 8))
+sse_streams = threading.BoundedSemaphore(SSE_MAX_STREAMS)
+ai_executor = ThreadPoolExecutor(max_workers=AI_WORKERS, thread_name_prefix='ai')
+ai_jobs = {}  # cache_key -> Future, one in-flight generation per key
+ai_failed = OrderedDict()  # cache_key -> Future of its last failed job, so pollers still get 'failed' + fallback
+AI_FAILED_MAX_ENTRIES = 1000
+ai_jobs_lock = threading.RLock()  # Re-entrant: a job that is already done runs its done-callback on registration
+ai_cache_lock = threading.Lock()  # Serializes cache writes + pickling
+ai_epochs = {}  # cache_key -> times a manual update or invalidate replaced it; older jobs' results are dropped
+
+# Past the deadline a waiting request gets the rule-based strategy (fallback.py) while Claude keeps going
+AI_DEADLINE_SECONDS = float(os.getenv('AI_DEADLINE_SECONDS', 8))  # 0 = wait for Claude
+# Consecutive API failures that open the circuit, and how long it stays open (see circuit.py)
+ai_breaker = CircuitBreaker(int(os.getenv('AI_BREAKER_FAILURES', 5)), float(os.getenv('AI_BREAKER_RESET_SECONDS', 30)))
+
+# Global data storage (the loaded workbook is `dataset`, see Dataset below)
 ai_cache = {}
 
 # Cache settings
 CACHE_DIR = Path('../data')  # Go up one level from backend/
-CACHE_FILE = CACHE_DIR / 'elden_cache.pkl'
+SNAPSHOT_DIR = CACHE_DIR / 'snapshot'  # Compiled columnar copy of DATA_FILE (see snapshot.py)
 DATA_FILE = CACHE_DIR / 'elden_ring_data.xlsx'
-AI_CACHE_FILE = CACHE_DIR / 'ai_cache.pkl'
+AI_CACHE_FILE = CACHE_DIR / 'ai_cache.pkl'  # Legacy format, imported into new stores
+AI_CACHE_BACKEND = os.getenv('AI_CACHE_BACKEND', 'sqlite')  # sqlite | log | pickle
+AI_CACHE_MAX_ENTRIES = int(os.getenv('AI_CACHE_MAX_ENTRIES', 1000))  # In-memory LRU bound
+AI_CACHE_TTL_SECONDS = float(os.getenv('AI_CACHE_TTL_SECONDS', 0)) or None  # 0 = never expire
+# 'location': one analysis per enemy instance; 'content': one per distinct stat profile
+AI_CACHE_MODE = os.getenv('AI_CACHE_MODE', 'location')
+# Append the deterministic matchup (see matchup.py) to enemy prompts
+AI_PROMPT_MATCHUP = os.getenv('AI_PROMPT_MATCHUP', '').lower() in ('1', 'true', 'yes')
+# Send the enemy prompt's shared head (instructions + knowledge base) as a system block for Anthropic's prompt cache
+AI_PROMPT_CACHING = os.getenv('AI_PROMPT_CACHING', '1').lower() in ('1', 'true', 'yes')
+# 'full': the whole knowledge base in every enemy prompt; 'relevant': general rules plus the lines about that enemy
+AI_PROMPT_KNOWLEDGE = os.getenv('AI_PROMPT_KNOWLEDGE', 'full')
 
-def load_elden_ring_data(force_reload=False):
-    """Load all NG tabs from Excel file with caching support"""
-    global elden_data
+# Rate limits (see ratelimit.py): per-client token buckets for every API request and, separately,
+# for requests that start a Claude generation; plus a cap on Anthropic calls in flight
+RATE_LIMIT_STORE = os.getenv('RATE_LIMIT_STORE', 'memory')  # memory | sqlite (shared by the workers of a host)
+RATE_LIMIT_BUDGETS = {
+    'requests': (float(os.getenv('RATE_LIMIT_RPS', 10)), float(os.getenv('RATE_LIMIT_BURST', 40))),
+    'ai': (float(os.getenv('RATE_LIMIT_AI_PER_MINUTE', 6)) / 60, float(os.getenv('RATE_LIMIT_AI_BURST', 10)))
+}
+AI_MAX_CONCURRENT = int(os.getenv('AI_MAX_CONCURRENT', AI_WORKERS))  # Per worker, or per host with the sqlite store
+AI_MAX_QUEUED = int(os.getenv('AI_MAX_QUEUED', 50))  # Generations waiting for a call slot before new ones get 429
+AI_QUEUE_RETRY_SECONDS = 10
+
+def create_rate_limiter():
+    if RATE_LIMIT_STORE == 'sqlite':
+        CACHE_DIR.mkdir(exist_ok=True)
+        return RateLimiter(SQLiteBuckets(CACHE_DIR / 'ratelimit.sqlite3'), RATE_LIMIT_BUDGETS)
+    return RateLimiter(MemoryBuckets(), RATE_LIMIT_BUDGETS)
+
+def create_ai_slots():
+    if RATE_LIMIT_STORE == 'sqlite' and fcntl is not None:
+        (CACHE_DIR / 'ai_slots').mkdir(parents=True, exist_ok=True)
+        return FileSlots(CACHE_DIR / 'ai_slots', AI_MAX_CONCURRENT, name='anthropic')
+    return ThreadSlots(AI_MAX_CONCURRENT)
+
+rate_limiter = create_rate_limiter()
+ai_slots = create_ai_slots()
+
+# HTTP caching for read endpoints (see cached_json)
+HTTP_CACHE_CONTROL = os.getenv('HTTP_CACHE_CONTROL', 'public, max-age=60')
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', 2048))
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv('RESPONSE_CACHE_TTL_SECONDS', 300)) or None  # Bounds staleness of AI fields written by other workers
+response_cache = ResponseCache(RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_TTL_SECONDS)
+
+# Metrics, served on /metrics (see metrics.py and the collectors next to the route)
+metrics = Registry()
+REQUESTS = metrics.counter('http_requests_total', 'HTTP requests by route template, method and status', ['route', 'method', 'status'])
+REQUEST_SECONDS = metrics.histogram('http_request_duration_seconds', 'Time to produce a response, by route template', ['route'])
+IN_FLIGHT = metrics.gauge('http_requests_in_flight', 'Requests being handled by this worker')
+STAGE_SECONDS = metrics.histogram('stage_duration_seconds', 'Time spent in one stage of a request (lookup, matchup, serialize, anthropic)', ['stage'])
+ANTHROPIC_REQUESTS = metrics.counter('anthropic_requests_total', 'Anthropic API calls by kind and outcome', ['kind', 'outcome'])
+ANTHROPIC_TOKENS = metrics.counter('anthropic_tokens_total', 'Tokens reported in message.usage', ['type'])
+AI_FALLBACKS = metrics.counter('ai_fallbacks_total', 'Rule-based strategies served instead of Claude', ['reason'])
+RATE_LIMITED = metrics.counter('rate_limited_total', 'Requests refused with 429, by budget', ['budget'])
+LOAD_SECONDS = metrics.histogram('dataset_load_phase_seconds', 'Time per dataset load phase (startup and reloads)', ['phase'])
+
+def timed(stage):
+    """Decorator: observe the duration of every call in STAGE_SECONDS"""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with STAGE_SECONDS.time(stage=stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """Flask's JSON provider, with serialization time recorded as the 'serialize' stage"""
+    def dumps(self, obj, **kwargs):
+        with STAGE_SECONDS.time(stage='serialize'):
+            return super().dumps(obj, **kwargs)
+
+app.json = TimedJSONProvider(app)
+
+NG_LEVELS = ['NG', 'NG+', 'NG+2', 'NG+3', 'NG+4', 'NG+5', 'NG+6', 'NG+7']
+# 'derived': NG+ tiers computed from the NG sheet + scaling factors (ng_scaling.py); 'sheets': keep all eight
+NG_TIER_MODE = os.getenv('NG_TIER_MODE', 'derived')
+SNAPSHOT_LAYOUT = f"{NG_TIER_MODE}/schema-{SCHEMA_VERSION}"  # Snapshots of another layout are recompiled
+
+# Dataset reloads (see reload_dataset / watch_dataset)
+DATASET_POLL_SECONDS = float(os.getenv('DATASET_POLL_SECONDS', 5))  # Follow snapshots published by other workers; 0 = off
+DATA_WATCH = os.getenv('DATA_WATCH', '').lower() in ('1', 'true', 'yes')  # Also reload when DATA_FILE changes
+RELOAD_LOCK_FILE = CACHE_DIR / 'reload.lock'  # One Excel parse per host, the other workers wait for its snapshot
+
+# Startup (see startup): 'eager' loads at import (works with gunicorn --preload), 'lazy' on the
+# first request in the background, 'manual' leaves it to the caller (scripts, gunicorn.conf.py)
+STARTUP_MODE = os.getenv('STARTUP_MODE', 'eager')
+STARTUP_WAIT_SECONDS = float(os.getenv('STARTUP_WAIT_SECONDS', 20))  # Lazy mode: how long a request waits before a 503
+
+class Dataset:
+    """One loaded copy of the workbook and every lookup structure derived from it.
+    
+    A reload builds a complete new Dataset off to the side and publishes it
+    with a single assignment to the module-level `dataset`; nothing in a
+    published Dataset is mutated (coverage is a cache filled in on first use),
+    so a request sees either the old data or the new data, never a mix.
+    """
+    __slots__ = ('frames', 'stores', 'indexes', 'cubes', 'version', 'generation', 'number', 'loaded_at', 'coverage')
+    
+    def __init__(self, frames, version=None, generation=None):
+        self.frames = frames        # NG level -> DataFrame (dict or TieredFrames)
+        self.stores = {}            # NG level -> EnemyStore
+        self.indexes = {}           # NG level -> {'name': NgramIndex, 'location': NgramIndex, 'fuzzy': FuzzyIndex}
+        self.cubes = {}             # NG level -> RegionCube (per-location aggregates for region stats)
+        self.version = version      # Source file + layout hash: same data, same version on every worker
+        self.generation = generation  # Snapshot generation it was loaded from / compiled into
+        self.number = 0             # Position in this process's reload sequence (set by publish_dataset)
+        self.loaded_at = time.time()
+        self.coverage = None        # CacheCoverage, built on first use
+        
+        base = base_indexes = None
+        for ng, df in frames.items():
+            store = EnemyStore(df)
+            if base is None:
+                base = store
+            else:
+                store.share_unchanged(base)  # NG+ tiers repeat most of NG: keep one copy
+            self.stores[ng] = store
+            
+            if store is not base and store.names is base.names and store.locations is base.locations:
+                self.indexes[ng] = base_indexes
+            else:
+                self.indexes[ng] = {
+                    'name': NgramIndex(store.names),
+                    'location': NgramIndex(store.locations),
+                    'fuzzy': build_fuzzy_index(store)
+                }
+                base_indexes = base_indexes or self.indexes[ng]
+            
+            self.cubes[ng] = build_region_cube(df, self.indexes[ng]['location'])
+    
+    def __len__(self):
+        return sum(len(store) for store in self.stores.values())  # Not frames: that would build every derived NG+ tier
+
+def build_fuzzy_index(store):
+    """Typo-tolerant index over an NG level's enemy names, regions and locations"""
+    return FuzzyIndex(
+        [(name, 'name') for name in store.names]
+        + [(region_of(location), 'region') for location in store.locations]
+        + [(location, 'location') for location in store.locations]
+    )
+
+dataset = Dataset({})  # Published dataset, empty until the first load
+
+def load_dataset(force_reload=False):
+    """Build a Dataset of all NG tabs, from the compiled snapshot when it matches the Excel file.
     
+    Returns None when nothing could be loaded; never touches the published dataset.
+    """
+    timer = PhaseTimer()
+    try:
+        return _build_dataset(force_reload, timer)
+    finally:
+        timer.observe(LOAD_SECONDS)
+        print(f"⏱️  Load phases: {timer}")
+
+def _build_dataset(force_reload, timer):
     # Create data directory if it doesn't exist
     CACHE_DIR.mkdir(exist_ok=True)
     
-    # Try to load from cache first (only if not forcing reload)
-    if not force_reload and CACHE_FILE.exists():
+    with timer.phase('source_hash'):
+        source_hash = file_sha256(DATA_FILE) if DATA_FILE.exists() else None
+    version = hashlib.sha256(f"{source_hash}:{SNAPSHOT_LAYOUT}".encode('utf-8')).hexdigest()[:12]
+    
+    # Try the snapshot first (only if not forcing reload); a hash mismatch means it is stale
+    if not force_reload:
         try:
-            print("📦 Loading from cache...")
-            with open(CACHE_FILE, 'rb') as f:
-                elden_data = pickle.load(f)
-            print(f"✅ Loaded {sum(len(df) for df in elden_data.values())} enemies from cache")
-            return  # Exit early if cache loaded successfully
+            with timer.phase('snapshot_read'):
+                snapshot = read_snapshot(SNAPSHOT_DIR, source_hash, layout=SNAPSHOT_LAYOUT)
+            if snapshot:
+                frames, manifest = snapshot
+                if NG_TIER_MODE == 'derived' and 'NG' in frames:
+                    frames = TieredFrames.from_snapshot(frames, manifest.get('extra') or {}, NG_LEVELS)
+                print(f"✅ Loaded {sum(len(df) for df in frames.values())} enemies from snapshot")
+                with timer.phase('lookup_tables'):
+                    return Dataset(frames, version, manifest['generation'])  # Exit early if snapshot loaded successfully
+            elif read_manifest(SNAPSHOT_DIR):
+                print("📦 Snapshot is stale (Excel file or layout changed), recompiling...")
         except Exception as e:
-            print(f"⚠️  Cache load failed: {e}")
+            print(f"⚠️  Snapshot load failed: {e}")
             print("📚 Falling back to Excel...")
     
     print("📚 Loading Elden Ring data from Excel...")
@@ -58,310 +277,521 @@ def load_elden_ring_data(force_reload=False):
         print(f"❌ ERROR: {DATA_FILE} not found!")
         print(f"   Current directory: {Path.cwd()}")
         print(f"   Looking for: {DATA_FILE.absolute()}")
-        return
+        return None
     
-    ng_levels = ['NG', 'NG+', 'NG+2', 'NG+3', 'NG+4', 'NG+5', 'NG+6', 'NG+7']
+    with timer.phase('excel_parse'):
+        workbook = pd.ExcelFile(DATA_FILE)
+    frames = {}
     
-    for ng in ng_levels:
+    for ng in NG_LEVELS:
         try:
-            df = None
-            # Try header rows 0,1,2 to handle files where column names start on row 2
-            for header_row in (1, 0, 2):  # Try 1 first (most common)
-                try:
-                    tmp = pd.read_excel(DATA_FILE, sheet_name=ng, header=header_row, dtype=object)
-                    tmp.columns = [str(c).strip() for c in tmp.columns]
-                    if 'Name' in tmp.columns:
-                        df = tmp
-                        if header_row != 0:
-                            print(f"   {ng}: Using header row {header_row}")
-                        break
-                except Exception:
-                    continue
+            with timer.phase('excel_parse'):
+                df = read_sheet(workbook, ng) if ng in workbook.sheet_names else None
             
             if df is None:
                 print(f"❌ Could not find 'Name' column in {ng}")
                 continue
             
-            # Drop rows without a name or placeholder rows
-            df = df[df['Name'].notna()]
-            df = df[df['Name'] != '???']
-            
-            # Robust HP handling - only use dlcClear if it's a valid number
-            df['HP'] = df.apply(lambda row: (
-                pd.to_numeric(row.get('dlcClear'), errors='coerce') 
-                if pd.notna(row.get('dlcClear')) and row.get('dlcClear') != '-' 
-                else pd.to_numeric(row.get('Health'), errors='coerce')
-            ), axis=1)
-            
-            # Fill remaining NaN with 0
-            df['HP'] = df['HP'].fillna(0)
+            # Typed columns + Immune/Infinite masks in one vectorized pass (see sheet_schema.py)
+            with timer.phase('normalize'):
+                df = normalize_sheet(df)
             
-            # Coerce numeric columns - including both Defense and Damage Negation
-            numeric_cols = [
-                # Defense columns (H-O) - keep for backend
-                'Phys','Strike','Slash','Pierce','Magic','Fire','Ltng','Holy',
-                # Damage Negation columns (Q-X) - pandas might add .1 suffix
-                'Phys.1','Strike.1','Slash.1','Pierce.1','Magic.1','Fire.1','Ltng.1','Holy.1',
-                # Poise
-                'Base','Effective','Regen Delay',
-                # Status multipliers
-                'Bleed.1','Frost.1','HP Burn Effect'
-            ]
-            for col in numeric_cols:
-                if col in df.columns:
-                    df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-            
-            # Ensure ID exists
-            if 'ID' not in df.columns:
-                df['ID'] = range(1, len(df) + 1)
-            
-            elden_data[ng] = df
+            frames[ng] = df
             print(f"✅ {ng}: {len(df)} enemies")
             
         except Exception as e:
             print(f"❌ Error loading {ng}: {e}")
     
-    # Save to cache
-    if elden_data:
+    if not frames:
+        return None
+    if NG_TIER_MODE == 'derived' and 'NG' in frames:
+        # Keep only the NG sheet; the other tiers become scaling factors checked for exact parity
+        with timer.phase('derive_tiers'):
+            frames = TieredFrames.from_frames(frames)
+        for ng in frames.tiers:
+            print(f"📐 {ng}: {frames.summary(ng)}")
+    
+    # Compile the snapshot for the next start (and for the other workers, see watch_dataset)
+    generation = None
+    try:
+        print("💾 Compiling snapshot...")
+        with timer.phase('snapshot_write'):
+            if isinstance(frames, TieredFrames):
+                manifest = write_snapshot(frames.stored_frames(), SNAPSHOT_DIR, source_hash,
+                                          layout=SNAPSHOT_LAYOUT, extra=frames.scaling_tables())
+            else:
+                manifest = write_snapshot(frames, SNAPSHOT_DIR, source_hash, layout=SNAPSHOT_LAYOUT)
+        generation = manifest['generation']
+        print(f"✅ Snapshot saved")
+    except Exception as e:
+        print(f"⚠️  Could not save snapshot: {e}")
+    
+    with timer.phase('lookup_tables'):
+        loaded = Dataset(frames, version, generation)
+    print(f"🎮 Total: {len(loaded)} enemies")
+    return loaded
+
+def publish_dataset(new):
+    """Make new the dataset every following request sees (one atomic assignment)"""
+    global dataset
+    new.number = dataset.number + 1
+    dataset = new
+    response_cache.clear()  # Serialized responses of the previous dataset
+    return new
+
+def load_elden_ring_data(force_reload=False):
+    """Load the dataset and publish it; keeps the current one if loading fails"""
+    loaded = load_dataset(force_reload)
+    if loaded is not None:
+        publish_dataset(loaded)
+    return dataset
+
+def current_dataset():
+    """The dataset this request started with (a reload mid-request never mixes versions)"""
+    if not has_request_context():
+        return dataset
+    if 'dataset' not in g:
+        g.dataset = dataset
+    return g.dataset
+
+reload_lock = threading.Lock()  # One reload at a time per process
+reload_status = {'running': False, 'started': None, 'finished': None, 'error': None}
+
+@contextmanager
+def _host_reload_lock():
+    """Exclusive flock shared by every worker: the first one compiles, the others then hit its snapshot"""
+    if fcntl is None:
+        yield
+        return
+    CACHE_DIR.mkdir(exist_ok=True)
+    with open(RELOAD_LOCK_FILE, 'a') as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+def _reload(force_reload):
+    """Body of a reload; the caller holds reload_lock"""
+    reload_status.update(running=True, started=time.time(), error=None)
+    try:
+        with _host_reload_lock():
+            loaded = load_dataset(force_reload)
+        if loaded is None:
+            reload_status['error'] = 'No data loaded'
+        else:
+            build_coverage(loaded)
+            publish_dataset(loaded)
+            print(f"🔄 Dataset {loaded.version} ({loaded.generation}) is now live (reload #{loaded.number})")
+    except Exception as e:
+        reload_status['error'] = str(e)
+        print(f"❌ Reload failed, still serving dataset {dataset.version}: {e}")
+    finally:
+        reload_status.update(running=False, finished=time.time())
+
+def reload_dataset(force_reload=False):
+    """Reload now in this thread (waits for a reload already running)"""
+    with reload_lock:
+        _reload(force_reload)
+    return dataset
+
+def start_reload(force_reload=False):
+    """Reload in a background thread while requests keep using the current dataset.
+    
+    Returns False if a reload is already running in this process.
+    """
+    if not reload_lock.acquire(blocking=False):
+        return False
+    reload_status['running'] = True
+    
+    def run():
         try:
-            print("💾 Saving to cache...")
-            with open(CACHE_FILE, 'wb') as f:
-                pickle.dump(elden_data, f)
-            print(f"✅ Cache saved")
-        except Exception as e:
-            print(f"⚠️  Could not save cache: {e}")
+            _reload(force_reload)
+        finally:
+            reload_lock.release()
     
-    print(f"🎮 Total: {sum(len(df) for df in elden_data.values())} enemies")
+    threading.Thread(target=run, name='dataset-reload', daemon=True).start()
+    return True
+
+def _file_state(path):
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+def watch_dataset(interval):
+    """Poll for new data and reload in the background when there is some.
+    
+    Follows snapshots published by other workers (a reload in one worker
+    rewrites the snapshot manifest; the others load that generation), and
+    with DATA_WATCH reloads when DATA_FILE changes, once it has stopped
+    changing for one interval (so a half-copied file is never parsed).
+    """
+    manifest_state = _file_state(SNAPSHOT_DIR / 'manifest.json')
+    data_state = seen_data_state = _file_state(DATA_FILE)
+    while True:
+        time.sleep(interval)
+        
+        state = _file_state(SNAPSHOT_DIR / 'manifest.json')
+        if state != manifest_state:
+            manifest_state = state
+            manifest = read_manifest(SNAPSHOT_DIR)
+            if (manifest and manifest.get('layout') == SNAPSHOT_LAYOUT
+                    and manifest['generation'] != dataset.generation):
+                print(f"🔄 New snapshot {manifest['generation']} published, reloading...")
+                start_reload()
+        
+        if DATA_WATCH:
+            state = _file_state(DATA_FILE)
+            if state != seen_data_state:
+                seen_data_state = state  # Still being written: wait for it to settle
+            elif state != data_state and state is not None:
+                data_state = state
+                print(f"🔄 {DATA_FILE.name} changed, reloading...")
+                start_reload()
+
+_watcher_pid = None
+
+def start_dataset_watcher():
+    """Start watch_dataset in this process (call after forking; threads do not survive a fork)"""
+    global _watcher_pid
+    interval = DATASET_POLL_SECONDS
+    if interval <= 0 or _watcher_pid == os.getpid():
+        return
+    _watcher_pid = os.getpid()
+    threading.Thread(target=watch_dataset, args=(interval,), name='dataset-watch', daemon=True).start()
 
 def load_ai_cache():
-    """Load AI analysis cache from disk"""
-    if AI_CACHE_FILE.exists():
-        try:
-            with open(AI_CACHE_FILE, 'rb') as f:
-                cache = pickle.load(f)
-                print(f"🤖 Loaded {len(cache)} cached AI analyses")
-                return cache
-        except Exception as e:
-            print(f"⚠️  AI cache load failed: {e}")
+    """Open the persistent AI analysis cache (see ai_store.py)"""
+    CACHE_DIR.mkdir(exist_ok=True)
+    try:
+        store = open_ai_store(AI_CACHE_BACKEND, CACHE_DIR)
+        cache = AICache(store, ai_cache_version(), max_entries=AI_CACHE_MAX_ENTRIES, ttl=AI_CACHE_TTL_SECONDS)
+        imported = cache.import_legacy(AI_CACHE_FILE)
+        if imported:
+            print(f"📦 Imported {imported} AI analyses from {AI_CACHE_FILE.name} into version {cache.version}")
+        print(f"🤖 Loaded {len(cache)} cached AI analyses ({AI_CACHE_BACKEND}, version {cache.version})")
+        return cache
+    except Exception as e:
+        print(f"⚠️  AI cache load failed: {e}")
     return {}
 
 def save_ai_cache(cache):
-    """Save AI analysis cache to disk"""
+    """Persist the AI cache (write-through stores have nothing left to do)"""
+    flush = getattr(cache, 'flush', None)
+    if flush is None:
+        return
     try:
-        with open(AI_CACHE_FILE, 'wb') as f:
-            pickle.dump(cache, f)
-        print(f"💾 AI cache saved ({len(cache)} entries)")
+        flush()
     except Exception as e:
         print(f"⚠️  Could not save AI cache: {e}")
 
-def search_enemies(query, ng_level='NG'):
+startup_lock = threading.Lock()
+startup_done = threading.Event()  # Set once the startup attempt has finished (loaded or not)
+startup_state = {'mode': STARTUP_MODE, 'phase': 'pending', 'timings_ms': {}, 'error': None, 'finished': None}
+
+def is_ready():
+    """Readiness: startup finished and there is a dataset to serve (liveness is just answering)"""
+    return startup_done.is_set() and len(dataset.frames) > 0
+
+def startup():
+    """Load the dataset and the AI cache once per process, logging how long each phase took"""
+    global ai_cache
+    with startup_lock:
+        if startup_done.is_set():
+            return startup_state
+        timings = startup_state['timings_ms']
+        started = time.perf_counter()
+        try:
+            for phase, load in (('dataset', _startup_dataset), ('ai_cache', load_ai_cache)):
+                startup_state['phase'] = phase
+                phase_started = time.perf_counter()
+                result = load()
+                timings[phase] = round((time.perf_counter() - phase_started) * 1000, 1)
+                if phase == 'ai_cache':
+                    ai_cache = result
+                    build_coverage(dataset)
+            startup_state['phase'] = 'ready' if len(dataset.frames) else 'no data'
+        except Exception as e:
+            startup_state.update(phase='failed', error=str(e))
+            print(f"❌ Startup failed: {e}")
+        finally:
+            timings['total'] = round((time.perf_counter() - started) * 1000, 1)
+            startup_state['finished'] = time.time()
+            startup_done.set()
+        phases = ', '.join(f"{phase} {ms:.0f} ms" for phase, ms in timings.items())
+        print(f"⏱️  Startup ({STARTUP_MODE}, pid {os.getpid()}): {phases} -> {startup_state['phase']}")
+        return startup_state
+
+def _startup_dataset():
+    # Under the host lock: workers starting together parse the Excel file once and share its snapshot
+    with reload_lock, _host_reload_lock():
+        return load_elden_ring_data()
+
+def start_background_startup():
+    """Run startup() in a thread unless it has started already (lazy mode)"""
+    if startup_lock.locked() or startup_done.is_set():
+        return
+    threading.Thread(target=startup, name='startup', daemon=True).start()
+
+@timed('lookup')
+def search_enemies(query, ng_level='NG', limit=None):
     """Search for enemies by name - returns ALL instances with their locations and HP"""
-    if ng_level not in elden_data:
+    ds = current_dataset()
+    if ng_level not in ds.indexes:
         return []
     
-    df = elden_data[ng_level]
-    
-    # Case-insensitive search
-    mask = df['Name'].str.contains(query, case=False, na=False)
-    results = df[mask]
+    store = ds.stores[ng_level]
+    rows = ds.indexes[ng_level]['name'].search(query, limit)
     
-    # Return ALL matching enemies with their unique stats
-    enemies = []
-    for _, row in results.iterrows():
-        enemies.append({
-            'name': row['Name'],
-            'location': row['Location'],
-            'hp': int(row['HP']) if pd.notna(row['HP']) and row['HP'] > 0 else 0,
-            'id': row['ID']
-        })
-    
-    return enemies
+    # Best matches first (exact, prefix, word prefix, substring)
+    return [
+        {
+            'name': store.names[i],
+            'location': store.locations[i],
+            'hp': max(int(store.hp[i]), 0),
+            'id': store.ids[i]
+        }
+        for i in rows
+    ]
 
-def get_enemy_details(enemy_name, location=None, ng_level='NG'):
-    """Get full details for a specific enemy, optionally filtered by location"""
-    if ng_level not in elden_data:
-        return None
+SUGGEST_MAX_ITEMS = 20
+SEARCH_MAX_RESULTS = 1000  # Cap on ?limit= for /api/search and /api/region/<r>/enemies
+
+def limit_arg(default=None, maximum=SEARCH_MAX_RESULTS):
+    """?limit= clamped to 1..maximum (default when absent or not a number; None means no limit)"""
+    limit = request.args.get('limit', default, type=int)
+    return None if limit is None else max(1, min(limit, maximum))
+SUGGEST_KINDS = ('name', 'region', 'location')
+
+@timed('lookup')
+def suggest(query, ng_level='NG', limit=5, kinds=None):
+    """Typo-tolerant candidates for a query, best first: [{'text', 'kind', 'score'}]"""
+    ds = current_dataset()
+    if ng_level not in ds.indexes:
+        return []
+    return [
+        {'text': text, 'kind': kind, 'score': score}
+        for text, kind, score in ds.indexes[ng_level]['fuzzy'].search(query, limit, kinds)
+    ]
+
+# Column mappings (response field -> sheet column)
+DAMAGE_NEGATION_COLUMNS = {
+    # These are the actual damage negation % columns (Q-X in the sheet)
+    'physical': 'Phys.1', 'strike': 'Strike.1', 'slash': 'Slash.1', 'pierce': 'Pierce.1',
+    'magic': 'Magic.1', 'fire': 'Fire.1', 'lightning': 'Ltng.1', 'holy': 'Holy.1'
+}
+RESISTANCE_COLUMNS = {
+    'poison': 'Poison', 'scarlet_rot': 'Scarlet Rot', 'bleed': 'Bleed',
+    'frost': 'Frost', 'sleep': 'Sleep', 'madness': 'Madness', 'deathblight': 'Deathblight'
+}
+STATUS_MULTIPLIER_COLUMNS = {
+    'bleed': 'Bleed.1', 'frost': 'Frost.1', 'black_flame': 'HP Burn Effect'
+}
+
+class EnemyStore:
+    """Typed, array-backed enemy records for one NG level.
     
-    df = elden_data[ng_level]
+    Built once per load so requests never touch the DataFrame: every value is
+    coerced up front and lookups go through (name, location) / name indexes.
+    """
+    __slots__ = (
+        'names', 'locations', 'ids', 'hp', 'damage_negation', 'resistances', 'immune',
+        'poise_base', 'poise_effective', 'regen_delay', 'status_multipliers',
+        'weak_spots', 'by_key', 'by_name'
+    )
     
-    # Find matches by name
-    matches = df[df['Name'] == enemy_name]
+    def __init__(self, df):
+        n = len(df)
+        
+        def column(name, default):
+            return df[name].tolist() if name in df.columns else [default] * n
+        
+        def numbers(name, default):
+            """Float array of a (normalized) column, default for missing cells or columns"""
+            if name not in df.columns:
+                return np.full(n, default, dtype=np.float64)
+            return pd.to_numeric(df[name], errors='coerce').fillna(default).to_numpy(dtype=np.float64)
+        
+        def mask(name):
+            return df[name].to_numpy(dtype=bool) if name in df.columns else np.zeros(n, dtype=bool)
+        
+        self.names = df['Name'].tolist()
+        self.locations = column('Location', 'Unknown')
+        self.ids = column('ID', None)
+        self.hp = numbers('HP', 0).astype(np.int64)
+        
+        self.damage_negation = np.column_stack(
+            [numbers(col, 0) for col in DAMAGE_NEGATION_COLUMNS.values()]
+        ).reshape(n, len(DAMAGE_NEGATION_COLUMNS))
+        
+        # Resistances are ints, with 'Immune' kept as a separate mask (999999 = no data)
+        self.immune = np.column_stack(
+            [mask(immune_column(col)) for col in RESISTANCE_COLUMNS.values()]
+        ).reshape(n, len(RESISTANCE_COLUMNS))
+        self.resistances = np.column_stack(
+            [numbers(col, 999999) for col in RESISTANCE_COLUMNS.values()]
+        ).reshape(n, len(RESISTANCE_COLUMNS)).astype(np.int64)
+        self.resistances[self.immune] = 0
+        
+        self.poise_base = numbers('Base', 0).astype(np.int64)
+        self.poise_effective = numbers('Effective', 0).astype(np.int64)  # '∞' reads as 0, like the region averages
+        self.regen_delay = numbers('Regen Delay', 0)
+        
+        self.status_multipliers = np.column_stack(
+            [numbers(col, 1) for col in STATUS_MULTIPLIER_COLUMNS.values()]
+        ).reshape(n, len(STATUS_MULTIPLIER_COLUMNS))
+        
+        self.weak_spots = numbers('Weak Part', 0).astype(np.int64) != 0
+        
+        # Indexes: first row wins for duplicate (name, location) pairs, like the old iloc[0]
+        self.by_key = {}
+        self.by_name = {}
+        for i, (name, location) in enumerate(zip(self.names, self.locations)):
+            self.by_key.setdefault((name, location), i)
+            self.by_name.setdefault(name, []).append(i)
     
-    # If location specified, filter by location too
-    if location and len(matches) > 0:
-        location_matches = matches[matches['Location'] == location]
-        if len(location_matches) > 0:
-            matches = location_matches
+    def __len__(self):
+        return len(self.names)
     
-    if len(matches) == 0:
-        return None
+    def share_unchanged(self, other):
+        """Point every attribute equal to other's at other's copy"""
+        for attr in self.__slots__:
+            mine, theirs = getattr(self, attr), getattr(other, attr)
+            if isinstance(mine, np.ndarray):
+                same = mine.dtype == theirs.dtype and np.array_equal(mine, theirs)
+            else:
+                same = mine == theirs
+            if same:
+                setattr(self, attr, theirs)
     
-    # Take first match (or the location-specific one)
-    enemy = matches.iloc[0]
+    def find(self, name, location=None):
+        """Row index for an enemy, preferring the given location when it exists"""
+        rows = self.by_name.get(name)
+        if not rows:
+            return None
+        if location:
+            return self.by_key.get((name, location), rows[0])
+        return rows[0]
     
-    # Safe numeric extraction with defaults
-    def safe_int(value, default=0):
-        try:
-            if pd.isna(value) or value == '-':
-                return default
-            return int(float(value))
-        except:
-            return default
+    def details(self, i):
+        """Build the API response dict for row i"""
+        resistances = {}
+        for key, value, immune in zip(RESISTANCE_COLUMNS, self.resistances[i].tolist(), self.immune[i].tolist()):
+            resistances[key] = 'Immune' if immune else value
+        
+        name = self.names[i]
+        return {
+            'name': name,
+            'location': self.locations[i],
+            'hp': int(self.hp[i]),
+            'damage_negation': dict(zip(DAMAGE_NEGATION_COLUMNS, self.damage_negation[i].tolist())),
+            'resistances': resistances,
+            'poise': {
+                'base': int(self.poise_base[i]),
+                'effective': int(self.poise_effective[i]),
+                'regen_delay': float(self.regen_delay[i])
+            },
+            'status_multipliers': dict(zip(STATUS_MULTIPLIER_COLUMNS, self.status_multipliers[i].tolist())),
+            'has_weak_spots': bool(self.weak_spots[i]),
+            'all_instances': [
+                {'location': self.locations[j], 'hp': int(self.hp[j])}
+                for j in self.by_name[name]
+            ]
+        }
     
-    def safe_float(value, default=0.0):
-        try:
-            if pd.isna(value) or value == '-':
-                return default
-            return float(value)
-        except:
-            return default
-    
-    # Extract relevant data
-    details = {
-        'name': enemy['Name'],
-        'location': enemy.get('Location', 'Unknown'),
-        'hp': safe_int(enemy['HP']),
-        'damage_negation': {
-            # These are the actual damage negation % columns (Q-X in your sheet)
-            'physical': safe_float(enemy.get('Phys.1', 0)),      # Column Q
-            'strike': safe_float(enemy.get('Strike.1', 0)),      # Column R
-            'slash': safe_float(enemy.get('Slash.1', 0)),        # Column S
-            'pierce': safe_float(enemy.get('Pierce.1', 0)),      # Column T
-            'magic': safe_float(enemy.get('Magic.1', 0)),        # Column U
-            'fire': safe_float(enemy.get('Fire.1', 0)),          # Column V
-            'lightning': safe_float(enemy.get('Ltng.1', 0)),     # Column W
-            'holy': safe_float(enemy.get('Holy.1', 0))           # Column X
-        },
-        'resistances': {
-            'poison': _format_resistance(enemy.get('Poison', 999999)),
-            'scarlet_rot': _format_resistance(enemy.get('Scarlet Rot', 999999)),
-            'bleed': _format_resistance(enemy.get('Bleed', 999999)),
-            'frost': _format_resistance(enemy.get('Frost', 999999)),
-            'sleep': _format_resistance(enemy.get('Sleep', 999999)),
-            'madness': _format_resistance(enemy.get('Madness', 999999)),
-            'deathblight': _format_resistance(enemy.get('Deathblight', 999999))
-        },
-        'poise': {
-            'base': safe_int(enemy.get('Base', 0)),
-            'effective': _parse_poise(enemy.get('Effective', 0)),
-            'regen_delay': safe_float(enemy.get('Regen Delay', 0))
-        },
-        'status_multipliers': {
-            'bleed': safe_float(enemy.get('Bleed.1', 1)),
-            'frost': safe_float(enemy.get('Frost.1', 1)),
-            'black_flame': safe_float(enemy.get('HP Burn Effect', 1))
-        },
-        'has_weak_spots': bool(safe_int(enemy.get('Weak Part', 0))),
-        'all_instances': []  # Will add info about other instances
-    }
+    def key_fields(self, i):
+        """The part of details(i) that ai_cache_key reads, without the per-row cost of the rest"""
+        return {
+            'name': self.names[i],
+            'location': self.locations[i],
+            'damage_negation': dict(zip(DAMAGE_NEGATION_COLUMNS, self.damage_negation[i].tolist())),
+            'resistances': {
+                key: 'Immune' if immune else value
+                for key, value, immune in zip(RESISTANCE_COLUMNS, self.resistances[i].tolist(), self.immune[i].tolist())
+            },
+            'poise': {'base': int(self.poise_base[i])},
+            'has_weak_spots': bool(self.weak_spots[i])
+        }
+
+@timed('lookup')
+def get_enemy_details(enemy_name, location=None, ng_level='NG'):
+    """Get full details for a specific enemy, optionally filtered by location"""
+    store = current_dataset().stores.get(ng_level)
+    if store is None:
+        return None
     
-    # Add info about all instances of this enemy
-    all_enemy_instances = df[df['Name'] == enemy_name]
-    for _, instance in all_enemy_instances.iterrows():
-        details['all_instances'].append({
-            'location': instance.get('Location', 'Unknown'),
-            'hp': safe_int(instance['HP'])
-        })
+    i = store.find(enemy_name, location)
+    if i is None:
+        return None
     
-    return details
+    return store.details(i)
 
-def _format_resistance(value):
-    """Format resistance value (handle 'Immune')"""
-    if pd.isna(value):
-        return 999999
-    if str(value).lower() == 'immune':
-        return 'Immune'
-    try:
-        return int(value)
-    except:
-        return 999999
-
-def _parse_poise(value):
-    """Parse effective poise (handle ∞)"""
-    if pd.isna(value):
-        return 0
-    if str(value) == '∞' or str(value).lower() == 'inf':
-        return 999999
-    try:
-        return int(float(value))
-    except:
-        return 0
+def region_of(location):
+    """Region part of a location ('Limgrave - Mistwood Outskirts' -> 'Limgrave')"""
+    return location.split(' - ')[0].strip() if isinstance(location, str) else None
 
-def search_by_region(region, ng_level='NG'):
+@timed('lookup')
+def search_by_region(region, ng_level='NG', limit=None):
     """Get all enemies in a region"""
-    if ng_level not in elden_data:
+    ds = current_dataset()
+    if ng_level not in ds.indexes:
         return []
     
-    df = elden_data[ng_level]
-    
-    # Case-insensitive region search
-    mask = df['Location'].str.contains(region, case=False, na=False)
-    results = df[mask]
-    
-    enemies = []
-    for _, row in results.iterrows():
-        enemies.append({
-            'name': row['Name'],
-            'location': row['Location']
-        })
+    store = ds.stores[ng_level]
+    rows = ds.indexes[ng_level]['location'].search(region, limit)
     
-    return enemies
+    return [{'name': store.names[i], 'location': store.locations[i]} for i in rows]
 
+def build_region_cube(df, location_index):
+    """Per-location aggregates of the columns behind the region stats"""
+    columns = {}
+    for name in ['HP', *DAMAGE_NEGATION_COLUMNS.values(), *RESISTANCE_COLUMNS.values(),
+                 'Base', 'Effective', 'Regen Delay', *STATUS_MULTIPLIER_COLUMNS.values()]:
+        if name in df.columns:
+            columns[name] = pd.to_numeric(df[name], errors='coerce').to_numpy(dtype=np.float64)
+    return RegionCube(columns, location_index)
+
+@timed('lookup')
 def calculate_region_average(region, ng_level='NG'):
     """Calculate average stats for all enemies in a region (immune ignored)"""
-    if ng_level not in elden_data:
+    cube = current_dataset().cubes.get(ng_level)
+    if cube is None:
         return None
 
-    df = elden_data[ng_level]
-
-    # Filter by region
-    mask = df['Location'].str.contains(region, case=False, na=False)
-    region_df = df[mask]
-
-    if len(region_df) == 0:
+    # Merge the precomputed partials of every location containing the region name
+    groups = cube.match(region)
+    if cube.size(groups) == 0:
         return None
 
-    # Helper: safely average only numeric resistances (ignore immune/NaN)
-    def avg_resistance(column_name):
-        values = []
-        for val in region_df[column_name]:
-            if pd.isna(val) or str(val).strip().lower() == 'immune':
-                continue
-            try:
-                values.append(float(val))
-            except:
-                continue
-        return int(np.mean(values)) if values else None
+    def mean(col_name):
+        return cube.mean(col_name, groups) if col_name in cube.positions else None
+
+    # Immune / missing cells are NaN in the cube, so they never count
+    def avg_resistance(col_name):
+        value = mean(col_name)
+        return int(value) if value is not None else None
 
-    # Helper: safely average numeric columns
     def safe_avg(col_name):
-        if col_name in region_df.columns:
-            numeric_vals = pd.to_numeric(region_df[col_name], errors='coerce')
-            numeric_vals = numeric_vals.dropna()
-            return round(numeric_vals.mean(), 1) if len(numeric_vals) > 0 else 0
-        return 0
+        value = mean(col_name)
+        return round(value, 1) if value is not None else 0
+
+    hp = mean('HP')
+    hp_spread = cube.spread('HP', groups) if 'HP' in cube.positions else None
 
     # Calculate averages
     avg_stats = {
         'region': region,
-        'enemy_count': len(region_df),
-        'avg_hp': int(region_df['HP'].mean()) if region_df['HP'].notna().any() else 0,
-
-        'avg_damage_negation': {
-            k: safe_avg(col)
-            for k, col in {
-                'physical': 'Phys.1', 'strike': 'Strike.1', 'slash': 'Slash.1', 'pierce': 'Pierce.1',
-                'magic': 'Magic.1', 'fire': 'Fire.1', 'lightning': 'Ltng.1', 'holy': 'Holy.1'
-            }.items()
-        },
+        'enemy_count': cube.size(groups),
+        'avg_hp': int(hp) if hp is not None else 0,
+        'hp_range': {
+            'min': int(hp_spread[0]), 'max': int(hp_spread[1]), 'median': int(hp_spread[2])
+        } if hp_spread else None,
 
-        'avg_resistances': {
-            k: avg_resistance(col)
-            for k, col in {
-                'poison': 'Poison', 'scarlet_rot': 'Scarlet Rot', 'bleed': 'Bleed',
-                'frost': 'Frost', 'sleep': 'Sleep', 'madness': 'Madness', 'deathblight': 'Deathblight'
-            }.items()
-        },
+        'avg_damage_negation': {k: safe_avg(col) for k, col in DAMAGE_NEGATION_COLUMNS.items()},
+
+        'avg_resistances': {k: avg_resistance(col) for k, col in RESISTANCE_COLUMNS.items()},
 
         'avg_poise': {
             'base': safe_avg('Base'),
@@ -370,11 +800,7 @@ def calculate_region_average(region, ng_level='NG'):
         },
 
         # Include status multipliers (optional but useful)
-        'avg_status_multipliers': {
-            'bleed': safe_avg('Bleed.1'),
-            'frost': safe_avg('Frost.1'),
-            'black_flame': safe_avg('HP Burn Effect')
-        }
+        'avg_status_multipliers': {k: safe_avg(col) for k, col in STATUS_MULTIPLIER_COLUMNS.items()}
     }
 
     return avg_stats
@@ -439,51 +865,31 @@ Special knowladge:
 - "Guard-counters" tend to do even more poise damage than charged heavy attacks.
 """
 
-def analyze_with_ai(enemy_data, context="enemy"):
-    """Use Claude AI to generate strategy recommendations with caching"""
-    
-    # Create cache key - USE NAME ONLY for enemies (stats are identical, only HP differs)
-    if context == "enemy":
-        cache_key = f"enemy_{enemy_data['name']}_{enemy_data['location']}"
-    else:  # region
-        cache_key = f"region_{enemy_data['region']}"
-    
-    # Check cache first
-    if cache_key in ai_cache:
-        print(f"✅ Using cached AI analysis for: {cache_key}")
-        return ai_cache[cache_key]
-    
-    print(f"Generating NEW AI analysis for: {cache_key}")
-    
-    # If not in cache, generate new analysis
-    try:
-        if context == "enemy":
-            prompt = f"""You are an expert Elden Ring strategy guide. Analyze this enemy and provide tactical combat advice.
+# Prompt templates (str.format); part of the AI cache version, see ai_cache_version()
+ENEMY_PROMPT_TEMPLATE = """You are an expert Elden Ring strategy guide. Analyze this enemy and provide tactical combat advice.
 
-{GAME_KNOWLEDGE}
+{knowledge}
 
-Enemy: {enemy_data['name']}
-HP: {enemy_data['hp']:,}
-Location: {enemy_data['location']}
+{identity}
 
 Damage Negation (LOWER is better for player, NEGATIVE means weakness):
-- Physical: {enemy_data['damage_negation']['physical']}%
-- Strike: {enemy_data['damage_negation']['strike']}%
-- Slash: {enemy_data['damage_negation']['slash']}%
-- Pierce: {enemy_data['damage_negation']['pierce']}%
-- Magic: {enemy_data['damage_negation']['magic']}%
-- Fire: {enemy_data['damage_negation']['fire']}%
-- Lightning: {enemy_data['damage_negation']['lightning']}%
-- Holy: {enemy_data['damage_negation']['holy']}%
+- Physical: {enemy_data[damage_negation][physical]}%
+- Strike: {enemy_data[damage_negation][strike]}%
+- Slash: {enemy_data[damage_negation][slash]}%
+- Pierce: {enemy_data[damage_negation][pierce]}%
+- Magic: {enemy_data[damage_negation][magic]}%
+- Fire: {enemy_data[damage_negation][fire]}%
+- Lightning: {enemy_data[damage_negation][lightning]}%
+- Holy: {enemy_data[damage_negation][holy]}%
 
 Status Resistances (LOWER is better for player):
-- Poison: {enemy_data['resistances']['poison']}
-- Bleed: {enemy_data['resistances']['bleed']}
-- Frost: {enemy_data['resistances']['frost']}
-- Sleep: {enemy_data['resistances']['sleep']}
+- Poison: {enemy_data[resistances][poison]}
+- Bleed: {enemy_data[resistances][bleed]}
+- Frost: {enemy_data[resistances][frost]}
+- Sleep: {enemy_data[resistances][sleep]}
 
-Poise: {enemy_data['poise']['base']} (higher = harder to stagger)
-Has Weak Spots: {enemy_data['has_weak_spots']}
+Poise: {enemy_data[poise][base]} (higher = harder to stagger)
+Has Weak Spots: {enemy_data[has_weak_spots]}
 
 Provide:
 1. **Best Damage Types:** List top 2-3 damage types (lowest/most negative negation values)
@@ -492,22 +898,21 @@ Provide:
 
 Keep response under 150 words, focused and actionable."""
 
-        else:  # region
-            prompt = f"""Analyze this Elden Ring region and provide general strategy:
+REGION_PROMPT_TEMPLATE = """Analyze this Elden Ring region and provide general strategy:
 
-Region: {enemy_data['region']}
-Enemy Count: {enemy_data['enemy_count']}
-Average HP: {enemy_data['avg_hp']:,}
+Region: {enemy_data[region]}
+Enemy Count: {enemy_data[enemy_count]}
+Average HP: {enemy_data[avg_hp]:,}
 
 Average Damage Negation:
-- Physical: {enemy_data['avg_damage_negation']['physical']}%
-- Strike: {enemy_data['avg_damage_negation']['strike']}%
-- Slash: {enemy_data['avg_damage_negation']['slash']}%
-- Pierce: {enemy_data['avg_damage_negation']['pierce']}%
-- Magic: {enemy_data['avg_damage_negation']['magic']}%
-- Fire: {enemy_data['avg_damage_negation']['fire']}%
-- Lightning: {enemy_data['avg_damage_negation']['lightning']}%
-- Holy: {enemy_data['avg_damage_negation']['holy']}%
+- Physical: {enemy_data[avg_damage_negation][physical]}%
+- Strike: {enemy_data[avg_damage_negation][strike]}%
+- Slash: {enemy_data[avg_damage_negation][slash]}%
+- Pierce: {enemy_data[avg_damage_negation][pierce]}%
+- Magic: {enemy_data[avg_damage_negation][magic]}%
+- Fire: {enemy_data[avg_damage_negation][fire]}%
+- Lightning: {enemy_data[avg_damage_negation][lightning]}%
+- Holy: {enemy_data[avg_damage_negation][holy]}%
 
 Provide:
 1. Best general damage types for this region
@@ -516,33 +921,601 @@ Provide:
 
 Keep it brief (3-4 sentences)."""
 
-        message = anthropic_client.messages.create(
-            model=CLAUDE_MODEL,
-            max_tokens=500,
-            messages=[{"role": "user", "content": prompt}]
+# Who the enemy is: the full instance, or (content mode) only what the stats can't say
+ENEMY_IDENTITY_TEMPLATE = """Enemy: {enemy_data[name]}
+HP: {enemy_data[hp]:,}
+Location: {enemy_data[location]}"""
+PROFILE_NAMED_IDENTITY_TEMPLATE = "Enemy: {enemy_data[name]}"
+PROFILE_IDENTITY = "Enemy: (stat profile shared by several enemies - base the advice on these stats alone)"
+
+AI_MAX_TOKENS = 500
+
+def ai_cache_version():
+    """Hash of everything that shapes an analysis, so changing any of it invalidates old entries"""
+    digest = hashlib.sha256()
+    for part in (CLAUDE_MODEL, str(AI_MAX_TOKENS), ENEMY_PROMPT_TEMPLATE, REGION_PROMPT_TEMPLATE,
+                 ENEMY_IDENTITY_TEMPLATE, PROFILE_NAMED_IDENTITY_TEMPLATE, PROFILE_IDENTITY, GAME_KNOWLEDGE):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    if AI_PROMPT_MATCHUP:  # Only when on, so existing entries stay valid without it
+        digest.update(MATCHUP_PROMPT_TEMPLATE.encode('utf-8'))
+    if AI_PROMPT_KNOWLEDGE == 'relevant':  # Same: AI_PROMPT_CACHING only moves text, it doesn't change it
+        digest.update(b'knowledge=relevant')
+    return digest.hexdigest()[:12]
+
+KNOWLEDGE_STOPWORDS = {
+    'the', 'when', 'some', 'both', 'always', 'once', 'heavy', 'despite', 'all', 'if', 'oil',
+    'fire', 'lightning', 'strike', 'slash', 'pierce', 'holy', 'magic', 'frost', 'frostbite',
+    'scarlet', 'rot', 'guard', 'healing', 'nomadic', 'merchant', 'caelid', 'highway', 'north',
+    'liurnia', 'lakes', 'agheel', 'lake', 'etc', 'extremely', 'ancient', 'spell', 'item',
+    'lord', 'blood', 'king', 'fell', 'omen', 'halberd'
+}
+
+def _singular(word):
+    """'trolls' -> 'troll', "margit's" -> 'margit' (good enough for matching names)"""
+    if word.endswith("'s"):
+        return word[:-2]
+    if word.endswith('s') and not word.endswith('ss') and len(word) > 3:
+        return word[:-1]
+    return word
+
+def _knowledge_terms(line):
+    """Enemy names/types a knowledge line talks about: quoted phrases plus capitalized words"""
+    terms = {phrase.lower() for phrase in re.findall(r'"([^"]+)"', line)}
+    for word in re.findall(r"[A-Z][a-z']+", re.sub(r'"[^"]+"', ' ', line)):
+        word = word.lower()
+        if len(word) >= 4 and word not in KNOWLEDGE_STOPWORDS:
+            terms.add(word)
+    return {_singular(term) for term in terms} - KNOWLEDGE_STOPWORDS
+
+def _parse_knowledge(knowledge):
+    """(line, terms) for the enemy-specific sections of the knowledge base"""
+    rules = []
+    section = None
+    for line in knowledge.splitlines():
+        line = line.strip()
+        if line.endswith(':') and not line.startswith('-'):
+            section = line
+        elif line.startswith('-') and section in ('Combat Tips:', 'Special knowladge:'):
+            rules.append((line, _knowledge_terms(line)))
+    return rules
+
+KNOWLEDGE_RULES = _parse_knowledge(GAME_KNOWLEDGE)
+
+@lru_cache(maxsize=4096)
+def relevant_knowledge(enemy_name):
+    """Knowledge-base lines that mention this enemy by name or type"""
+    name = str(enemy_name).lower()
+    words = {_singular(word) for word in re.findall(r"[a-z']+", name)}
+    return tuple(
+        line for line, terms in KNOWLEDGE_RULES
+        if any((term in name) if ' ' in term else (term in words) for term in terms)
+    )
+
+# Enemy-specific lines (they name an enemy or type); the rest applies to every enemy
+SPECIFIC_KNOWLEDGE = {line for line, terms in KNOWLEDGE_RULES if terms}
+
+def prompt_knowledge(enemy_name):
+    """Knowledge base for an enemy prompt (AI_PROMPT_KNOWLEDGE=relevant drops lines about other enemies)"""
+    return _knowledge_about(enemy_name) if AI_PROMPT_KNOWLEDGE == 'relevant' else GAME_KNOWLEDGE
+
+@lru_cache(maxsize=4096)
+def _knowledge_about(enemy_name):
+    keep = set(relevant_knowledge(enemy_name))
+    return '\n'.join(
+        line for line in GAME_KNOWLEDGE.split('\n')
+        if line.strip() not in SPECIFIC_KNOWLEDGE or line.strip() in keep
+    )
+
+def enemy_profile(enemy_data):
+    """Normalized stat payload sent to Claude in content mode (name only when knowledge is name-specific)"""
+    profile = {
+        'damage_negation': enemy_data['damage_negation'],
+        'resistances': {k: enemy_data['resistances'][k] for k in ('poison', 'bleed', 'frost', 'sleep')},
+        'poise': enemy_data['poise']['base'],
+        'has_weak_spots': enemy_data['has_weak_spots']
+    }
+    if relevant_knowledge(enemy_data['name']):
+        profile['name'] = enemy_data['name']
+    return profile
+
+PROMPT_STATUSES = ('poison', 'bleed', 'frost', 'sleep')  # The resistances the enemy prompt shows
+
+MATCHUP_PROMPT_TEMPLATE = """
+
+Computed matchup (from the stats above): {matchup}"""
+
+def enemy_matchup(enemy_data):
+    """Matchup of one enemy from its details, using only fields that enemy_profile covers"""
+    resistances = [enemy_data['resistances'][k] for k in PROMPT_STATUSES]
+    return score_matchup(
+        np.array([[enemy_data['damage_negation'][k] for k in DAMAGE_NEGATION_COLUMNS]]),
+        np.ones(1),  # A single enemy: HP does not change the ranking
+        np.array([[0 if value == 'Immune' else value for value in resistances]], dtype=np.int64),
+        np.array([[value == 'Immune' for value in resistances]]),
+        list(DAMAGE_NEGATION_COLUMNS), PROMPT_STATUSES
+    )
+
+def ai_cache_key(enemy_data, context="enemy"):
+    """Cache key for an enemy or region analysis"""
+    # Content mode: enemies with the same prompt payload share one analysis
+    if context == "enemy" and AI_CACHE_MODE == 'content':
+        payload = json.dumps(enemy_profile(enemy_data), sort_keys=True)
+        return f"profile_{hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]}"
+    if context == "enemy":
+        return f"enemy_{enemy_data['name']}_{enemy_data['location']}"
+    else:  # region
+        return f"region_{enemy_data['region']}"
+
+def enemy_cache_keys(enemy_name, location=None, ng_levels=NG_LEVELS):
+    """AI cache keys of an enemy's rows (every location, or only the given one) at the given NG levels"""
+    ds = current_dataset()
+    keys = []
+    for ng in ng_levels:
+        store = ds.stores.get(ng)
+        if store is None:
+            continue
+        rows = store.by_name.get(enemy_name, [])
+        keys.extend(
+            ai_cache_key(store.details(i), context="enemy")
+            for i in rows if not location or store.locations[i] == location
         )
-        
+    return list(dict.fromkeys(keys))  # By name, every NG level shares a key
+
+# The enemy prompt splits where the per-enemy part starts; the head is the same for every enemy
+ENEMY_PROMPT_HEAD, ENEMY_PROMPT_TAIL = ENEMY_PROMPT_TEMPLATE.split('{identity}')
+
+def build_ai_prompt(enemy_data, context="enemy"):
+    """Build the Claude prompt for an enemy or region: (cacheable system text or None, user text)"""
+    if context == "enemy":
+        if AI_CACHE_MODE == 'content':
+            profile = enemy_profile(enemy_data)
+            identity = PROFILE_NAMED_IDENTITY_TEMPLATE.format(enemy_data=profile) if 'name' in profile else PROFILE_IDENTITY
+        else:
+            identity = ENEMY_IDENTITY_TEMPLATE.format(enemy_data=enemy_data)
+        head = ENEMY_PROMPT_HEAD.format(knowledge=prompt_knowledge(enemy_data['name']))
+        prompt = identity + ENEMY_PROMPT_TAIL.format(enemy_data=enemy_data)
+        if AI_PROMPT_MATCHUP:
+            prompt += MATCHUP_PROMPT_TEMPLATE.format(matchup=describe_matchup(enemy_matchup(enemy_data)))
+        if not AI_PROMPT_CACHING:
+            return None, head + prompt
+        return head.rstrip(), prompt
+    else:  # region
+        return None, REGION_PROMPT_TEMPLATE.format(enemy_data=enemy_data)
+
+def ai_request_params(prompt):
+    """Messages API parameters for a build_ai_prompt result (shared by live, streaming and batch calls)"""
+    system, content = prompt
+    params = {
+        'model': CLAUDE_MODEL,
+        'max_tokens': AI_MAX_TOKENS,
+        'messages': [{"role": "user", "content": content}]
+    }
+    if system:
+        # Cache breakpoint after the shared head; Anthropic only caches prefixes of 1024+ tokens
+        params['system'] = [{'type': 'text', 'text': system, 'cache_control': {'type': 'ephemeral'}}]
+    return params
+
+def record_usage(usage):
+    """Count the tokens of a response's message.usage"""
+    for field in ('input_tokens', 'output_tokens', 'cache_creation_input_tokens', 'cache_read_input_tokens'):
+        tokens = getattr(usage, field, None)
+        if tokens:
+            ANTHROPIC_TOKENS.inc(tokens, type=field[:-len('_tokens')])
+
+def token_usage():
+    """Tokens counted by record_usage in this worker, with what prompt caching saved"""
+    tokens = {labels[0]: value for _, labels, _, value in ANTHROPIC_TOKENS.samples()}
+    uncached = tokens.get('input', 0)
+    written = tokens.get('cache_creation_input', 0)
+    read = tokens.get('cache_read_input', 0)
+    prompt_tokens = uncached + written + read
+    # Input price multipliers: cache writes cost 1.25x, cache reads 0.1x
+    billed = uncached + 1.25 * written + 0.1 * read
+    return {
+        'input_tokens': uncached,
+        'cache_creation_input_tokens': written,
+        'cache_read_input_tokens': read,
+        'output_tokens': tokens.get('output', 0),
+        'prompt_tokens': prompt_tokens,
+        'cache_read_share': round(read / prompt_tokens, 3) if prompt_tokens else None,
+        'input_cost_saved': round(1 - billed / prompt_tokens, 3) if prompt_tokens else None
+    }
+
+def _run_ai_job(cache_key, prompt, epoch, trial=False):
+    """Worker-thread body: call Claude and store the result (None on failure)"""
+    with ai_slots.hold():
+        return _call_ai(cache_key, prompt, epoch, trial)
+
+def _call_ai(cache_key, prompt, epoch, trial=False):
+    # A half-open trial was admitted when it was queued; anything else re-checks in case it opened meanwhile
+    if not trial and not ai_breaker.allow():
+        ANTHROPIC_REQUESTS.inc(kind='create', outcome='short_circuit')
+        return None
+    try:
+        with STAGE_SECONDS.time(stage='anthropic'):
+            message = anthropic_client.messages.create(**ai_request_params(prompt))
+        record_usage(message.usage)
         response_text = message.content[0].text
+    except Exception as e:
+        ai_breaker.record_failure()
+        ANTHROPIC_REQUESTS.inc(kind='create', outcome='error')
+        print(f"❌ AI Error: {e}")
+        return None  # _retire_failed_job moves the job to ai_failed
+    ai_breaker.record_success()
+    ANTHROPIC_REQUESTS.inc(kind='create', outcome='ok')
+    
+    _store_ai_result(cache_key, response_text, epoch)
+    return response_text
+
+COVERAGE_RESYNC_SECONDS = 60  # Pick up analyses cached by other workers
+
+def build_coverage(ds):
+    """Attach the cache coverage of a dataset (at startup and reload, so /api/cache/stats never pays for it)"""
+    rows = [
+        (ng, store.names[i], region_of(store.locations[i]), ai_cache_key(store.key_fields(i), context="enemy"))
+        for ng, store in ds.stores.items() for i in range(len(store))
+    ]
+    ds.coverage = CacheCoverage(rows, ai_cache.keys())
+    return ds.coverage
+
+def get_coverage():
+    """Cache coverage of the loaded dataset (see coverage.py)"""
+    ds = current_dataset()
+    current = ds.coverage
+    if current is None:
+        current = build_coverage(ds)
+    elif time.time() - current.synced_at > COVERAGE_RESYNC_SECONDS:
+        current.sync(ai_cache.keys())
+    return current
+
+def bump_epochs(cache_keys):
+    """Mark the jobs in flight for these keys stale (the caller holds ai_cache_lock)"""
+    for cache_key in cache_keys:
+        ai_epochs[cache_key] = ai_epochs.get(cache_key, 0) + 1
+
+def _store_ai_result(cache_key, response_text, epoch):
+    """Save a finished analysis, then retire its job (pollers check the cache first).
+    
+    A job started before a manual update or invalidate of its key (an older
+    epoch) is retired without writing, so it can't overwrite or resurrect it.
+    """
+    with ai_cache_lock:
+        current = ai_epochs.get(cache_key, 0) == epoch
+        if current:
+            ai_cache[cache_key] = response_text
+            save_ai_cache(ai_cache)
+    if current:
+        response_cache.clear('ai')
+        if dataset.coverage is not None:
+            dataset.coverage.mark(cache_key)
+    with ai_jobs_lock:
+        ai_jobs.pop(cache_key, None)
+
+def _retire_failed_job(cache_key, future):
+    """Done-callback of every job: a failed one leaves ai_jobs (successes leave in _store_ai_result)"""
+    if not future.cancelled() and future.exception() is None and future.result() is not None:
+        return
+    with ai_jobs_lock:
+        if ai_jobs.get(cache_key) is future:
+            del ai_jobs[cache_key]
+            ai_failed[cache_key] = future
+            while len(ai_failed) > AI_FAILED_MAX_ENTRIES:
+                ai_failed.popitem(last=False)
+
+def _register_job(cache_key, future):
+    """Make future the in-flight job of cache_key (the caller holds ai_jobs_lock)"""
+    ai_failed.pop(cache_key, None)
+    ai_jobs[cache_key] = future
+    future.add_done_callback(lambda done: _retire_failed_job(cache_key, done))
+    return future
+
+def _track_job(future, enemy_data, context, reason='error'):
+    """Tag a job with its start and fallback, for get_ai_status when it runs late or fails"""
+    future.started = time.monotonic()
+    future.fallback = fallback_strategy(enemy_data, context)
+    future.reason = reason  # Why a failed job has no strategy: error | circuit_open | busy
+    return future
+
+def client_id():
+    """Who a request counts against for rate limits"""
+    return request.remote_addr or 'unknown'
+
+def admit_generation(cache_key):
+    """Raise RateLimited if a request may not start a generation for cache_key now.
+    
+    Free when the key is cached or already in flight; otherwise it costs one
+    token of the client's 'ai' budget, and nobody may start one while
+    AI_MAX_QUEUED generations are already waiting.
+    """
+    if not has_request_context() or ai_cache.get(cache_key) is not None:
+        return
+    future = ai_jobs.get(cache_key)
+    if future is not None and not future.done():
+        return
+    if ai_breaker.state != 'closed':
+        return  # Fails fast with the fallback (or is the one half-open trial), no call to budget
+    if sum(1 for job in list(ai_jobs.values()) if not job.done()) >= AI_MAX_QUEUED:
+        raise RateLimited('ai_queue', AI_QUEUE_RETRY_SECONDS)
+    rate_limiter.check('ai', client_id())
+
+def request_ai_analysis(enemy_data, context="enemy"):
+    """Return (cache_key, strategy); strategy is None while generation runs in the background.
+    
+    Concurrent misses for the same key share one in-flight Claude call. Raises
+    RateLimited when the request may not start a new one (see admit_generation).
+    """
+    cache_key = ai_cache_key(enemy_data, context)
+    
+    # Check cache first
+    strategy = ai_cache.get(cache_key)
+    if strategy is not None:
+        return cache_key, strategy
+    admit_generation(cache_key)
+    
+    with ai_jobs_lock:
+        strategy = ai_cache.get(cache_key)
+        if strategy is not None:  # Finished while we waited for the lock
+            return cache_key, strategy
         
-        # Save to cache
-        ai_cache[cache_key] = response_text
-        save_ai_cache(ai_cache)
-        
-        return response_text
-        
+        future = ai_jobs.get(cache_key)
+        if future is None or future.done():  # Nothing in flight, or a failed attempt to retry
+            if not ai_breaker.allow():
+                # Open, or half-open with the trial call taken: fail fast, the key is retried later
+                future = Future()
+                future.set_result(None)
+                _register_job(cache_key, _track_job(future, enemy_data, context, reason='circuit_open'))
+                return cache_key, None
+            trial = ai_breaker.state == 'half_open'  # allow() just handed us the trial call
+            prompt = build_ai_prompt(enemy_data, context)
+            future = ai_executor.submit(_run_ai_job, cache_key, prompt, ai_epochs.get(cache_key, 0), trial)
+            _register_job(cache_key, _track_job(future, enemy_data, context))
+    
+    return cache_key, None
+
+def get_ai_status(cache_key, wait=0):
+    """Return (status, strategy) for a cache key: ready, pending, fallback, failed or missing.
+    
+    With wait > 0, block up to that many seconds for a pending job (long-poll).
+    A job still running after AI_DEADLINE_SECONDS answers 'fallback' with the
+    rule-based strategy (Claude keeps going, poll again for 'ready'); a failed
+    one answers 'failed' with it.
+    """
+    strategy = ai_cache.get(cache_key)
+    if strategy is not None:
+        return 'ready', strategy
+    
+    future = ai_jobs.get(cache_key) or ai_failed.get(cache_key)
+    if future is None:
+        # The job may have finished between the two checks
+        strategy = ai_cache.get(cache_key)
+        if strategy is not None:
+            return 'ready', strategy
+        return 'missing', None
+    
+    timeout = min(wait, AI_MAX_WAIT_SECONDS)
+    if AI_DEADLINE_SECONDS:
+        until_deadline = future.started + AI_DEADLINE_SECONDS - time.monotonic()
+        if until_deadline > 0:
+            timeout = min(timeout, until_deadline)  # Answer at the deadline at the latest
+    try:
+        result = future.result(timeout=timeout)
+    except FutureTimeoutError:
+        if AI_DEADLINE_SECONDS and time.monotonic() - future.started >= AI_DEADLINE_SECONDS:
+            AI_FALLBACKS.inc(reason='deadline')
+            return 'fallback', future.fallback
+        return 'pending', None
+    
+    if result is None:
+        AI_FALLBACKS.inc(reason=future.reason)
+        return 'failed', future.fallback
+    return 'ready', result
+
+def analyze_with_ai(enemy_data, context="enemy"):
+    """Use Claude AI to generate strategy recommendations with caching (blocking up to the deadline)"""
+    cache_key, strategy = request_ai_analysis(enemy_data, context)
+    if strategy is not None:
+        return strategy
+    
+    status, strategy = get_ai_status(cache_key, AI_DEADLINE_SECONDS or AI_MAX_WAIT_SECONDS)
+    return strategy if strategy is not None else fallback_strategy(enemy_data, context)
+
+def _sse(event, data):
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def stream_ai_analysis(enemy_data, context="enemy"):
+    """Yield SSE events for an analysis: text deltas while Claude writes, then 'done'.
+    
+    Cached (or already in-flight) analyses are sent as a single 'done' event.
+    """
+    cache_key = ai_cache_key(enemy_data, context)
+    
+    strategy = ai_cache.get(cache_key)
+    if strategy is not None:
+        yield _sse('done', {'cache_key': cache_key, 'strategy': strategy, 'cached': True})
+        return
+    
+    # Register the stream as the in-flight job so other requests coalesce onto it
+    with ai_jobs_lock:
+        future = ai_jobs.get(cache_key)
+        owner = future is None or future.done()
+        if owner:
+            future = _register_job(cache_key, _track_job(Future(), enemy_data, context))
+            future.epoch = ai_epochs.get(cache_key, 0)
+    
+    if not owner:
+        status, strategy = get_ai_status(cache_key, AI_MAX_WAIT_SECONDS)
+        yield _sse('done' if status == 'ready' else status, {'cache_key': cache_key, 'strategy': strategy})
+        return
+    
+    response_text = None
+    try:
+        with ai_slots.hold(AI_MAX_WAIT_SECONDS) as acquired:
+            if acquired:
+                response_text = yield from _stream_claude(cache_key, future, enemy_data, context)
+            else:
+                future.reason = 'busy'
+                AI_FALLBACKS.inc(reason='busy')
+                yield _sse('error', {'cache_key': cache_key, 'strategy': future.fallback})
+    finally:
+        # Also runs when the client disconnects mid-stream (None marks the job failed)
+        future.set_result(response_text)
+
+def _stream_claude(cache_key, future, enemy_data, context):
+    """Body of stream_ai_analysis for the owner of a call slot; returns the strategy (None on failure)"""
+    if not ai_breaker.allow():
+        future.reason = 'circuit_open'
+        ANTHROPIC_REQUESTS.inc(kind='stream', outcome='short_circuit')
+        AI_FALLBACKS.inc(reason='circuit_open')
+        yield _sse('error', {'cache_key': cache_key, 'strategy': future.fallback})
+        return None
+    
+    started = time.perf_counter()
+    try:
+        with anthropic_client.messages.stream(**ai_request_params(build_ai_prompt(enemy_data, context))) as stream:
+            for text in stream.text_stream:
+                yield _sse('delta', {'text': text})
+            record_usage(stream.get_final_message().usage)
+            response_text = stream.get_final_text()
     except Exception as e:
+        ai_breaker.record_failure()
+        ANTHROPIC_REQUESTS.inc(kind='stream', outcome='error')
+        AI_FALLBACKS.inc(reason='error')
         print(f"❌ AI Error: {e}")
-        return "Strategy analysis unavailable. Check enemy weaknesses in the stats."
+        yield _sse('error', {'cache_key': cache_key, 'strategy': future.fallback})
+        return None
+    STAGE_SECONDS.observe(time.perf_counter() - started, stage='anthropic')
+    ai_breaker.record_success()
+    ANTHROPIC_REQUESTS.inc(kind='stream', outcome='ok')
+    
+    _store_ai_result(cache_key, response_text, future.epoch)
+    yield _sse('done', {'cache_key': cache_key, 'strategy': response_text, 'cached': False})
+    return response_text
+
+def _sse_response(events):
+    if not sse_streams.acquire(blocking=False):
+        events.close()
+        response = jsonify({'error': 'Too many open streams, poll /api/ai/status instead'})
+        response.headers['Retry-After'] = '5'
+        return response, 503
+    response = Response(stream_with_context(events), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # Don't let a proxy buffer the stream
+    })
+    response.call_on_close(sse_streams.release)  # Runs even if the client left before the first event
+    return response
+
+def _attach_ai_strategy(payload, context):
+    """Add ai_strategy/ai_status/ai_key to a response, waiting up to ?wait= seconds"""
+    wait = request.args.get('wait', 0, type=float)
+    
+    cache_key, strategy = request_ai_analysis(payload, context)
+    if strategy is not None:
+        status = 'ready'
+    else:
+        status, strategy = get_ai_status(cache_key, wait)
+    
+    payload['ai_strategy'] = strategy
+    payload['ai_status'] = status
+    payload['ai_key'] = cache_key
+    g.no_store = status != 'ready'  # A pending/failed strategy must not be cached anywhere
+    return payload
+
+def _send_cached(entry, cache_control):
+    """Response for a cached body: ETag, Cache-Control, compression and 304 handling"""
+    body, encoding = entry.payload(choose_encoding(request.accept_encodings))
+    response = Response(body, mimetype=entry.mimetype)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.headers['Cache-Control'] = cache_control
+    response.set_etag(entry.etag, weak=True)  # Weak: gzip/br variants share one validator
+    return response.make_conditional(request)
+
+def cached_json(*tags):
+    """Serve a JSON GET route through the response cache (keyed by route + args + dataset version).
+    
+    Entries tagged 'ai' embed AI strategies and are dropped whenever this
+    worker writes to the AI cache; everything is dropped when a new dataset is published.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            key = (request.path, tuple(sorted(request.args.items(multi=True))), current_dataset().version)
+            entry = response_cache.get(key)
+            if entry is None:
+                g.no_store = False
+                response = app.make_response(view(*args, **kwargs))
+                if response.status_code != 200 or response.mimetype != 'application/json':
+                    return response
+                entry = CachedResponse(response.get_data(), response.mimetype, tags)
+                if g.no_store:
+                    return _send_cached(entry, 'no-store')
+                response_cache.put(key, entry)
+            return _send_cached(entry, HTTP_CACHE_CONTROL)
+        return wrapper
+    return decorator
+
+@app.before_request
+def _start_request_timer():
+    g.request_started = time.perf_counter()
+    IN_FLIGHT.inc()
+
+@app.after_request
+def _record_request(response):
+    started = g.get('request_started')
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'  # Templates keep label cardinality bounded
+        REQUEST_SECONDS.observe(time.perf_counter() - started, route=route)
+        REQUESTS.inc(route=route, method=request.method, status=response.status_code)
+    return response
+
+@app.teardown_request
+def _finish_request(exc):
+    if g.pop('request_started', None) is not None:
+        IN_FLIGHT.dec()
+
+STARTUP_EXEMPT_PATHS = ('/', '/favicon.ico', '/api/health', '/api/health/ready', '/metrics')
+
+@app.before_request
+def _ensure_started():
+    """Per-process startup work: the dataset watcher, and in lazy mode loading the data"""
+    start_dataset_watcher()
+    if startup_done.is_set() or STARTUP_MODE != 'lazy':
+        return None
+    start_background_startup()
+    if request.path in STARTUP_EXEMPT_PATHS:
+        return None  # Probes answer right away
+    if not startup_done.wait(STARTUP_WAIT_SECONDS):
+        response = jsonify({'error': 'Server is starting up, try again shortly', 'phase': startup_state['phase']})
+        response.headers['Retry-After'] = '5'
+        return response, 503
+    return None
+
+@app.before_request
+def _rate_limit():
+    """Per-client request budget for the API (probes and metrics are exempt)"""
+    if request.path.startswith('/api/') and request.path not in STARTUP_EXEMPT_PATHS:
+        rate_limiter.check('requests', client_id())
+
+@app.errorhandler(RateLimited)
+def _too_many_requests(e):
+    RATE_LIMITED.inc(budget=e.budget)
+    response = jsonify({'error': 'Too many requests, slow down', 'budget': e.budget, 'retry_after': round(e.retry_after, 1)})
+    response.headers['Retry-After'] = str(max(1, math.ceil(e.retry_after)))
+    return response, 429
 
 @app.route('/api/debug/columns', methods=['GET'])
 def debug_columns():
     """Debug endpoint to see all column names"""
     ng_level = request.args.get('ng', 'NG')
     ng_level = ng_level.replace(' ', '+')
-    if ng_level not in elden_data:
+    frames = current_dataset().frames
+    if ng_level not in frames:
         return jsonify({'error': 'NG level not found'}), 404
     
-    df = elden_data[ng_level]
+    df = frames[ng_level]
     return jsonify({
         'ng_level': ng_level,
         'columns': list(df.columns),
@@ -553,8 +1526,9 @@ def debug_columns():
 @app.route('/')
 def index():
     """Simple landing page with API info"""
-    status = "✅ Loaded" if elden_data else "❌ Not loaded"
-    enemy_count = sum(len(df) for df in elden_data.values()) if elden_data else 0
+    ds = current_dataset()
+    status = "✅ Loaded" if ds.frames else "❌ Not loaded"
+    enemy_count = len(ds)
     
     return f"""
     <html>
@@ -574,7 +1548,7 @@ def index():
         <div class="status">
             <strong>Status:</strong> {status}<br>
             <strong>Enemies:</strong> {enemy_count:,}<br>
-            <strong>NG Levels:</strong> {len(elden_data)}
+            <strong>NG Levels:</strong> {len(ds.frames)}
         </div>
         
         <h2>📡 Endpoints:</h2>
@@ -593,8 +1567,8 @@ def index():
             <button type="submit" style="padding: 8px 16px; background: #4a9eff; border: none; color: #fff; cursor: pointer;">Search</button>
         </form>
         
-        <p><small>Cache: {'✅' if CACHE_FILE.exists() else '❌'} | 
-        Columns loaded: {len(elden_data['NG'].columns) if 'NG' in elden_data else 0}</small></p>
+        <p><small>Snapshot: {'✅' if (SNAPSHOT_DIR / 'manifest.json').exists() else '❌'} | 
+        Columns loaded: {len(ds.frames['NG'].columns) if 'NG' in ds.frames else 0}</small></p>
     </body>
     </html>
     """, 200
@@ -603,16 +1577,39 @@ def index():
 def favicon():
     return '', 204
 
+def _reload_info():
+    ds = current_dataset()
+    return {
+        'version': ds.version,
+        'generation': ds.generation,
+        'reload_number': ds.number,
+        'loaded_at': ds.loaded_at,
+        'enemies_loaded': len(ds),
+        'ng_levels': list(ds.frames.keys()),
+        'reload': dict(reload_status)
+    }
+
 @app.route('/api/reload', methods=['POST'])
 def reload_data():
-    """Force reload data from Excel (bypass cache)"""
-    load_elden_ring_data(force_reload=True)
-    return jsonify({
-        'status': 'reloaded',
-        'enemies_loaded': sum(len(df) for df in elden_data.values()),
-        'ng_levels': list(elden_data.keys())
-    })
+    """Force reload data from Excel (bypass cache) in the background; ?wait=1 blocks until it is live.
+    
+    Requests keep being served from the current dataset until the new one is
+    swapped in. Other workers pick it up from the snapshot (see watch_dataset).
+    """
+    if request.args.get('wait'):
+        reload_dataset(force_reload=True)
+        g.pop('dataset', None)  # Report the dataset that is live now
+        return jsonify({'status': 'reloaded', **_reload_info()})
+    started = start_reload(force_reload=True)
+    return jsonify({'status': 'reloading' if started else 'already_reloading', **_reload_info()}), 202
+
+@app.route('/api/reload', methods=['GET'])
+def reload_state():
+    """Version of the dataset being served and the state of the last reload"""
+    return jsonify(_reload_info())
+
 @app.route('/api/enemy/<path:enemy_name>', methods=['GET'])
+@cached_json('ai')
 def api_get_enemy(enemy_name):
     """Get full enemy details with AI analysis"""
     ng_level = request.args.get('ng', 'NG')
@@ -622,15 +1619,13 @@ def api_get_enemy(enemy_name):
     details = get_enemy_details(enemy_name, location, ng_level)
     
     if not details:
-        return jsonify({'error': 'Enemy not found'}), 404
-    
-    # Generate AI strategy
-    strategy = analyze_with_ai(details, context="enemy")
-    details['ai_strategy'] = strategy
+        return jsonify({'error': 'Enemy not found', 'did_you_mean': suggest(enemy_name, ng_level, kinds=('name',))}), 404
     
-    return jsonify(details)
+    # Stats go out immediately; a cold AI strategy is generated in the background
+    return jsonify(_attach_ai_strategy(details, context="enemy"))
 
 @app.route('/api/region/<region_name>', methods=['GET'])
+@cached_json('ai')
 def api_get_region(region_name):
     """Get region average stats with AI analysis"""
     ng_level = request.args.get('ng', 'NG')
@@ -639,153 +1634,534 @@ def api_get_region(region_name):
     avg_stats = calculate_region_average(region_name, ng_level)
     
     if not avg_stats:
-        return jsonify({'error': 'Region not found'}), 404
+        return jsonify({'error': 'Region not found', 'did_you_mean': suggest(region_name, ng_level, kinds=('region',))}), 404
     
-    # Generate AI strategy
-    strategy = analyze_with_ai(avg_stats, context="region")
-    avg_stats['ai_strategy'] = strategy
+    # Stats go out immediately; a cold AI strategy is generated in the background
+    return jsonify(_attach_ai_strategy(avg_stats, context="region"))
+
+@app.route('/api/stream/enemy/<path:enemy_name>', methods=['GET'])
+def api_stream_enemy(enemy_name):
+    """Stream the AI strategy for an enemy as Server-Sent Events"""
+    ng_level = request.args.get('ng', 'NG')
+    ng_level = ng_level.replace(' ', '+')
+    location = request.args.get('location', None)
     
-    return jsonify(avg_stats)
+    details = get_enemy_details(enemy_name, location, ng_level)
+    
+    if not details:
+        return jsonify({'error': 'Enemy not found', 'did_you_mean': suggest(enemy_name, ng_level, kinds=('name',))}), 404
+    
+    admit_generation(ai_cache_key(details, context="enemy"))
+    return _sse_response(stream_ai_analysis(details, context="enemy"))
+
+@app.route('/api/stream/region/<region_name>', methods=['GET'])
+def api_stream_region(region_name):
+    """Stream the AI strategy for a region as Server-Sent Events"""
+    ng_level = request.args.get('ng', 'NG')
+    ng_level = ng_level.replace(' ', '+')
+    
+    avg_stats = calculate_region_average(region_name, ng_level)
+    
+    if not avg_stats:
+        return jsonify({'error': 'Region not found', 'did_you_mean': suggest(region_name, ng_level, kinds=('region',))}), 404
+    
+    admit_generation(ai_cache_key(avg_stats, context="region"))
+    return _sse_response(stream_ai_analysis(avg_stats, context="region"))
+
+@app.route('/api/ai/status', methods=['GET'])
+def api_ai_status():
+    """Poll (or long-poll with ?wait=seconds) for a pending AI strategy"""
+    cache_key = request.args.get('key', '')
+    wait = request.args.get('wait', 0, type=float)
+    
+    status, strategy = get_ai_status(cache_key, wait)
+    if status == 'missing':
+        return jsonify({'error': 'No analysis requested for this key', 'cache_key': cache_key, 'status': status}), 404
+    
+    return jsonify({
+        'cache_key': cache_key,
+        'status': status,
+        'strategy': strategy
+    })
+
+@app.route('/api/ai/usage', methods=['GET'])
+def api_ai_usage():
+    """Anthropic token usage of this worker, including prompt cache reads and writes"""
+    return jsonify({
+        'prompt_caching': AI_PROMPT_CACHING,
+        'knowledge': AI_PROMPT_KNOWLEDGE,
+        **token_usage()
+    })
 
 @app.route('/api/region/<region_name>/enemies', methods=['GET'])
+@cached_json()
 def api_get_region_enemies(region_name):
     """Get list of all enemies in a region"""
     ng_level = request.args.get('ng', 'NG')
     ng_level = ng_level.replace(' ', '+')
+    limit = limit_arg()
     
-    enemies = search_by_region(region_name, ng_level)
+    enemies = search_by_region(region_name, ng_level, limit)
     
-    return jsonify({
+    response = {
         'region': region_name,
         'ng_level': ng_level,
         'count': len(enemies),
         'enemies': enemies
+    }
+    if not enemies:
+        response['did_you_mean'] = suggest(region_name, ng_level, kinds=('region',))
+    return jsonify(response)
+
+BULK_MAX_ITEMS = int(os.getenv('BULK_MAX_ITEMS', 200))
+BULK_AI_MODES = ('cached', 'defer', 'skip')
+
+def get_cached_strategies(keys):
+    """{cache_key: strategy} for the keys already in the AI cache, in one bulk lookup"""
+    if isinstance(ai_cache, AICache):
+        return ai_cache.get_many(keys)
+    return {key: ai_cache[key] for key in keys if ai_cache.get(key) is not None}
+
+def bulk_enemy_details(rows, ai_mode='cached'):
+    """Details for [(ng_level, store row)] with AI strategies resolved together.
+    
+    'cached' attaches only strategies that already exist, 'defer' also queues
+    generation for the rest (like /api/enemy does), 'skip' leaves AI out.
+    """
+    results = []
+    for ng_level, i in rows:
+        details = current_dataset().stores[ng_level].details(i)
+        details['ng_level'] = ng_level
+        results.append(details)
+    if ai_mode == 'skip':
+        return results
+    
+    keys = [ai_cache_key(details, context="enemy") for details in results]
+    cached = get_cached_strategies(keys)
+    for details, cache_key in zip(results, keys):
+        strategy = cached.get(cache_key)
+        if strategy is not None:
+            status = 'ready'
+        elif ai_mode == 'defer':
+            try:
+                cache_key, strategy = request_ai_analysis(details, context="enemy")
+                status = 'ready' if strategy is not None else 'pending'
+            except RateLimited:
+                status = 'rate_limited'  # The rest of the batch still gets its stats
+        else:
+            with ai_jobs_lock:
+                status = 'pending' if cache_key in ai_jobs else 'missing'
+        details['ai_strategy'] = strategy
+        details['ai_status'] = status
+        details['ai_key'] = cache_key
+    return results
+
+def _region_rows(region, ng_level, limit):
+    return [(ng_level, i) for i in current_dataset().indexes[ng_level]['location'].search(region, limit)]
+
+def _find_rows(items, default_ng):
+    """([(ng_level, store row)], [items not found]) for request items: names or {name, location, ng}"""
+    rows = []
+    not_found = []
+    for item in items:
+        item = item if isinstance(item, dict) else {'name': item}
+        ng_level = str(item.get('ng', default_ng)).replace(' ', '+')
+        store = current_dataset().stores.get(ng_level)
+        i = store.find(item.get('name'), item.get('location')) if store else None
+        if i is None:
+            not_found.append(item)
+        else:
+            rows.append((ng_level, i))
+    return rows, not_found
+
+def _bulk_response(rows, ai_mode, not_found=()):
+    if ai_mode not in BULK_AI_MODES:
+        return jsonify({'error': f"ai must be one of: {', '.join(BULK_AI_MODES)}"}), 400
+    
+    results = bulk_enemy_details(rows, ai_mode)
+    statuses = [details.get('ai_status') for details in results]
+    g.no_store = 'pending' in statuses
+    
+    return jsonify({
+        'count': len(results),
+        'results': results,
+        'not_found': list(not_found),
+        'ai': {status: statuses.count(status) for status in ('ready', 'pending', 'missing', 'rate_limited')} if ai_mode != 'skip' else None
     })
 
+@app.route('/api/enemies/bulk', methods=['GET'])
+@cached_json('ai')
+def api_bulk_region_enemies():
+    """Details of every enemy in a region in one call (?region=&ng=&ai=cached|defer|skip&limit=)"""
+    region = request.args.get('region', '')
+    ng_level = request.args.get('ng', 'NG')
+    ng_level = ng_level.replace(' ', '+')
+    ai_mode = request.args.get('ai', 'cached')
+    limit = limit_arg(BULK_MAX_ITEMS, BULK_MAX_ITEMS)
+    
+    if not region:
+        return jsonify({'error': 'Missing region'}), 400
+    if ng_level not in current_dataset().stores:
+        return jsonify({'error': 'NG level not found'}), 404
+    
+    return _bulk_response(_region_rows(region, ng_level, limit), ai_mode)
+
+@app.route('/api/enemies/bulk', methods=['POST'])
+def api_bulk_enemies():
+    """Details for many enemies in one call.
+    
+    Body: {"enemies": [{"name": ..., "location": ..., "ng": ...}, ...]} or
+    {"region": ..., "ng": ...}, plus optional "ai": cached | defer | skip.
+    """
+    data = request.get_json(silent=True) or {}
+    ai_mode = data.get('ai', 'cached')
+    
+    if data.get('region'):
+        ng_level = str(data.get('ng', 'NG')).replace(' ', '+')
+        if ng_level not in current_dataset().stores:
+            return jsonify({'error': 'NG level not found'}), 404
+        return _bulk_response(_region_rows(data['region'], ng_level, BULK_MAX_ITEMS), ai_mode)
+    
+    items = data.get('enemies')
+    if not isinstance(items, list) or not items:
+        return jsonify({'error': 'Provide a region or a list of enemies'}), 400
+    if len(items) > BULK_MAX_ITEMS:
+        return jsonify({'error': f'At most {BULK_MAX_ITEMS} enemies per request'}), 400
+    
+    rows, not_found = _find_rows(items, data.get('ng', 'NG'))
+    return _bulk_response(rows, ai_mode, not_found)
+
+@timed('matchup')
+def rows_matchup(rows):
+    """Ranked damage types and status effects for [(ng_level, store row)] (see matchup.py)"""
+    if not rows:
+        return None
+    ds = current_dataset()
+    groups = {}
+    for ng_level, i in rows:
+        groups.setdefault(ng_level, []).append(i)
+    parts = [(ds.stores[ng_level], np.asarray(indices, dtype=np.int64)) for ng_level, indices in groups.items()]
+    
+    def gather(attr):
+        return np.concatenate([getattr(store, attr)[indices] for store, indices in parts])
+    
+    multipliers = gather('status_multipliers')
+    proc = {name: multipliers[:, k] for k, name in enumerate(STATUS_MULTIPLIER_COLUMNS) if name in RESISTANCE_COLUMNS}
+    return score_matchup(
+        gather('damage_negation'), gather('hp'), gather('resistances'), gather('immune'),
+        list(DAMAGE_NEGATION_COLUMNS), list(RESISTANCE_COLUMNS), proc
+    )
+
+def _matchup_response(rows, scope, not_found=()):
+    result = rows_matchup(rows)
+    if result is None:
+        return jsonify({'error': 'No matching enemies', 'not_found': list(not_found)}), 404
+    return jsonify({'scope': scope, **result, 'not_found': list(not_found)})
+
+@app.route('/api/matchup', methods=['GET'])
+@cached_json()
+def api_matchup():
+    """Best damage types and status effects for a region (?region=), enemies (?enemy=, repeatable) or a whole NG level (?ng=)"""
+    ng_level = request.args.get('ng', 'NG').replace(' ', '+')
+    store = current_dataset().stores.get(ng_level)
+    if store is None:
+        return jsonify({'error': 'NG level not found'}), 404
+    
+    region = request.args.get('region')
+    names = request.args.getlist('enemy')
+    if region:
+        return _matchup_response(_region_rows(region, ng_level, len(store)), {'region': region, 'ng_level': ng_level})
+    if names:
+        location = request.args.get('location')
+        rows, not_found = [], []
+        for name in names:
+            i = store.find(name, location)
+            if i is None:
+                not_found.append({'name': name})
+            else:
+                rows.append((ng_level, i))
+        return _matchup_response(rows, {'enemies': names, 'ng_level': ng_level}, not_found)
+    return _matchup_response([(ng_level, i) for i in range(len(store))], {'ng_level': ng_level})
+
+@app.route('/api/matchup', methods=['POST'])
+def api_matchup_enemies():
+    """Matchup for a party of enemies.
+    
+    Body: {"enemies": [{"name": ..., "location": ..., "ng": ...}, ...], "ng": ...}
+    """
+    data = request.get_json(silent=True) or {}
+    items = data.get('enemies')
+    if not isinstance(items, list) or not items:
+        return jsonify({'error': 'Provide a list of enemies'}), 400
+    if len(items) > BULK_MAX_ITEMS:
+        return jsonify({'error': f'At most {BULK_MAX_ITEMS} enemies per request'}), 400
+    
+    rows, not_found = _find_rows(items, data.get('ng', 'NG'))
+    return _matchup_response(rows, {'enemies': len(items)}, not_found)
+
 @app.route('/api/search', methods=['GET'])
+@cached_json()
 def api_search():
     """Search for enemies by name"""
     query = request.args.get('q', '')
     ng_level = request.args.get('ng', 'NG')
     ng_level = ng_level.replace(' ', '+')
-    
-    # Debug: print what we're receiving
-    print(f"🔍 Search request: query='{query}', ng='{ng_level}'")
+    limit = limit_arg()
     
     if not query:
         return jsonify({'results': []})
     
     # Verify NG level exists
-    if ng_level not in elden_data:
-        print(f"⚠️  NG level '{ng_level}' not found in data. Available: {list(elden_data.keys())}")
+    frames = current_dataset().frames
+    if ng_level not in frames:
         return jsonify({'results': []})
     
-    results = search_enemies(query, ng_level)
+    results = search_enemies(query, ng_level, limit)
     
-    return jsonify({
+    response = {
         'query': query,
         'ng_level': ng_level,
         'results': results
+    }
+    if not results:
+        # Saves the client a region lookup, and offers close names/regions for typos
+        response['region_matches'] = len(current_dataset().indexes[ng_level]['location'].match(query))
+        response['did_you_mean'] = suggest(query, ng_level, kinds=('name', 'region'))
+    return jsonify(response)
+
+@app.route('/api/suggest', methods=['GET'])
+@cached_json()
+def api_suggest():
+    """Typo-tolerant candidates for search-as-you-type (?q=&ng=&limit=&kind=name|region|location, repeatable)"""
+    query = request.args.get('q', '')
+    ng_level = request.args.get('ng', 'NG').replace(' ', '+')
+    limit = limit_arg(5, SUGGEST_MAX_ITEMS)
+    kinds = request.args.getlist('kind') or None
+    
+    if kinds and not set(kinds) <= set(SUGGEST_KINDS):
+        return jsonify({'error': f"kind must be one of: {', '.join(SUGGEST_KINDS)}"}), 400
+    if ng_level not in current_dataset().indexes:
+        return jsonify({'error': 'NG level not found'}), 404
+    
+    return jsonify({
+        'query': query,
+        'ng_level': ng_level,
+        'suggestions': suggest(query, ng_level, limit, kinds) if query else []
     })
 
 @app.route('/api/health', methods=['GET'])
 def health():
-    """Health check"""
+    """Health check: liveness (always 200 while the process answers) plus readiness and startup state"""
+    ds = current_dataset()
     return jsonify({
         'status': 'healthy',
-        'data_loaded': len(elden_data) > 0,
-        'ng_levels': list(elden_data.keys()),
-        'total_enemies': sum(len(df) for df in elden_data.values())
+        'live': True,
+        'ready': is_ready(),
+        'startup': {**startup_state, 'timings_ms': dict(startup_state['timings_ms'])},
+        'data_loaded': len(ds.frames) > 0,
+        'ng_levels': list(ds.frames.keys()),
+        'total_enemies': len(ds),
+        'dataset_version': ds.version,
+        'reloading': reload_status['running'],
+        'ai_circuit': ai_breaker.snapshot()
     })
 
+@app.route('/api/health/ready', methods=['GET'])
+def health_ready():
+    """Readiness probe: 503 until the dataset is loaded"""
+    ready = is_ready()
+    return jsonify({'ready': ready, 'phase': startup_state['phase']}), 200 if ready else 503
+
+@metrics.collector
+def _collect_state():
+    """Values kept by other components, read at scrape time"""
+    ds = dataset
+    breaker = ai_breaker.snapshot()
+    families = [
+        ('dataset_info', 'gauge', 'Dataset being served (value is always 1)',
+         [({'version': ds.version or '', 'generation': ds.generation or '', 'mode': NG_TIER_MODE}, 1)]),
+        ('dataset_enemies', 'gauge', 'Enemy rows in the served dataset', [({}, len(ds))]),
+        ('dataset_reloads', 'gauge', 'Datasets published by this worker', [({}, ds.number)]),
+        ('startup_ready', 'gauge', '1 once startup finished with data', [({}, int(is_ready()))]),
+        ('startup_phase_seconds', 'gauge', 'Duration of each startup phase',
+         [({'phase': phase}, ms / 1000) for phase, ms in dict(startup_state['timings_ms']).items()]),
+        ('ai_jobs_in_flight', 'gauge', 'AI generations queued or running', [({}, sum(not job.done() for job in list(ai_jobs.values())))]),
+        ('anthropic_circuit_open', 'gauge', '1 while the Anthropic circuit breaker refuses calls',
+         [({}, int(breaker['state'] == 'open'))]),
+        ('anthropic_circuit_opened', 'gauge', 'Times the Anthropic circuit breaker opened', [({}, breaker['opened'])]),
+        ('response_cache_lookups_total', 'counter', 'Response cache lookups by result',
+         [({'result': 'hit'}, response_cache.hits), ({'result': 'miss'}, response_cache.misses)]),
+    ]
+    if isinstance(ai_cache, AICache):
+        families.append(('ai_cache_lookups_total', 'counter', 'AI cache lookups by result',
+                         [({'result': 'hit'}, ai_cache.hits), ({'result': 'miss'}, ai_cache.misses)]))
+        families.append(('ai_cache_entries', 'gauge', 'Analyses in the AI cache', [({}, len(ai_cache))]))
+    return families
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Prometheus text exposition of this worker's metrics"""
+    return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 @app.route('/api/cache/stats', methods=['GET'])
+@cached_json('ai')
 def cache_stats():
-    """Get AI cache statistics (unique enemy-based)"""
+    """Get AI cache statistics (unique enemy-based), per NG level and optionally per region (?regions=1)"""
     ng_level = request.args.get('ng', 'NG')
     ng_level = ng_level.replace(' ', '+')  # Prevent breakage if spaces are used
 
-    if ng_level not in elden_data:
+    if ng_level not in current_dataset().frames:
         return jsonify({'error': 'NG level not found'}), 404
 
-    # Get dataframe for this NG level
-    df = elden_data[ng_level]
-
-    # --- UNIQUE ENEMIES ---
-    unique_enemy_names = df['Name'].unique().tolist()
-    total_enemies = len(unique_enemy_names)
+    # Counters are kept up to date as analyses are cached, so this is a lookup
+    current = get_coverage()
+    stats = current.stats(ng_level)
+    stats['by_ng'] = current.by_ng()
+    if request.args.get('regions'):
+        stats['by_region'] = current.by_region(ng_level)
 
-    # --- CACHED UNIQUE ENEMIES ---
-    cached_names = set()
-
-    # We still use location-level cache keys, but only count name once if *any* variation is cached
-    for _, row in df.iterrows():
-        cache_key = f"enemy_{row['Name']}_{row['Location']}"
-        if cache_key in ai_cache:
-            cached_names.add(row['Name'])
-
-    cached_count = len(cached_names)
+    return jsonify(stats)
 
+def unknown_ng_level(ng_level):
+    """400 response for an NG level outside NG_LEVELS, with the closest valid ones"""
     return jsonify({
-        'total_enemies': total_enemies,
-        'cached_enemies': cached_count,
-        'percentage': round((cached_count / total_enemies * 100), 1) if total_enemies > 0 else 0
-    })
+        'error': f"Unknown NG level '{ng_level}' (expected one of {', '.join(NG_LEVELS)})",
+        'did_you_mean': difflib.get_close_matches(ng_level, NG_LEVELS, n=3, cutoff=0.3)
+    }), 400
 
 @app.route('/api/cache/update', methods=['POST'])
 def update_ai_cache():
-    """Manually update AI cache entry (admin function)"""
-    data = request.get_json()
+    """Manually update the AI cache entries of an enemy (admin function)"""
+    data = request.get_json(silent=True) or {}
     
     enemy_name = data.get('enemy_name')
     new_strategy = data.get('strategy')
     
     if not enemy_name or not new_strategy:
         return jsonify({'error': 'Missing enemy_name or strategy'}), 400
+    if not isinstance(enemy_name, str) or not isinstance(new_strategy, str):
+        return jsonify({'error': 'enemy_name and strategy must be strings'}), 400
     
-    # Create cache key (same format as analyze_with_ai)
-    cache_key = f"enemy_{enemy_name}"
+    # Same keys analyze_with_ai uses: every location (or the given one) at every NG level (or the given one)
+    ng_levels = NG_LEVELS
+    if data.get('ng') is not None:
+        ng_level = str(data['ng']).replace(' ', '+')
+        if ng_level not in NG_LEVELS:
+            return unknown_ng_level(ng_level)
+        ng_levels = [ng_level]
+    cache_keys = enemy_cache_keys(enemy_name, data.get('location'), ng_levels)
+    if not cache_keys:
+        return jsonify({'error': 'Enemy not found', 'did_you_mean': suggest(enemy_name, kinds=('name',))}), 404
     
     # Update cache
-    ai_cache[cache_key] = new_strategy
-    save_ai_cache(ai_cache)
+    with ai_cache_lock:
+        bump_epochs(cache_keys)  # A generation already running must not overwrite this
+        for cache_key in cache_keys:
+            ai_cache[cache_key] = new_strategy
+        save_ai_cache(ai_cache)
+    response_cache.clear('ai')
+    if dataset.coverage is not None:
+        for cache_key in cache_keys:
+            dataset.coverage.mark(cache_key)
     
-    print(f"✏️  Updated AI cache for: {cache_key}")
+    print(f"✏️  Updated AI cache for: {', '.join(cache_keys)}")
     
     return jsonify({
         'status': 'updated',
-        'cache_key': cache_key,
+        'cache_keys': cache_keys,
         'message': f'AI strategy updated for {enemy_name}'
     })
 
 @app.route('/api/cache/debug', methods=['GET'])
 def cache_debug():
     """Debug: Show what's in the AI cache"""
+    stats = ai_cache.stats() if isinstance(ai_cache, AICache) else {}
     return jsonify({
         'cache_size': len(ai_cache),
-        'sample_keys': list(ai_cache.keys())[:10]  # Show first 10 keys
+        'sample_keys': list(islice(ai_cache.keys(), 10)),  # Show first 10 keys
+        **stats,
+        'response_cache': response_cache.stats()
+    })
+
+@app.route('/api/cache/invalidate', methods=['POST'])
+def invalidate_ai_cache():
+    """Drop cached AI analyses by enemy, region or cache version (admin function)"""
+    data = request.get_json(silent=True) or {}
+    enemy_name = data.get('enemy')
+    location = data.get('location')  # Only with enemy: that one location
+    region = data.get('region')
+    version = data.get('version')  # 'stale' (all old versions), 'current', or a version hash
+    
+    if not isinstance(ai_cache, AICache):
+        return jsonify({'error': 'AI cache not loaded'}), 503
+    if not (enemy_name or region or version):
+        return jsonify({'error': 'Provide enemy, region or version'}), 400
+    if any(value is not None and not isinstance(value, str) for value in (enemy_name, location, region, version)):
+        return jsonify({'error': 'enemy, location, region and version must be strings'}), 400
+    
+    removed = 0
+    cache_keys = set(enemy_cache_keys(enemy_name, location)) if enemy_name else set()
+    with ai_cache_lock:
+        # Generations already running for these keys must not re-create them
+        bump_epochs(cache_keys | ({f"region_{region}"} if region else set()))
+        if version in ('current', ai_cache.version):
+            bump_epochs(list(ai_jobs))
+        if cache_keys:
+            removed += ai_cache.invalidate(lambda key: key in cache_keys)
+        if region:
+            removed += ai_cache.invalidate(lambda key: key == f"region_{region}")
+        if version == 'stale':
+            removed += ai_cache.purge_versions()
+        elif version == 'current':
+            removed += ai_cache.purge_versions(ai_cache.version)
+        elif version:
+            removed += ai_cache.purge_versions(version)
+        save_ai_cache(ai_cache)
+    response_cache.clear('ai')
+    if dataset.coverage is not None:
+        if version in ('current', ai_cache.version):
+            dataset.coverage.sync(ai_cache.keys())  # The whole namespace went
+        for cache_key in cache_keys:
+            dataset.coverage.unmark(cache_key)
+    
+    print(f"🗑️  Invalidated {removed} AI cache entries")
+    
+    return jsonify({
+        'status': 'invalidated',
+        'removed': removed,
+        'version': ai_cache.version
     })
 
 @app.route('/api/cache/view/<enemy_name>', methods=['GET'])
+@cached_json('ai')
 def view_ai_cache(enemy_name):
-    """View cached AI strategy for an enemy"""
-    cache_key = f"enemy_{enemy_name}"
+    """View cached AI strategy for an enemy (?location=, ?ng=)"""
+    ng_level = request.args.get('ng', 'NG').replace(' ', '+')
+    details = get_enemy_details(enemy_name, request.args.get('location'), ng_level)
+    if not details:
+        return jsonify({'error': 'Enemy not found', 'did_you_mean': suggest(enemy_name, ng_level, kinds=('name',))}), 404
+    cache_key = ai_cache_key(details, context="enemy")
     
-    if cache_key in ai_cache:
+    strategy = ai_cache.get(cache_key)
+    if strategy is not None:
         return jsonify({
             'enemy_name': enemy_name,
             'cache_key': cache_key,
-            'strategy': ai_cache[cache_key]
+            'strategy': strategy
         })
     else:
         return jsonify({'error': 'Not found in cache'}), 404
         
+if STARTUP_MODE == 'eager':
+    startup()  # At import: under gunicorn --preload this runs once in the master
+
 import os
 if __name__ == '__main__':
     # Load data on startup (uses cache if available)
-    load_elden_ring_data()
-    ai_cache = load_ai_cache() 
+    startup()
+    start_dataset_watcher()
     
-    if not elden_data:
+    if not dataset.frames:
         print("\n⚠️  WARNING: No data loaded!")
         print(f"   Looking for: {DATA_FILE.absolute()}")
     
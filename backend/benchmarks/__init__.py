@@ -0,0 +1,8 @@
+"""Benchmarks for the backend (run from backend/, e.g. python -m benchmarks.loader).
+
+    loader     dataset load phases          hotpaths   lookups and routes, per call
+    loadtest   concurrent HTTP load         compare    diff two --json result files
+
+Every suite runs on a synthetic workbook (synthetic.py) in a temporary
+directory, with a stubbed Anthropic client (stub.py) where AI is involved.
+"""
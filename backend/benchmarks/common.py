@@ -0,0 +1,121 @@
+"""Shared benchmark helpers: a sandboxed app, timing statistics and JSON results"""
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault('STARTUP_MODE', 'manual')  # Never load the real data/ workbook
+import app
+from benchmarks.synthetic import write_workbook
+
+RESULTS_FORMAT = 1
+
+@contextlib.contextmanager
+def quiet():
+    """Swallow the loader's per-sheet progress prints"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+@contextlib.contextmanager
+def sandbox(rows, seed=1, load=True):
+    """Point the app at a synthetic workbook and an empty AI cache in a temporary directory.
+
+    data/ is never read or written. With load=True the dataset and the AI
+    cache are loaded (quietly) before the block runs.
+    """
+    saved = {name: getattr(app, name) for name in
+             ('CACHE_DIR', 'DATA_FILE', 'SNAPSHOT_DIR', 'AI_CACHE_FILE', 'RELOAD_LOCK_FILE', 'DATASET_POLL_SECONDS',
+              'ai_cache', 'dataset', 'rate_limiter')}
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        app.CACHE_DIR = tmp
+        app.DATA_FILE = write_workbook(tmp / 'elden_ring_data.xlsx', rows, seed)
+        app.SNAPSHOT_DIR = tmp / 'snapshot'
+        app.AI_CACHE_FILE = tmp / 'ai_cache.pkl'
+        app.RELOAD_LOCK_FILE = tmp / 'reload.lock'
+        app.DATASET_POLL_SECONDS = 0  # No watcher thread: it would outlive the sandbox
+        app.rate_limiter = app.RateLimiter(app.MemoryBuckets(), {})  # Every benchmark client is 127.0.0.1
+        try:
+            if load:
+                with quiet():
+                    app.load_elden_ring_data()
+                    app.ai_cache = app.load_ai_cache()
+            yield tmp
+        finally:
+            for name, value in saved.items():
+                setattr(app, name, value)
+
+def summarize(samples_ms):
+    """Statistics of wall times in milliseconds"""
+    ordered = sorted(samples_ms)
+    def percentile(p):
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+    return {
+        'runs': len(ordered),
+        'median_ms': round(statistics.median(ordered), 4),
+        'mean_ms': round(statistics.fmean(ordered), 4),
+        'p95_ms': round(percentile(95), 4),
+        'p99_ms': round(percentile(99), 4),
+        'min_ms': round(ordered[0], 4),
+        'max_ms': round(ordered[-1], 4)
+    }
+
+def measure(fn, repeat=5, number=1, warmup=1):
+    """summarize() of repeat runs, each timing number calls of fn() (reported per call)"""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) * 1000 / number)
+    return summarize(samples)
+
+def environment():
+    """Enough context to tell two result files apart"""
+    def git(*args):
+        try:
+            return subprocess.run(['git', *args], capture_output=True, text=True, timeout=5).stdout.strip() or None
+        except (OSError, subprocess.SubprocessError):
+            return None
+    import numpy, pandas
+    return {
+        'commit': git('rev-parse', '--short', 'HEAD'),
+        'dirty': bool(git('status', '--porcelain', '--untracked-files=no')),
+        'python': platform.python_version(),
+        'pandas': pandas.__version__,
+        'numpy': numpy.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'ng_tier_mode': app.NG_TIER_MODE
+    }
+
+def write_results(path, suite, params, results):
+    """Write one suite's results as JSON (see compare.py); '-' writes to stdout"""
+    document = {
+        'format': RESULTS_FORMAT,
+        'suite': suite,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'environment': environment(),
+        'params': params,
+        'results': results
+    }
+    text = json.dumps(document, indent=2, sort_keys=True)
+    if path == '-':
+        sys.stdout.write(text + '\n')
+    else:
+        Path(path).write_text(text + '\n')
+    return document
+
+def print_table(title, results, column='median_ms'):
+    print(title)
+    for name, stats in results.items():
+        print(f"   {name:<44} {stats[column]:10.3f} ms   (p95 {stats['p95_ms']:.3f})")
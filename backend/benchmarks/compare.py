@@ -0,0 +1,62 @@
+"""Compare two benchmark result files (written with --json) and flag regressions.
+
+    python -m benchmarks.compare base.json head.json --threshold 10
+
+Prints the change of every measurement present in both files and exits
+with status 1 when one got slower by more than --threshold percent, so it
+can gate a CI job. Timings under --min-ms are too noisy to fail on.
+"""
+import argparse
+import json
+import sys
+
+def load(path):
+    with open(path) as f:
+        document = json.load(f)
+    if document.get('format') != 1:
+        raise SystemExit(f"{path}: unknown results format {document.get('format')}")
+    return document
+
+def compare(base, head, metric='median_ms', threshold=10.0, min_ms=0.05):
+    """[(name, base value, head value, change in percent, regressed)] for shared measurements"""
+    rows = []
+    for name, stats in head['results'].items():
+        before = base['results'].get(name, {}).get(metric)
+        after = stats.get(metric)
+        if before is None or after is None:
+            continue
+        change = (after - before) / before * 100 if before else 0.0
+        rows.append((name, before, after, change, change > threshold and after >= min_ms))
+    return rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare two benchmark result files')
+    parser.add_argument('base')
+    parser.add_argument('head')
+    parser.add_argument('--metric', default='median_ms', help='statistic to compare (median_ms, p95_ms, ...)')
+    parser.add_argument('--threshold', type=float, default=10.0, help='percent slowdown that counts as a regression')
+    parser.add_argument('--min-ms', type=float, default=0.05, help='ignore regressions below this many ms')
+    args = parser.parse_args(argv)
+
+    base, head = load(args.base), load(args.head)
+    if base['suite'] != head['suite']:
+        raise SystemExit(f"Different suites: {base['suite']} vs {head['suite']}")
+
+    print(f"📊 {head['suite']}: {base['environment'].get('commit')} -> {head['environment'].get('commit')} ({args.metric})")
+    differing = sorted(name for name in base['params'].keys() | head['params'].keys()
+                       if name != 'json' and base['params'].get(name) != head['params'].get(name))
+    if differing:
+        print(f"⚠️  Runs used different parameters ({', '.join(differing)}); the comparison may not mean much")
+    rows = compare(base, head, args.metric, args.threshold, args.min_ms)
+    for name, before, after, change, regressed in rows:
+        flag = '❌' if regressed else ('✅' if change < -args.threshold else '  ')
+        print(f" {flag} {name:<40} {before:10.3f} -> {after:10.3f}  {change:+7.1f}%")
+
+    regressions = [row for row in rows if row[4]]
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) over {args.threshold:g}%")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""Microbenchmarks of the request hot paths on a synthetic dataset.
+
+    python -m benchmarks.hotpaths --rows 3000 --json results/hotpaths.json
+
+Times search_enemies, get_enemy_details, calculate_region_average and
+bulk_enemy_details directly, then the same routes through the Flask test
+client with the response cache cold and warm. Each measurement cycles
+through a fixed, seeded list of inputs, so runs are comparable between
+commits (see compare.py).
+"""
+import argparse
+import itertools
+import random
+
+from benchmarks.common import app, measure, print_table, quiet, sandbox, write_results
+
+def workload(store, seed, size=200):
+    """Seeded inputs drawn from the loaded store: queries, (name, location) pairs, regions"""
+    rng = random.Random(seed)
+    names = sorted(set(store.names))
+    locations = sorted(set(store.locations))
+    regions = sorted({app.region_of(location) for location in locations})
+
+    queries = []
+    for name in rng.choices(names, k=size // 4):
+        queries += [name, name[:3], name.split()[-1].lower()[1:5]]
+    queries += [f"zz{i}" for i in range(size // 4)]  # Misses
+    pairs = [(store.names[i], store.locations[i] if i % 2 else None)
+             for i in rng.choices(range(len(store)), k=size)]
+    return {
+        'queries': queries,
+        'pairs': pairs,
+        'regions': regions + [region[:4].lower() for region in regions] + ['e', 'nowhere']
+    }
+
+def cycle(values, fn):
+    """fn(next value) as a no-argument callable"""
+    values = itertools.cycle(values)
+    return lambda: fn(next(values))
+
+def run(rows, repeat, number, seed):
+    results = {}
+    with sandbox(rows, seed):
+        for ng in ('NG', 'NG+7'):
+            work = workload(app.dataset.stores[ng], seed)
+            results[f'search_enemies [{ng}]'] = measure(
+                cycle(work['queries'], lambda q: app.search_enemies(q, ng)), repeat, number)
+            results[f'get_enemy_details [{ng}]'] = measure(
+                cycle(work['pairs'], lambda pair: app.get_enemy_details(pair[0], pair[1], ng)), repeat, number)
+            results[f'calculate_region_average [{ng}]'] = measure(
+                cycle(work['regions'], lambda region: app.calculate_region_average(region, ng)), repeat, number)
+            results[f'bulk_enemy_details [{ng}]'] = measure(
+                cycle(work['regions'], lambda region: app.bulk_enemy_details(
+                    app._region_rows(region, ng, app.BULK_MAX_ITEMS), 'cached')), repeat, max(1, number // 10))
+
+        work = workload(app.dataset.stores['NG'], seed)
+        client = app.app.test_client()
+        urls = {
+            'GET /api/search': [f'/api/search?q={q}' for q in work['queries']],
+            'GET /api/region': [f'/api/region/{region}' for region in work['regions']],
+            'GET /api/enemies/bulk': [f'/api/enemies/bulk?region={region}&ai=skip' for region in work['regions']]
+        }
+        with app.app.app_context():
+            for name, paths in urls.items():
+                def cold(path):
+                    app.response_cache.clear()
+                    client.get(path)
+                results[f'{name} (response cache cold)'] = measure(cycle(paths, cold), repeat, number)
+                results[f'{name} (response cache warm)'] = measure(cycle(paths, client.get), repeat, number)
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the request hot paths')
+    parser.add_argument('--rows', type=int, default=3000, help='enemies per sheet')
+    parser.add_argument('--repeat', type=int, default=7, help='timed runs per measurement')
+    parser.add_argument('--number', type=int, default=200, help='calls per timed run')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', help="write results to this file ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    # The region route queues AI generations; they must never reach the real API
+    from benchmarks.stub import StubAnthropic
+    app.anthropic_client = StubAnthropic(latency=0)
+
+    with quiet():
+        results = run(args.rows, args.repeat, args.number, args.seed)
+    if args.json:
+        write_results(args.json, 'hotpaths', vars(args), results)
+    if args.json != '-':
+        print_table(f"📊 Hot paths: {args.rows} enemies per sheet, {args.number} calls x {args.repeat} runs "
+                    f"(per-call ms)", results)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""Loader benchmark: Excel parse, normalization, snapshot and lookup table build.
+
+    python -m benchmarks.loader --rows 3000 --repeat 5 --json results/loader.json
+
+Runs against a synthetic workbook in a temporary directory, so data/ is
+never touched. The 'legacy' row is the old per-row df.apply normalization,
+kept here as the baseline for the vectorized normalize_sheet.
+"""
+import argparse
+
+import pandas as pd
+
+from benchmarks.common import app, measure, print_table, quiet, sandbox, write_results
+from sheet_schema import NUMERIC_COLUMNS, normalize_sheet, read_sheet
+
+def legacy_normalize(df):
+    """Normalization as load_elden_ring_data did it before sheet_schema"""
+    df = df[df['Name'].notna()]
+    df = df[df['Name'] != '???']
+    df['HP'] = df.apply(lambda row: (
+        pd.to_numeric(row.get('dlcClear'), errors='coerce')
+        if pd.notna(row.get('dlcClear')) and row.get('dlcClear') != '-'
+        else pd.to_numeric(row.get('Health'), errors='coerce')
+    ), axis=1)
+    df['HP'] = df['HP'].fillna(0)
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns and col != 'Weak Part':
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+    return df
+
+def run(rows, repeat, seed=1):
+    def timed(fn):
+        return measure(fn, repeat, warmup=0)
+
+    with sandbox(rows, seed, load=False):
+        workbook = pd.ExcelFile(app.DATA_FILE)
+        raw = {ng: read_sheet(workbook, ng) for ng in app.NG_LEVELS}
+
+        results = {
+            'parse sheets': timed(lambda: [read_sheet(pd.ExcelFile(app.DATA_FILE), ng) for ng in app.NG_LEVELS]),
+            'normalize (legacy apply)': timed(lambda: [legacy_normalize(df) for df in raw.values()]),
+            'normalize (vectorized)': timed(lambda: [normalize_sheet(df) for df in raw.values()]),
+            'full reload from Excel': timed(lambda: app.load_elden_ring_data(force_reload=True)),
+            'reload from snapshot': timed(app.load_elden_ring_data),
+            'build lookup tables': timed(lambda: app.Dataset(app.dataset.frames))
+        }
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the dataset loader')
+    parser.add_argument('--rows', type=int, default=3000, help='enemies per sheet')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per measurement (median is reported)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', help="write results to this file ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    # The loader prints progress per sheet; keep the report readable
+    with quiet():
+        results = run(args.rows, args.repeat, args.seed)
+
+    if args.json:
+        write_results(args.json, 'loader', vars(args), results)
+    if args.json != '-':
+        print_table(f"📊 Loader benchmark: {args.rows} enemies x {len(app.NG_LEVELS)} sheets, "
+                    f"median of {args.repeat} ({app.NG_TIER_MODE} tiers)", results)
+
+if __name__ == '__main__':
+    main()
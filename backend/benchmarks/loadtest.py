@@ -0,0 +1,194 @@
+"""Concurrent load test of the HTTP API with a stubbed Anthropic client.
+
+    python -m benchmarks.loadtest --clients 16 --duration 20 --ai-latency 2 --json results/load.json
+    python -m benchmarks.loadtest --url http://localhost:5001 --duration 30   # an already running server
+
+By default the app is served in-process (threaded werkzeug server) on a
+synthetic workbook in a temporary directory, with StubAnthropic standing in
+for Claude, so AI cache misses cost --ai-latency seconds of a background
+worker instead of money. Each client thread sends a weighted random mix of
+requests (--mix) over a keep-alive connection; latencies are reported per
+request kind plus overall throughput.
+"""
+import argparse
+import http.client
+import random
+import threading
+import time
+from urllib.parse import quote, urlsplit
+
+from benchmarks.common import app, print_table, quiet, sandbox, summarize, write_results
+from benchmarks.stub import StubAnthropic
+from benchmarks.synthetic import enemy_rows
+
+DEFAULT_MIX = 'search=40,enemy=25,region=10,bulk=10,stream=5,health=10'
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(','):
+        kind, _, weight = part.partition('=')
+        if kind.strip() not in REQUESTS:
+            raise SystemExit(f"Unknown request kind '{kind}' (expected: {', '.join(REQUESTS)})")
+        mix[kind.strip()] = float(weight or 1)
+    return mix
+
+def _search(rng, rows):
+    return f"/api/search?q={quote(rng.choice(rows)[1][:rng.randint(3, 8)])}"
+
+def _enemy(prefix):
+    def build(rng, rows):
+        row = rng.choice(rows)
+        return f"{prefix}/{quote(row[1])}?location={quote(row[2])}"
+    return build
+
+def _region(template):
+    def build(rng, rows):
+        return template.format(quote(app.region_of(rng.choice(rows)[2])))
+    return build
+
+# Request kind -> path builder(rng, synthetic rows)
+REQUESTS = {
+    'search': _search,
+    'enemy': _enemy('/api/enemy'),
+    'region': _region('/api/region/{}'),
+    'bulk': _region('/api/enemies/bulk?region={}&ai=cached'),
+    'stream': _enemy('/api/stream/enemy'),
+    'health': lambda rng, rows: '/api/health'
+}
+
+class Client(threading.Thread):
+    """One keep-alive connection sending requests until stop is set"""
+
+    def __init__(self, host, port, mix, rows, seed, stop, record):
+        super().__init__(daemon=True)
+        self.host, self.port = host, port
+        self.kinds, self.weights = list(mix), list(mix.values())
+        self.rows = rows
+        self.rng = random.Random(seed)
+        self.stop = stop
+        self.record = record
+
+    def run(self):
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+        while not self.stop.is_set():
+            kind = self.rng.choices(self.kinds, self.weights)[0]
+            path = REQUESTS[kind](self.rng, self.rows)
+            started = time.perf_counter()
+            try:
+                conn.request('GET', path, headers={'Accept-Encoding': 'gzip'})
+                response = conn.getresponse()
+                response.read()
+                status = response.status
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+                status = None
+            self.record(kind, status, (time.perf_counter() - started) * 1000)
+        conn.close()
+
+def drive(host, port, mix, rows, clients, duration, warmup, seed):
+    """Run the clients; returns per-kind results (warmup requests are not counted)"""
+    samples = {kind: [] for kind in mix}
+    statuses = {kind: {} for kind in mix}
+    errors = {kind: 0 for kind in mix}
+    lock = threading.Lock()
+    counting = threading.Event()
+
+    def record(kind, status, ms):
+        if not counting.is_set():
+            return
+        with lock:
+            if status is None:
+                errors[kind] += 1
+                return
+            samples[kind].append(ms)
+            statuses[kind][str(status)] = statuses[kind].get(str(status), 0) + 1
+
+    stop = threading.Event()
+    threads = [Client(host, port, mix, rows, seed + i, stop, record) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    time.sleep(warmup)
+    counting.set()
+    started = time.perf_counter()
+    time.sleep(duration)
+    counting.clear()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    for thread in threads:
+        thread.join(timeout=65)
+
+    results = {}
+    for kind in mix:
+        if samples[kind]:
+            results[kind] = summarize(samples[kind])
+        results.setdefault(kind, {'runs': 0})
+        results[kind].update(rps=round(len(samples[kind]) / elapsed, 2), statuses=statuses[kind], errors=errors[kind])
+    everything = [ms for kind in mix for ms in samples[kind]]
+    results['all'] = summarize(everything) if everything else {'runs': 0}
+    results['all'].update(rps=round(len(everything) / elapsed, 2), errors=sum(errors.values()))
+    return results
+
+def serve_in_process():
+    """Start the app on a free local port; returns (host, port, server)"""
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass  # One access log line per request would dominate the measurement
+
+    server = make_server('127.0.0.1', 0, app.app, threaded=True, request_handler=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return '127.0.0.1', server.server_port, server
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load test the API')
+    parser.add_argument('--url', help='target a running server instead of an in-process one')
+    parser.add_argument('--rows', type=int, default=3000, help='enemies per sheet (in-process server)')
+    parser.add_argument('--clients', type=int, default=8, help='concurrent connections')
+    parser.add_argument('--duration', type=float, default=10, help='measured seconds')
+    parser.add_argument('--warmup', type=float, default=2, help='seconds of load before measuring')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f'request kinds and weights (default {DEFAULT_MIX})')
+    parser.add_argument('--ai-latency', type=float, default=1.0, help='stub Anthropic call latency in seconds')
+    parser.add_argument('--ai-jitter', type=float, default=0.0, help='uniform +/- jitter on the stub latency')
+    parser.add_argument('--ai-fail-rate', type=float, default=0.0, help='fraction of stub calls that fail')
+    parser.add_argument('--no-response-cache', action='store_true', help='disable the server-side response cache')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', help="write results to this file ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    mix = parse_mix(args.mix)
+    rows = [row for row in enemy_rows(args.rows, args.seed) if row[1] != '???']
+
+    if args.url:
+        target = urlsplit(args.url)
+        results = drive(target.hostname, target.port or 80, mix, rows, args.clients, args.duration, args.warmup, args.seed)
+        extra = {}
+    else:
+        stub = app.anthropic_client = StubAnthropic(args.ai_latency, args.ai_jitter, args.ai_fail_rate, args.seed)
+        if args.no_response_cache:
+            app.response_cache.max_entries = 0
+        with sandbox(args.rows, args.seed):
+            host, port, server = serve_in_process()
+            try:
+                with quiet():  # Request and AI progress prints
+                    results = drive(host, port, mix, rows, args.clients, args.duration, args.warmup, args.seed)
+            finally:
+                server.shutdown()
+            extra = {'stub_calls': stub.messages.calls, 'ai_cache_entries': len(app.ai_cache), 'tokens': app.token_usage()}
+
+    if args.json:
+        write_results(args.json, 'loadtest', vars(args), {**results, **({'server': extra} if extra else {})})
+    if args.json != '-':
+        print_table(f"📊 Load test: {args.clients} clients for {args.duration:g}s, "
+                    f"{results['all']['rps']} req/s, {results['all']['errors']} errors",
+                    {kind: stats for kind, stats in results.items() if stats.get('runs')})
+        for kind, stats in results.items():
+            if stats.get('statuses'):
+                print(f"   {kind:<44} {stats['rps']:8.1f} req/s   statuses {stats['statuses']}")
+        if extra:
+            print(f"   stub Anthropic calls: {extra['stub_calls']}, AI cache entries: {extra['ai_cache_entries']}, "
+                  f"prompt cache read share: {extra['tokens']['cache_read_share']}")
+
+if __name__ == '__main__':
+    main()
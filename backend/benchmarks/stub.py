@@ -0,0 +1,129 @@
+"""Stand-in for the Anthropic client with configurable latency (no network, no cost)"""
+import hashlib
+import random
+import threading
+import time
+from itertools import count
+from types import SimpleNamespace
+
+STRATEGY = (
+    "Stay at mid range and punish the recovery after its delayed combo. "
+    "Fire and bleed work well; roll toward it on the grab."
+)
+
+def _usage(prompt_chars, output_chars, written_chars=0, read_chars=0):
+    # Roughly 4 characters per token, like English text
+    return SimpleNamespace(input_tokens=prompt_chars // 4, output_tokens=output_chars // 4,
+                           cache_creation_input_tokens=written_chars // 4, cache_read_input_tokens=read_chars // 4)
+
+class _Stream:
+    """Context manager shaped like messages.stream(): text_stream, get_final_text/message"""
+
+    def __init__(self, messages, params):
+        self.messages = messages
+        self.params = params
+        self.chunks = [STRATEGY[i:i + 24] for i in range(0, len(STRATEGY), 24)]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    @property
+    def text_stream(self):
+        delay = self.messages.delay() / len(self.chunks)
+        for chunk in self.chunks:
+            time.sleep(delay)
+            yield chunk
+
+    def get_final_message(self):
+        return self.messages.message(self.params)
+
+    def get_final_text(self):
+        return STRATEGY
+
+class StubBatches:
+    """In-process stand-in for client.messages.batches (ends immediately, canned text)"""
+
+    def __init__(self, latency=0.0, fail_every=0):
+        self.latency = latency
+        self.fail_every = fail_every
+        self._batches = {}
+        self._ids = count(1)
+
+    def _counts(self, requests, processing):
+        failed = sum(1 for i in range(len(requests)) if self.fail_every and (i + 1) % self.fail_every == 0)
+        if processing:
+            return SimpleNamespace(processing=len(requests), succeeded=0, errored=0, canceled=0, expired=0)
+        return SimpleNamespace(processing=0, succeeded=len(requests) - failed, errored=failed, canceled=0, expired=0)
+
+    def create(self, requests):
+        batch_id = f"msgbatch_stub_{next(self._ids)}"
+        self._batches[batch_id] = (list(requests), time.time())
+        return self.retrieve(batch_id)
+
+    def retrieve(self, batch_id):
+        if batch_id not in self._batches:
+            raise LookupError(batch_id)
+        requests, created = self._batches[batch_id]
+        ended = time.time() - created >= self.latency
+        return SimpleNamespace(
+            id=batch_id,
+            processing_status='ended' if ended else 'in_progress',
+            request_counts=self._counts(requests, not ended)
+        )
+
+    def results(self, batch_id):
+        requests, _ = self._batches[batch_id]
+        for i, req in enumerate(requests):
+            if self.fail_every and (i + 1) % self.fail_every == 0:
+                result = SimpleNamespace(type='errored')
+            else:
+                prompt = req['params']['messages'][-1]['content']
+                text = f"(stub) Strategy for prompt {hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:8]}"
+                result = SimpleNamespace(type='succeeded', message=SimpleNamespace(content=[SimpleNamespace(type='text', text=text)]))
+            yield SimpleNamespace(custom_id=req['custom_id'], result=result)
+
+class StubMessages:
+    def __init__(self, latency, jitter, fail_rate, seed, batches):
+        self.batches = batches
+        self.latency = latency
+        self.jitter = jitter
+        self.fail_rate = fail_rate
+        self.calls = 0
+        self._cached = set()  # System prefixes marked with cache_control (the stub's prompt cache)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def delay(self):
+        with self._lock:
+            self.calls += 1
+            if self.fail_rate and self._rng.random() < self.fail_rate:
+                raise RuntimeError("stub: simulated API error")
+            return max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+
+    def message(self, params):
+        prompt = ''.join(str(m.get('content', '')) for m in params.get('messages', []))
+        system = ''.join(block['text'] for block in params.get('system', []))
+        if not any('cache_control' in block for block in params.get('system', [])):
+            usage = _usage(len(system) + len(prompt), len(STRATEGY))
+        else:
+            with self._lock:
+                hit = system in self._cached
+                self._cached.add(system)
+            usage = _usage(len(prompt), len(STRATEGY), *((0, len(system)) if hit else (len(system), 0)))
+        return SimpleNamespace(content=[SimpleNamespace(text=STRATEGY)], usage=usage)
+
+    def create(self, **params):
+        time.sleep(self.delay())
+        return self.message(params)
+
+    def stream(self, **params):
+        return _Stream(self, params)
+
+class StubAnthropic:
+    """Just enough of anthropic.Anthropic for messages.create, messages.stream and messages.batches"""
+
+    def __init__(self, latency=1.0, jitter=0.0, fail_rate=0.0, seed=1, batch_latency=0.0, batch_fail_every=0):
+        self.messages = StubMessages(latency, jitter, fail_rate, seed, StubBatches(batch_latency, batch_fail_every))
@@ -0,0 +1,60 @@
+"""Synthetic workbook in the layout of data/elden_ring_data.xlsx"""
+import random
+
+from openpyxl import Workbook
+
+HEADER = [
+    "ID", "Name", "Location", "Health", "dlcClear",
+    "Phys", "Strike", "Slash", "Pierce", "Magic", "Fire", "Ltng", "Holy",  # Defense
+    "Phys", "Strike", "Slash", "Pierce", "Magic", "Fire", "Ltng", "Holy",  # Damage negation
+    "Poison", "Scarlet Rot", "Bleed", "Frost", "Sleep", "Madness", "Deathblight",
+    "Base", "Effective", "Regen Delay", "Bleed", "Frost", "HP Burn Effect", "Weak Part"
+]
+LOCATIONS = [
+    "Limgrave - Mistwood Outskirts", "Liurnia of the Lakes - Raya Lucaria", "Caelid - Sellia",
+    "Stormveil Castle", "Altus Plateau - Perfumer's Grotto Entrance", "Mountaintops of the Giants - Zamor Ruins"
+]
+NAMES = [
+    "Runebear", "Margit, the Fell Omen", "Tree Sentinel (Torch) [Boss]", "Giant Dog", "Fallingstar Beast",
+    "Crystalian", "Abductor Virgin", "Troll", "Imp", "Skeleton", "Night's Cavalry", "Godrick Soldier"
+]
+TIER_HP_SCALING = {'NG': 1, 'NG+': 2.5, 'NG+2': 2.75, 'NG+3': 3, 'NG+4': 3.25, 'NG+5': 3.5, 'NG+6': 3.75, 'NG+7': 4}
+
+def enemy_rows(rows, seed=1):
+    rng = random.Random(seed)
+
+    def resistance():
+        return rng.choice(["Immune", rng.randint(100, 900)])
+
+    result = []
+    for i in range(rows):
+        name = NAMES[i % len(NAMES)] + ("" if i < len(NAMES) * 3 else f" {i // (len(NAMES) * 3)}")
+        result.append(
+            [i + 1, name, LOCATIONS[i % len(LOCATIONS)], rng.randint(100, 20000),
+             rng.choice(["-", None, rng.randint(100, 30000)])]
+            + [rng.randint(50, 200) for _ in range(8)]
+            + [rng.choice([-20, -10, 0, 10, 20, 35, 40]) for _ in range(8)]
+            + [resistance() for _ in range(7)]
+            + [rng.randint(0, 120), rng.choice([rng.randint(0, 200), "∞"]), round(rng.random() * 30, 1),
+               rng.choice([1, 0.5, 1.5]), 1, 1, rng.choice([0, 1])]
+        )
+    result.append([rows + 1, "???", "Nowhere"] + [0] * (len(HEADER) - 3))  # Placeholder row the loader drops
+    return result
+
+def write_workbook(path, rows=300, seed=1):
+    """Eight NG sheets (title row, header row, enemies); NG+ tiers scale Health and dlcClear"""
+    base_rows = enemy_rows(rows, seed)
+    workbook = Workbook()
+    workbook.remove(workbook.active)
+    for ng, factor in TIER_HP_SCALING.items():
+        sheet = workbook.create_sheet(ng)
+        sheet.append(["Enemy data"] + [None] * (len(HEADER) - 1))
+        sheet.append(HEADER)
+        for row in base_rows:
+            row = list(row)
+            for col in (3, 4):
+                if isinstance(row[col], int):
+                    row[col] = int(row[col] * factor)
+            sheet.append(row)
+    workbook.save(path)
+    return path
@@ -0,0 +1,68 @@
+"""Circuit breaker around calls to an unreliable dependency (the Anthropic API).
+
+- closed: calls go through; failure_threshold consecutive failures open it.
+- open: calls are refused for reset_seconds, so callers use their fallback
+  right away instead of waiting for another timeout.
+- half_open: one trial call goes through; success closes the circuit,
+  failure opens it again for another reset_seconds.
+"""
+import threading
+import time
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=5, reset_seconds=30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold  # 0 disables the breaker
+        self.reset_seconds = reset_seconds
+        self.clock = clock
+        self.failures = 0  # Consecutive
+        self.opened = 0  # Times the circuit opened
+        self._opened_at = None
+        self._trial_at = None  # Start of the half-open trial call in flight
+        self._lock = threading.Lock()
+
+    def _state(self):
+        if self._opened_at is None:
+            return 'closed'
+        if self.clock() - self._opened_at >= self.reset_seconds:
+            return 'half_open'
+        return 'open'
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def allow(self):
+        """Whether a call may go ahead now (claims the trial call when half-open)"""
+        with self._lock:
+            state = self._state()
+            if state == 'closed':
+                return True
+            # A trial that never reported back (e.g. an abandoned stream) expires like the open state
+            if state == 'half_open' and (self._trial_at is None or self.clock() - self._trial_at >= self.reset_seconds):
+                self._trial_at = self.clock()
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._opened_at = None
+            self._trial_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            failed_trial = self._trial_at is not None
+            if failed_trial or (self._opened_at is None and 0 < self.failure_threshold <= self.failures):
+                if self._opened_at is None:
+                    self.opened += 1
+                self._opened_at = self.clock()
+            self._trial_at = None
+
+    def snapshot(self):
+        """State for health checks and metrics"""
+        with self._lock:
+            state = self._state()
+            retry_in = self.reset_seconds - (self.clock() - self._opened_at) if state == 'open' else 0
+            return {'state': state, 'failures': self.failures, 'opened': self.opened, 'retry_in': round(retry_in, 1)}
@@ -0,0 +1,93 @@
+"""Incrementally maintained AI cache coverage (which enemies already have an analysis)"""
+import threading
+import time
+from collections import defaultdict
+
+class CacheCoverage:
+    """Cached-enemy counts per NG level and per region, updated as keys are cached.
+
+    An enemy (unique name) counts as covered at an NG level when any of its
+    instances there has a cached analysis; a region counts the unique names
+    with an instance in it. Cache keys map to the rows they cover once per
+    dataset, so mark()/unmark() only touch counters and every read is a
+    dictionary lookup.
+    """
+
+    def __init__(self, rows, cached_keys=()):
+        """rows: iterable of (ng_level, name, region, cache key) for every enemy instance"""
+        self.rows_by_key = defaultdict(list)
+        names = defaultdict(set)
+        region_names = defaultdict(set)
+        for ng_level, name, region, key in rows:
+            self.rows_by_key[key].append((ng_level, name, region))
+            names[ng_level].add(name)
+            region_names[ng_level, region].add(name)
+
+        self.totals = {ng_level: len(members) for ng_level, members in names.items()}
+        self.region_totals = {group: len(members) for group, members in region_names.items()}
+
+        self.cached = set()
+        self._instances = defaultdict(int)         # (ng, name) -> cached instances
+        self._region_instances = defaultdict(int)  # (ng, region, name) -> cached instances
+        self.cached_names = defaultdict(int)        # ng -> covered names
+        self.cached_region_names = defaultdict(int) # (ng, region) -> covered names
+        self._lock = threading.Lock()
+        self.synced_at = 0.0
+        self.sync(cached_keys)
+
+    def _add(self, key, delta):
+        for ng_level, name, region in self.rows_by_key.get(key, ()):
+            before = self._instances[ng_level, name]
+            self._instances[ng_level, name] = before + delta
+            if (before == 0) != (before + delta == 0):
+                self.cached_names[ng_level] += delta
+
+            before = self._region_instances[ng_level, region, name]
+            self._region_instances[ng_level, region, name] = before + delta
+            if (before == 0) != (before + delta == 0):
+                self.cached_region_names[ng_level, region] += delta
+
+    def mark(self, key):
+        """Record that key now has a cached analysis"""
+        with self._lock:
+            if key in self.rows_by_key and key not in self.cached:
+                self.cached.add(key)
+                self._add(key, 1)
+
+    def unmark(self, key):
+        """Record that key's cached analysis was deleted"""
+        with self._lock:
+            if key in self.cached:
+                self.cached.discard(key)
+                self._add(key, -1)
+
+    def sync(self, cached_keys):
+        """Catch up with the full key list (writes and deletes made by other workers)"""
+        cached_keys = {key for key in cached_keys if key in self.rows_by_key}
+        with self._lock:
+            for key in cached_keys - self.cached:
+                self._add(key, 1)
+            for key in self.cached - cached_keys:
+                self._add(key, -1)
+            self.cached = cached_keys
+            self.synced_at = time.time()
+
+    @staticmethod
+    def _summary(total, cached):
+        return {
+            'total_enemies': total,
+            'cached_enemies': cached,
+            'percentage': round((cached / total * 100), 1) if total > 0 else 0
+        }
+
+    def stats(self, ng_level):
+        return self._summary(self.totals.get(ng_level, 0), self.cached_names[ng_level])
+
+    def by_ng(self):
+        return {ng_level: self.stats(ng_level) for ng_level in self.totals}
+
+    def by_region(self, ng_level):
+        return {
+            region: self._summary(total, self.cached_region_names[ng, region])
+            for (ng, region), total in self.region_totals.items() if ng == ng_level
+        }
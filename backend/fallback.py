@@ -0,0 +1,85 @@
+"""Rule-based strategies, served when Claude fails, is too slow or the circuit is open.
+
+Built from the same structured stats as the prompts, with the rules of
+GAME_KNOWLEDGE (the status thresholds in matchup.py, the poise bands below),
+and laid out in the sections the enemy prompt asks Claude for so the
+frontend renders both alike. Deterministic and well under a millisecond.
+"""
+import numpy as np
+
+from matchup import NO_DATA, rank_damage_types, rank_status_effects
+
+# "Poise Values" from GAME_KNOWLEDGE: (below, description); anything higher is very high
+POISE_BANDS = (
+    (40, "very low poise: almost any hit staggers it, so keep up the pressure"),
+    (60, "low poise: it staggers easily, so trade hits with heavy attacks"),
+    (80, "medium poise: charged heavy attacks will break its stance in a few hits"),
+    (100, "high poise: use charged heavy attacks and guard-counters to break its stance")
+)
+VERY_HIGH_POISE = "very high poise: it is hard to stagger, so dodge its combos and punish the recoveries"
+
+NOTE = "*Rule-based summary from the stats - the AI analysis is unavailable right now.*"
+
+def _label(key):
+    return key.replace('_', ' ').title()
+
+def _poise(value):
+    for below, text in POISE_BANDS:
+        if value < below:
+            return text
+    return VERY_HIGH_POISE
+
+def _damage_types(negation, top=3):
+    """Up to top damage types, best first, as 'Fire (-20%)'"""
+    types = list(negation)
+    ranked = rank_damage_types(np.array([[negation[t] for t in types]], dtype=np.float64), np.ones(1), types)
+    return [f"{_label(entry['type'])} ({negation[entry['type']]:g}%)" for entry in ranked[:top]]
+
+def _viable_statuses(resistances, proc_multipliers=None):
+    """Effective or very effective status effects, best first, as 'Bleed (very effective, 250)'"""
+    statuses = list(resistances)
+    values = [resistances[s] for s in statuses]
+    ranked = rank_status_effects(
+        np.array([[0 if v == 'Immune' else (NO_DATA if v is None else v) for v in values]], dtype=np.int64),
+        np.array([[v == 'Immune' for v in values]]),
+        statuses,
+        {s: np.array([m]) for s, m in (proc_multipliers or {}).items() if s in resistances}
+    )
+    return [
+        f"{_label(entry['status'])} ({entry['rating'].replace('_', ' ')}, {entry['median_resistance']})"
+        for entry in ranked if entry.get('rating') in ('very_effective', 'effective')
+    ]
+
+def enemy_strategy(enemy_data):
+    """Strategy for one enemy (the details dict of /api/enemy)"""
+    statuses = _viable_statuses(enemy_data['resistances'], enemy_data.get('status_multipliers'))
+    tips = [f"With {enemy_data['poise']['base']} poise it has {_poise(enemy_data['poise']['base'])}."]
+    if enemy_data.get('has_weak_spots'):
+        tips.append("It has weak spots that take extra damage, so aim for them.")
+    if any(status.startswith('Frost') for status in statuses):
+        tips.append("Frostbite also lowers its damage negation against everything by 20% while active.")
+    return "\n".join([
+        f"1. **Best Damage Types:** {', '.join(_damage_types(enemy_data['damage_negation']))}",
+        f"2. **Viable Status Effects:** {', '.join(statuses) if statuses else 'None - its resistances are too high to be practical'}",
+        f"3. **Combat Strategy:** {' '.join(tips)}",
+        "",
+        NOTE
+    ])
+
+def region_strategy(avg_stats):
+    """Strategy for a region (the average stats of /api/region)"""
+    damage = _damage_types(avg_stats['avg_damage_negation'])
+    statuses = _viable_statuses(avg_stats.get('avg_resistances') or {})
+    poise = avg_stats.get('avg_poise', {}).get('base', 0)
+    sentences = [
+        f"Across {avg_stats['enemy_count']} enemies (average HP {avg_stats['avg_hp']:,}) the lowest average "
+        f"damage negation is {damage[0]}, followed by {' and '.join(damage[1:])}.",
+        f"Status effects that work on the typical enemy here: {', '.join(statuses)}." if statuses
+        else "Average status resistances are high, so a status build will struggle here.",
+        f"Average poise is {poise:g}, {_poise(poise)}."
+    ]
+    return " ".join(sentences) + "\n\n" + NOTE
+
+def fallback_strategy(enemy_data, context="enemy"):
+    """Rule-based strategy for an enemy or region (same arguments as build_ai_prompt)"""
+    return enemy_strategy(enemy_data) if context == "enemy" else region_strategy(enemy_data)
@@ -0,0 +1,41 @@
+"""Gunicorn settings (the Procfile passes --config backend/gunicorn.conf.py).
+
+The app is imported and the dataset + AI cache are loaded once in the master
+(app.startup(), at import with the default STARTUP_MODE=eager), then workers
+are forked from it. Combined with gc.freeze() that keeps the
+loaded DataFrames, record stores and indexes in copy-on-write pages shared by
+every worker instead of one private copy each. Numeric snapshot columns are
+views of a read-only mmap, so they are shared through the page cache anyway,
+and the AI cache lives in the shared SQLite store (AI_CACHE_BACKEND).
+
+Workers are threaded: an AI long-poll (/api/ai/status?wait=) or an SSE
+stream holds a thread for up to AI_MAX_WAIT_SECONDS, and with sync workers
+that would be the whole worker, starving every other request behind it.
+"""
+import gc
+import os
+
+preload_app = True
+worker_class = 'gthread'
+workers = int(os.getenv('WEB_CONCURRENCY', 2))
+threads = int(os.getenv('GUNICORN_THREADS', 16))  # Per worker; SSE streams are capped below this (SSE_MAX_STREAMS)
+
+def when_ready(server):
+    """Runs in the master after the preload import, before any worker is forked"""
+    import app  # The module gunicorn just preloaded
+
+    if app.STARTUP_MODE != 'lazy':  # Lazy: every worker loads on its first request instead
+        app.startup()  # No-op if the eager import already did it
+
+    # Move everything loaded so far out of the collector's reach: a GC pass in a
+    # worker would otherwise write to (and un-share) every tracked object's page
+    gc.collect()
+    gc.freeze()
+    server.log.info("Dataset loaded in master; %s objects frozen for sharing", gc.get_freeze_count())
+
+def post_fork(server, worker):
+    # Connections and threads are per process; the SQLite store reconnects by pid
+    # and the AI thread pool only starts threads on first use. The dataset watcher
+    # (snapshots published by other workers, DATA_WATCH) is started per worker.
+    import app
+    app.start_dataset_watcher()
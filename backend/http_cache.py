@@ -0,0 +1,100 @@
+"""Server-side cache of serialized responses, with content ETags and compression"""
+import gzip
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    import brotli  # Optional: pip install brotli
+except ImportError:
+    brotli = None
+
+MIN_COMPRESS_BYTES = 512  # Smaller bodies are sent as-is
+
+def choose_encoding(accept_encodings):
+    """Best coding the client accepts (werkzeug Accept object): 'br', 'gzip' or None"""
+    if brotli is not None and accept_encodings['br']:
+        return 'br'
+    if accept_encodings['gzip']:
+        return 'gzip'
+    return None
+
+def compress(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6, mtime=0)  # mtime=0: same bytes on every worker
+
+class CachedResponse:
+    """One serialized body, its ETag and its compressed variants (built on first use)"""
+    __slots__ = ('body', 'mimetype', 'etag', 'tags', 'created', 'encoded')
+
+    def __init__(self, body, mimetype, tags=()):
+        self.body = body
+        self.mimetype = mimetype
+        # Derived from the bytes, so every worker hands out the same validator
+        self.etag = hashlib.sha256(body).hexdigest()[:20]
+        self.tags = frozenset(tags)
+        self.created = time.time()
+        self.encoded = {}
+
+    def payload(self, encoding):
+        """(bytes, encoding actually applied)"""
+        if encoding is None or len(self.body) < MIN_COMPRESS_BYTES:
+            return self.body, None
+        data = self.encoded.get(encoding)
+        if data is None:
+            data = self.encoded[encoding] = compress(self.body, encoding)
+        return data, encoding
+
+class ResponseCache:
+    """Bounded LRU of CachedResponse, optionally expiring after ttl seconds"""
+
+    def __init__(self, max_entries=2048, ttl=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl and time.time() - entry.created > self.ttl:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self, tag=None):
+        """Drop every entry, or only those carrying tag; returns how many were dropped"""
+        with self._lock:
+            if tag is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                return removed
+            stale = [key for key, entry in self._entries.items() if tag in entry.tags]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'compression': 'br, gzip' if brotli is not None else 'gzip'
+            }
@@ -0,0 +1,128 @@
+"""Deterministic matchup scoring: which damage types and status effects work on a set of enemies.
+
+Everything is computed on the stat arrays (one row per enemy), so answering
+for a single enemy, a region or a whole NG level is a handful of NumPy
+operations instead of an LLM call:
+
+- Damage types are ranked by the raw damage needed to clear the whole set:
+  sum(HP / multiplier), where a negation of -20% is a 1.2x multiplier.
+- Status effects are rated per enemy with the thresholds of the game
+  knowledge base (app.GAME_KNOWLEDGE) and ranked by their mean score,
+  scaled by the enemy's proc multiplier where the sheet has one.
+"""
+import numpy as np
+
+# "Status Effect Viability" from GAME_KNOWLEDGE: (very effective below, effective below, unreliable above)
+STATUS_THRESHOLDS = {
+    'bleed': (300, 400, 600),
+    'poison': (300, 400, 600),
+    'frost': (300, 400, 600),
+    'sleep': (200, 200, 250),  # No plain 'effective' band: 200-250 is marginal
+    'scarlet_rot': (200, 300, 500)
+}
+NO_PVE_EFFECT = ('madness', 'deathblight')  # "Does not work on PvE enemies"
+NO_DATA = 999999  # EnemyStore's resistance value for an empty cell
+
+RATINGS = ('very_effective', 'effective', 'marginal', 'unreliable', 'immune')
+RATING_SCORES = np.array([1.0, 0.75, 0.4, 0.1, 0.0])
+MIN_MULTIPLIER = 0.01  # 100% negation: rank last instead of dividing by zero
+
+def damage_multipliers(negation):
+    """Damage taken per point dealt for negation percentages (-20 -> 1.2, 35 -> 0.65)"""
+    return 1.0 - np.asarray(negation, dtype=np.float64) / 100.0
+
+def rate(status, resistances, immune):
+    """Index into RATINGS for each resistance value of one status"""
+    very, effective, unreliable = STATUS_THRESHOLDS[status]
+    return np.select(
+        [immune, resistances < very, resistances < effective, resistances <= unreliable],
+        [4, 0, 1, 2], default=3
+    )
+
+def rank_damage_types(negation, hp, damage_types):
+    """Damage types, best first, for a (enemies, types) negation array"""
+    multipliers = damage_multipliers(negation)
+    hp = np.maximum(np.asarray(hp, dtype=np.float64), 1.0)
+    to_clear = (hp[:, None] / np.maximum(multipliers, MIN_MULTIPLIER)).sum(axis=0)
+    best = np.bincount(multipliers.argmax(axis=1), minlength=len(damage_types)) / len(multipliers)
+    weak = (multipliers > 1.0).mean(axis=0)
+
+    ranked = []
+    for rank, j in enumerate(np.argsort(to_clear, kind='stable'), 1):
+        column = multipliers[:, j]
+        ranked.append({
+            'rank': rank,
+            'type': damage_types[j],
+            'mean_multiplier': round(float(column.mean()), 3),
+            'min_multiplier': round(float(column.min()), 3),
+            'max_multiplier': round(float(column.max()), 3),
+            'weak_share': round(float(weak[j]), 3),    # Enemies with a negative negation
+            'best_share': round(float(best[j]), 3),    # Enemies for which it is the top type
+            'raw_damage_to_clear': int(round(to_clear[j]))
+        })
+    return ranked
+
+def rank_status_effects(resistances, immune, statuses, proc_multipliers=None):
+    """Status effects, best first, for (enemies, statuses) resistance and immune arrays.
+
+    proc_multipliers: {status: per-enemy array} scaling the damage of a proc
+    (the sheet's bleed/frost multipliers); scores are multiplied by it.
+    """
+    proc_multipliers = proc_multipliers or {}
+    ranked, unusable = [], []
+    for j, status in enumerate(statuses):
+        if status in NO_PVE_EFFECT or status not in STATUS_THRESHOLDS:
+            unusable.append({'status': status, 'score': 0.0, 'rating': 'no_pve_effect'})
+            continue
+        values, immunes = resistances[:, j], immune[:, j]
+        known = immunes | (values != NO_DATA)
+        if not known.any():
+            unusable.append({'status': status, 'score': None, 'rating': 'no_data'})
+            continue
+
+        ratings = rate(status, values[known], immunes[known])
+        scores = RATING_SCORES[ratings]
+        proc = proc_multipliers.get(status)
+        if proc is not None:
+            scores = scores * np.asarray(proc, dtype=np.float64)[known]
+        counts = np.bincount(ratings, minlength=len(RATINGS))
+
+        susceptible = values[known & ~immunes]
+        median = float(np.median(susceptible)) if susceptible.size else None
+        typical = 'immune' if median is None else RATINGS[int(rate(status, np.array([median]), np.array([False]))[0])]
+        entry = {
+            'status': status,
+            'score': round(float(scores.mean()), 3),
+            'rating': typical,  # Rating of the median resistance
+            'median_resistance': int(median) if median is not None else None,
+            'viable_share': round(float((ratings <= 1).mean()), 3),  # Very effective or effective
+            'counts': dict(zip(RATINGS, counts.tolist())),
+            'with_data': int(known.sum())
+        }
+        if proc is not None:
+            entry['proc_multiplier'] = round(float(np.asarray(proc, dtype=np.float64)[known].mean()), 3)
+        ranked.append(entry)
+
+    ranked.sort(key=lambda entry: -entry['score'])
+    for rank, entry in enumerate(ranked, 1):
+        entry['rank'] = rank
+    return ranked + unusable
+
+def score_matchup(negation, hp, resistances, immune, damage_types, statuses, proc_multipliers=None):
+    """Ranked damage types and status effects for a set of enemies (None for an empty set)"""
+    if len(negation) == 0:
+        return None
+    return {
+        'enemy_count': len(negation),
+        'damage_types': rank_damage_types(negation, hp, damage_types),
+        'status_effects': rank_status_effects(resistances, immune, statuses, proc_multipliers)
+    }
+
+def describe(result, top=3):
+    """Short text summary of a matchup (for prompts and logs)"""
+    damage = ', '.join(
+        f"{entry['type']} (x{entry['mean_multiplier']:g})" for entry in result['damage_types'][:top]
+    )
+    viable = [entry for entry in result['status_effects'] if entry.get('rating') in ('very_effective', 'effective')]
+    status = ', '.join(f"{entry['status']} ({entry['rating'].replace('_', ' ')})" for entry in viable[:top])
+    return f"Best damage types: {damage}. Viable status effects: {status or 'none'}."
@@ -0,0 +1,235 @@
+"""Derive the NG+ tiers from the NG sheet plus per-tier scaling factors.
+
+Every NG+ sheet repeats each enemy of the NG sheet; only a few columns (HP,
+...) are scaled. extract_tier() finds the columns that differ from NG and
+fits one multiplier + rounding rule per column. Cells the rule does not
+reproduce (per-enemy exceptions) are kept as sparse overrides, and the
+result is checked cell by cell against the sheet, so a derived tier is
+exactly the sheet it replaces. TieredFrames then serves every tier from
+the one base frame: unchanged columns are shared, scaled ones are computed
+on access.
+"""
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+
+ROUNDINGS = {
+    'none': None,
+    'floor': np.floor,  # int() of a positive product
+    'round': np.round,
+    'ceil': np.ceil
+}
+
+def _is_number(value):
+    return isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, (bool, np.bool_))
+
+def _numeric_view(series):
+    """(floats, numeric mask, all-ints flag) for a column that may mix numbers and text"""
+    if series.dtype.kind in 'iuf':
+        floats = series.to_numpy(dtype=np.float64)
+        return floats, ~np.isnan(floats), series.dtype.kind in 'iu'
+    values = series.tolist()
+    mask = np.array([_is_number(v) and not pd.isna(v) for v in values], dtype=bool)
+    floats = np.full(len(values), np.nan)
+    numbers = [v for v, m in zip(values, mask) if m]
+    if numbers:
+        floats[mask] = numbers
+    return floats, mask, all(isinstance(v, (int, np.integer)) for v in numbers)
+
+def _cells_equal(a, b):
+    """Cell-wise strict equality (same value and same Python type; NaN equals NaN)"""
+    if a.dtype != object and b.dtype != object:
+        if a.dtype != b.dtype:
+            return np.zeros(len(a), dtype=bool)
+        if a.dtype.kind == 'f':
+            return (a == b) | (np.isnan(a) & np.isnan(b))
+        return a == b
+    return np.array([
+        type(x) is type(y) and (x == y or (x != x and y != y))
+        for x, y in zip(a.tolist(), b.tolist())
+    ], dtype=bool)
+
+class ColumnScale:
+    """tier = rounding(base * factor) on numeric cells, with per-row overrides"""
+    __slots__ = ('factor', 'rounding', 'dtype', 'ints', 'rows', 'values')
+
+    def __init__(self, factor, rounding, dtype, ints, rows=(), values=()):
+        self.factor = factor
+        self.rounding = rounding
+        self.dtype = dtype  # numpy dtype string of the tier column ('|O' for mixed columns)
+        self.ints = ints    # Mixed columns: scaled cells are Python ints, not floats
+        self.rows = np.asarray(rows, dtype=np.int64)
+        self.values = list(values)
+
+    def _scaled(self, floats):
+        scaled = floats * self.factor
+        if ROUNDINGS[self.rounding] is not None:
+            scaled = ROUNDINGS[self.rounding](scaled)
+        return scaled
+
+    def apply(self, base, numeric):
+        """Tier column as an ndarray, given the base column and its _numeric_view"""
+        floats, mask, _ = numeric
+        dtype = np.dtype(self.dtype)
+        if dtype != object:
+            with np.errstate(invalid='ignore'):
+                out = self._scaled(floats).astype(dtype)
+        else:
+            out = base.to_numpy(dtype=object).copy()
+            if mask.any():
+                scaled = self._scaled(floats[mask])
+                out[mask] = (scaled.astype(np.int64) if self.ints else scaled).astype(object)
+        if len(self.rows):
+            out[self.rows] = self.values if dtype == object else np.array(self.values, dtype=dtype)
+        return out
+
+    def to_dict(self):
+        values = [v.item() if isinstance(v, np.generic) else v for v in self.values]
+        return {'factor': self.factor, 'rounding': self.rounding, 'dtype': self.dtype,
+                'ints': self.ints, 'rows': self.rows.tolist(), 'values': values}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['factor'], data['rounding'], data['dtype'], data['ints'], data['rows'], data['values'])
+
+def _candidate_factors(base_floats, tier_floats):
+    """Most common tier/base ratios (to 4 places) plus the median"""
+    usable = ~np.isnan(base_floats) & ~np.isnan(tier_floats) & (base_floats != 0)
+    if not usable.any():
+        return [1.0]
+    ratios = tier_floats[usable] / base_floats[usable]
+    values, counts = np.unique(np.round(ratios, 4), return_counts=True)
+    candidates = [float(v) for v in values[np.argsort(-counts)[:3]]]
+    median = float(np.median(ratios))
+    return candidates + ([median] if median not in candidates else [])
+
+def fit_column(base, tier, base_numeric):
+    """ColumnScale reproducing the tier column from the base column exactly"""
+    base_floats, base_mask, _ = base_numeric
+    tier_floats, _, tier_ints = _numeric_view(tier)
+
+    # Pick the factor + rounding that gets the most numeric cells right
+    best, best_hits = (1.0, 'none'), -1
+    both = base_mask & ~np.isnan(tier_floats)
+    for factor in _candidate_factors(base_floats, tier_floats):
+        for rounding, fn in ROUNDINGS.items():
+            scaled = base_floats[both] * factor
+            hits = int(np.count_nonzero((fn(scaled) if fn is not None else scaled) == tier_floats[both]))
+            if hits > best_hits:
+                best, best_hits = (factor, rounding), hits
+
+    scale = ColumnScale(best[0], best[1], tier.dtype.str, tier_ints)
+    actual = tier.to_numpy()
+    wrong = np.flatnonzero(~_cells_equal(scale.apply(base, base_numeric), actual))
+    scale.rows = wrong
+    scale.values = actual[wrong].tolist()
+    return scale
+
+def frames_identical(a, b):
+    """Same columns, dtypes and cells (strict, see _cells_equal)"""
+    if list(a.columns) != list(b.columns) or len(a) != len(b):
+        return False
+    return all(
+        a[c].dtype == b[c].dtype and _cells_equal(a[c].to_numpy(), b[c].to_numpy()).all()
+        for c in a.columns
+    )
+
+class TieredFrames(Mapping):
+    """{ng: DataFrame} where NG+ tiers are derived from the base frame on access.
+
+    tiers maps each NG+ level to {column: ColumnScale}, or to a full DataFrame
+    for a sheet that could not be derived (different rows or columns).
+    """
+
+    def __init__(self, base_level, base, tiers):
+        self.base_level = base_level
+        self.base = base
+        self.tiers = tiers
+        self._numeric = {}
+
+    def numeric(self, column):
+        """Cached _numeric_view of a base column (shared by every tier)"""
+        if column not in self._numeric:
+            self._numeric[column] = _numeric_view(self.base[column])
+        return self._numeric[column]
+
+    def derive(self, scales):
+        columns = {
+            name: pd.Series(scales[name].apply(self.base[name], self.numeric(name)), index=self.base.index, name=name)
+            if name in scales else self.base[name]
+            for name in self.base.columns
+        }
+        return pd.DataFrame(columns, copy=False)
+
+    def __getitem__(self, ng):
+        if ng == self.base_level:
+            return self.base
+        tier = self.tiers[ng]
+        return tier if isinstance(tier, pd.DataFrame) else self.derive(tier)
+
+    def __contains__(self, ng):
+        return ng == self.base_level or ng in self.tiers
+
+    def __iter__(self):
+        yield self.base_level
+        yield from self.tiers
+
+    def __len__(self):
+        return 1 + len(self.tiers)
+
+    def extract_tier(self, df):
+        """{column: ColumnScale} for a sheet, or None if it cannot be derived exactly"""
+        if list(df.columns) != list(self.base.columns) or len(df) != len(self.base):
+            return None
+        df = df.reset_index(drop=True)
+        scales = {}
+        for name in df.columns:
+            base, tier = self.base[name], df[name]
+            if base.dtype == tier.dtype and _cells_equal(base.to_numpy(), tier.to_numpy()).all():
+                continue
+            scales[name] = fit_column(base, tier, self.numeric(name))
+        return scales if frames_identical(self.derive(scales), df) else None
+
+    def summary(self, ng):
+        """Short description of how a tier is stored, for logs"""
+        tier = self.tiers[ng]
+        if isinstance(tier, pd.DataFrame):
+            return "full sheet (not derivable)"
+        overrides = sum(len(scale.rows) for scale in tier.values())
+        factors = ', '.join(f"{name} x{scale.factor:g}" for name, scale in tier.items())
+        return f"{factors or 'identical'}; {overrides} overrides"
+
+    def stored_frames(self):
+        """The frames a snapshot has to keep: the base sheet and any underivable sheets"""
+        frames = {self.base_level: self.base}
+        frames.update((ng, tier) for ng, tier in self.tiers.items() if isinstance(tier, pd.DataFrame))
+        return frames
+
+    def scaling_tables(self):
+        """JSON-able scaling factors of the derived tiers (for the snapshot manifest)"""
+        return {
+            ng: {name: scale.to_dict() for name, scale in tier.items()}
+            for ng, tier in self.tiers.items() if not isinstance(tier, pd.DataFrame)
+        }
+
+    @classmethod
+    def from_frames(cls, frames, base_level='NG'):
+        """Replace every sheet that can be derived exactly from the base sheet"""
+        base = frames[base_level].reset_index(drop=True)
+        tiered = cls(base_level, base, {})
+        for ng, df in frames.items():
+            if ng != base_level:
+                tiered.tiers[ng] = tiered.extract_tier(df) or df
+        return tiered
+
+    @classmethod
+    def from_snapshot(cls, frames, tables, order, base_level='NG'):
+        """Rebuild from a snapshot holding the base sheet, underivable sheets and scaling tables"""
+        tiered = cls(base_level, frames[base_level], {})
+        for ng in order:
+            if ng in tables:
+                tiered.tiers[ng] = {name: ColumnScale.from_dict(data) for name, data in tables[ng].items()}
+            elif ng in frames and ng != base_level:
+                tiered.tiers[ng] = frames[ng]
+        return tiered
@@ -0,0 +1,188 @@
+"""Prewarm the AI cache through the Message Batches API.
+
+Enumerates every enemy instance and region in the dataset, submits the
+analyses that are not cached yet as message batches (same prompts as
+analyze_with_ai), and stores the results in the AI cache. Submitted batches
+are recorded in a state file, so an interrupted run picks up where it left
+off instead of paying for the same requests twice.
+
+Run from backend/ (like app.py):
+    python prewarm.py                 # everything missing
+    python prewarm.py --dry-run       # just report coverage
+    python prewarm.py --stub          # local fake client, no API calls
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+
+os.environ.setdefault('STARTUP_MODE', 'manual')  # main() loads what it needs
+import app
+
+STATE_FILE = app.CACHE_DIR / 'prewarm_state.json'
+
+def custom_id(cache_key):
+    """Batch custom_ids must match ^[a-zA-Z0-9_-]{1,64}$, so use a digest of the key"""
+    return 'k' + hashlib.sha256(cache_key.encode('utf-8')).hexdigest()[:40]
+
+def region_names(ng_levels):
+    """Distinct regions from the Location column ('Limgrave - Mistwood Outskirts' -> 'Limgrave')"""
+    regions = {}  # Ordered set: first seen first
+    for ng in ng_levels:
+        for location in app.dataset.stores[ng].locations:
+            region = app.region_of(location)
+            if region:
+                regions.setdefault(region, None)
+    return list(regions)
+
+def enumerate_analyses(ng_levels, enemies=True, regions=True):
+    """{cache_key: prompt} for every enemy instance and region (first NG level wins on shared keys)"""
+    analyses = {}
+    if enemies:
+        for ng in ng_levels:
+            store = app.dataset.stores[ng]
+            for i in range(len(store)):
+                details = store.details(i)
+                key = app.ai_cache_key(details, context="enemy")
+                if key not in analyses:
+                    analyses[key] = app.build_ai_prompt(details, context="enemy")
+    if regions:
+        for region in region_names(ng_levels):
+            avg_stats = app.calculate_region_average(region, ng_levels[0])
+            if avg_stats:
+                key = app.ai_cache_key(avg_stats, context="region")
+                analyses.setdefault(key, app.build_ai_prompt(avg_stats, context="region"))
+    return analyses
+
+def load_state(path):
+    if path.exists():
+        with open(path) as f:
+            return json.load(f)
+    return {'batches': []}
+
+def save_state(path, state):
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(state, f, indent=1)
+    os.replace(tmp, path)
+
+def submit(client, pending, batch_size, state, state_path):
+    """Submit {cache_key: prompt} in chunks, recording each batch before moving on"""
+    items = list(pending.items())
+    for start in range(0, len(items), batch_size):
+        chunk = items[start:start + batch_size]
+        batch = client.messages.batches.create(requests=[
+            {'custom_id': custom_id(key), 'params': app.ai_request_params(prompt)}
+            for key, prompt in chunk
+        ])
+        state['batches'].append({
+            'id': batch.id,
+            'keys': {custom_id(key): key for key, _ in chunk},
+            'submitted': time.time()
+        })
+        save_state(state_path, state)
+        print(f"📤 Submitted {batch.id} ({len(chunk)} requests)")
+
+def collect(client, batch_state, poll_interval):
+    """Wait for one batch to end and write its results into the AI cache; returns (stored, failed)"""
+    batch_id = batch_state['id']
+    while True:
+        batch = client.messages.batches.retrieve(batch_id)
+        counts = batch.request_counts
+        total = counts.processing + counts.succeeded + counts.errored + counts.canceled + counts.expired
+        print(f"⏳ {batch_id}: {counts.succeeded}/{total} succeeded, {counts.processing} processing, "
+              f"{counts.errored + counts.canceled + counts.expired} failed")
+        if batch.processing_status == 'ended':
+            break
+        time.sleep(poll_interval)
+
+    stored = failed = 0
+    for entry in client.messages.batches.results(batch_id):
+        key = batch_state['keys'].get(entry.custom_id)
+        if key is None:
+            continue
+        if entry.result.type == 'succeeded':
+            app.ai_cache[key] = entry.result.message.content[0].text
+            stored += 1
+        else:
+            failed += 1  # Left uncached, so it is submitted again (in this run for a resumed batch)
+    app.save_ai_cache(app.ai_cache)
+    return stored, failed
+
+def collect_all(client, state, state_path, poll_interval):
+    """Collect every batch in the state file, dropping each once stored; returns (stored, failed)"""
+    total_stored = total_failed = 0
+    for batch_state in list(state['batches']):
+        try:
+            stored, failed = collect(client, batch_state, poll_interval)
+        except Exception as e:
+            # LookupError from the stub, NotFoundError (404) from the API
+            if not isinstance(e, LookupError) and getattr(e, 'status_code', None) != 404:
+                raise
+            print(f"⚠️  {batch_state['id']} no longer exists, its requests will be resubmitted")
+            stored, failed = 0, len(batch_state['keys'])
+        total_stored += stored
+        total_failed += failed
+        state['batches'].remove(batch_state)
+        save_state(state_path, state)
+    return total_stored, total_failed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Fill the AI cache using the Message Batches API')
+    parser.add_argument('--ng', nargs='+', help='NG levels to enumerate (default: all loaded)')
+    parser.add_argument('--no-enemies', action='store_true', help='skip enemy analyses')
+    parser.add_argument('--no-regions', action='store_true', help='skip region analyses')
+    parser.add_argument('--limit', type=int, help='submit at most this many new requests')
+    parser.add_argument('--batch-size', type=int, default=1000, help='requests per batch (max 100000)')
+    parser.add_argument('--poll-interval', type=float, default=30, help='seconds between status polls')
+    parser.add_argument('--state', type=str, default=str(STATE_FILE), help='resume state file')
+    parser.add_argument('--dry-run', action='store_true', help='report coverage, submit nothing')
+    parser.add_argument('--stub', action='store_true', help='use the local stub client (no API calls)')
+    args = parser.parse_args(argv)
+
+    app.load_elden_ring_data()
+    app.ai_cache = app.load_ai_cache()
+    if not app.dataset.frames:
+        print("❌ No data loaded")
+        return 1
+
+    if args.stub:
+        from benchmarks.stub import StubAnthropic
+        client = StubAnthropic(latency=0)
+    else:
+        client = app.anthropic_client
+    state_path = app.Path(args.state)
+    state = load_state(state_path)
+
+    ng_levels = [ng.replace(' ', '+') for ng in args.ng] if args.ng else list(app.dataset.frames.keys())
+    missing = [ng for ng in ng_levels if ng not in app.dataset.stores]
+    if missing:
+        print(f"❌ Unknown NG level(s): {', '.join(missing)}")
+        return 1
+
+    analyses = enumerate_analyses(ng_levels, enemies=not args.no_enemies, regions=not args.no_regions)
+    in_flight = {key for batch in state['batches'] for key in batch['keys'].values()}
+    uncached = [key for key in analyses if app.ai_cache.get(key) is None]
+    print(f"🤖 {len(analyses)} analyses: {len(analyses) - len(uncached)} cached, {len(in_flight)} in submitted batches, "
+          f"{len(set(uncached) - in_flight)} to submit")
+    if args.dry_run:
+        return 0
+
+    # Resume batches from an interrupted run first, so what failed or expired in them is resubmitted in this run
+    total_stored, total_failed = collect_all(client, state, state_path, args.poll_interval)
+    pending = {key: analyses[key] for key in uncached if app.ai_cache.get(key) is None}
+    if args.limit is not None:
+        pending = dict(list(pending.items())[:args.limit])
+    if pending:
+        submit(client, pending, args.batch_size, state, state_path)
+        stored, failed = collect_all(client, state, state_path, args.poll_interval)
+        total_stored += stored
+        total_failed += failed
+
+    print(f"✅ Stored {total_stored} analyses ({total_failed} failed)")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,174 @@
+"""Per-client rate limiting and caps on concurrent outbound calls.
+
+Budgets are token buckets: a bucket holds up to `burst` tokens and refills
+at `rate` tokens per second; a request takes one and is refused while the
+bucket is empty, with the time until the next token as Retry-After.
+
+- MemoryBuckets: the buckets of one process.
+- SQLiteBuckets: buckets in a SQLite file, shared by every gunicorn worker
+  on the host, so a client spread over workers can't multiply its quota.
+- ThreadSlots / FileSlots: at most N calls in flight, per process or (with
+  one flock'd file per slot, released by the kernel if a worker dies) per host.
+"""
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process dev server, no cross-process locking
+    fcntl = None
+
+class RateLimited(Exception):
+    """A budget is exhausted; the app answers 429 with Retry-After"""
+
+    def __init__(self, budget, retry_after):
+        super().__init__(f"'{budget}' rate limit exceeded, retry in {retry_after:.1f}s")
+        self.budget = budget
+        self.retry_after = retry_after
+
+def _take(tokens, updated, now, rate, burst, cost):
+    """(tokens left, seconds to wait) after refilling a bucket and taking cost from it"""
+    tokens = min(burst, tokens + max(0.0, now - updated) * rate)
+    if tokens >= cost:
+        return tokens - cost, 0.0
+    return tokens, (cost - tokens) / rate
+
+class MemoryBuckets:
+    """Buckets of this process, least recently used evicted past max_clients (an evicted bucket is full anyway)"""
+
+    def __init__(self, max_clients=100000, clock=time.monotonic):
+        self.max_clients = max_clients
+        self.clock = clock
+        self._buckets = OrderedDict()  # (budget, client) -> (tokens, updated)
+        self._lock = threading.Lock()
+
+    def take(self, budget, client, rate, burst, cost=1):
+        """0 if cost tokens were taken, else the seconds until they will be available"""
+        key = (budget, client)
+        with self._lock:
+            now = self.clock()
+            tokens, updated = self._buckets.pop(key, (burst, now))
+            tokens, wait = _take(tokens, updated, now, rate, burst, cost)
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        return wait
+
+class SQLiteBuckets:
+    """Buckets in a SQLite database shared by the workers of a host (one IMMEDIATE transaction per take)"""
+
+    PRUNE_EVERY = 1000  # Takes between deletions of idle rows
+    IDLE_SECONDS = 3600  # Rows untouched this long are full buckets: dropping them changes nothing
+
+    def __init__(self, path, timeout=5):
+        self.path = str(path)
+        self.timeout = timeout
+        self._local = threading.local()
+        self._takes = 0
+        self._conn().execute(
+            'CREATE TABLE IF NOT EXISTS buckets ('
+            'budget TEXT NOT NULL, client TEXT NOT NULL, tokens REAL NOT NULL, updated REAL NOT NULL, '
+            'PRIMARY KEY (budget, client))'
+        )
+
+    def _conn(self):
+        """One connection per thread (and per process, in case we were forked)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def take(self, budget, client, rate, burst, cost=1):
+        """0 if cost tokens were taken, else the seconds until they will be available"""
+        conn = self._conn()
+        now = time.time()  # Wall clock: shared between processes
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute(
+                'SELECT tokens, updated FROM buckets WHERE budget = ? AND client = ?', (budget, client)
+            ).fetchone()
+            tokens, wait = _take(*(row or (burst, now)), now, rate, burst, cost)
+            conn.execute(
+                'INSERT OR REPLACE INTO buckets (budget, client, tokens, updated) VALUES (?, ?, ?, ?)',
+                (budget, client, tokens, now)
+            )
+        self._takes += 1
+        if self._takes % self.PRUNE_EVERY == 0:
+            conn.execute('DELETE FROM buckets WHERE updated < ?', (now - self.IDLE_SECONDS,))
+        return wait
+
+class RateLimiter:
+    """Named budgets over one bucket store"""
+
+    def __init__(self, buckets, budgets):
+        self.buckets = buckets
+        self.budgets = dict(budgets)  # name -> (tokens per second, burst); a rate of 0 disables it
+
+    def check(self, budget, client, cost=1):
+        """Take from a client's budget, or raise RateLimited"""
+        rate, burst = self.budgets.get(budget, (0, 0))
+        if rate <= 0:
+            return
+        wait = self.buckets.take(budget, client, rate, burst, cost)
+        if wait:
+            raise RateLimited(budget, wait)
+
+class ThreadSlots:
+    """At most size concurrent holders in this process"""
+
+    def __init__(self, size):
+        self.size = size
+        self._semaphore = threading.BoundedSemaphore(size)
+
+    @contextmanager
+    def hold(self, timeout=None):
+        """Yield True with a slot held, or False if none freed up within timeout seconds"""
+        acquired = self._semaphore.acquire(timeout=timeout)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                self._semaphore.release()
+
+class FileSlots:
+    """At most size concurrent holders on this host: one exclusive flock per slot file"""
+
+    POLL_SECONDS = 0.05
+
+    def __init__(self, directory, size, name='slot'):
+        self.size = size
+        self.paths = [Path(directory) / f'{name}-{i}.lock' for i in range(size)]
+
+    def _try_acquire(self):
+        for path in self.paths:
+            f = open(path, 'a')
+            try:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return f
+            except BlockingIOError:
+                f.close()
+        return None
+
+    @contextmanager
+    def hold(self, timeout=None):
+        """Yield True with a slot held, or False if none freed up within timeout seconds"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        f = self._try_acquire()
+        while f is None and (deadline is None or time.monotonic() < deadline):
+            time.sleep(self.POLL_SECONDS)
+            f = self._try_acquire()
+        try:
+            yield f is not None
+        finally:
+            if f is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                f.close()
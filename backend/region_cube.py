@@ -0,0 +1,60 @@
+"""Precomputed per-location aggregates, merged per region query"""
+import numpy as np
+
+class RegionCube:
+    """Partial sums, counts, minima and maxima of numeric columns per distinct location.
+
+    Groups are the distinct (lowercased) values of a location NgramIndex, so a
+    region query ('caelid') resolves to the locations containing it and the
+    answer is a merge of their partials: the cost depends on the number of
+    matching locations, not on the number of enemies.
+    """
+
+    def __init__(self, columns, location_index):
+        """columns: {name: float array} with NaN for cells that do not count"""
+        self.index = location_index
+        self.names = list(columns)
+        self.positions = {name: i for i, name in enumerate(self.names)}
+        self.rows = [np.asarray(rows, dtype=np.int64) for rows in location_index.rows]
+        groups = len(self.rows)
+
+        group = np.full(len(next(iter(columns.values()))) if columns else 0, -1, dtype=np.int64)
+        for key_id, rows in enumerate(self.rows):
+            group[rows] = key_id
+        grouped = group >= 0
+        group = group[grouped]
+
+        self.values = np.column_stack([columns[name] for name in self.names]) if columns else np.zeros((0, 0))
+        self.sizes = np.bincount(group, minlength=groups)
+        self.sums = np.zeros((groups, len(self.names)))
+        self.counts = np.zeros((groups, len(self.names)), dtype=np.int64)
+        self.mins = np.full((groups, len(self.names)), np.inf)
+        self.maxs = np.full((groups, len(self.names)), -np.inf)
+        for j in range(len(self.names)):
+            column = self.values[grouped, j]
+            valid = ~np.isnan(column)
+            self.sums[:, j] = np.bincount(group[valid], weights=column[valid], minlength=groups)
+            self.counts[:, j] = np.bincount(group[valid], minlength=groups)
+            np.minimum.at(self.mins[:, j], group[valid], column[valid])
+            np.maximum.at(self.maxs[:, j], group[valid], column[valid])
+
+    def match(self, region):
+        """Group ids of the locations containing region (case-insensitive)"""
+        return np.asarray(sorted(self.index.match(region)), dtype=np.int64)
+
+    def size(self, groups):
+        return int(self.sizes[groups].sum())
+
+    def mean(self, name, groups):
+        """Mean over the valid cells of the merged groups (np.float64), None if there are none"""
+        j = self.positions[name]
+        count = self.counts[groups, j].sum()
+        return np.float64(self.sums[groups, j].sum() / count) if count else None
+
+    def spread(self, name, groups):
+        """(min, max, median) over the valid cells of the merged groups, None if there are none"""
+        j = self.positions[name]
+        if not self.counts[groups, j].sum():
+            return None
+        column = self.values[np.concatenate([self.rows[g] for g in groups]), j]
+        return self.mins[groups, j].min(), self.maxs[groups, j].max(), np.nanmedian(column)
@@ -0,0 +1,175 @@
+"""Prebuilt indexes over names and locations: n-gram substring search and trigram fuzzy matching"""
+import re
+
+import numpy as np
+
+def _grams(text, n):
+    """All distinct substrings of length 1..n"""
+    grams = set()
+    for size in range(1, n + 1):
+        for i in range(len(text) - size + 1):
+            grams.add(text[i:i + size])
+    return grams
+
+def _is_word_start(text, pos):
+    return pos == 0 or not text[pos - 1].isalnum()
+
+class NgramIndex:
+    """Inverted n-gram index over one column of strings.
+
+    Distinct values are indexed once (lowercased) and map back to every row
+    that holds them, so repeated names cost nothing extra. A query is answered
+    by intersecting the posting lists of its grams and verifying the survivors,
+    instead of scanning every row.
+    """
+
+    def __init__(self, values, n=3):
+        self.n = n
+        self.keys = []      # distinct lowercased values
+        self.rows = []      # row indexes for each key, in row order
+        self.postings = {}  # gram -> key ids (ascending)
+
+        key_ids = {}
+        for row, value in enumerate(values):
+            # Non-string cells (NaN) never match, same as str.contains(na=False)
+            if not isinstance(value, str):
+                continue
+            key = value.lower()
+            key_id = key_ids.get(key)
+            if key_id is None:
+                key_id = key_ids[key] = len(self.keys)
+                self.keys.append(key)
+                self.rows.append([])
+                for gram in _grams(key, n):
+                    self.postings.setdefault(gram, []).append(key_id)
+            self.rows[key_id].append(row)
+
+    def _candidates(self, query):
+        """Key ids whose grams cover every gram of the query"""
+        size = min(self.n, len(query))
+        grams = {query[i:i + size] for i in range(len(query) - size + 1)}
+
+        lists = []
+        for gram in grams:
+            posting = self.postings.get(gram)
+            if not posting:
+                return []
+            lists.append(posting)
+
+        lists.sort(key=len)
+        candidates = set(lists[0])
+        for posting in lists[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                break
+        return candidates
+
+    def _rank(self, key_id, query):
+        """Sort key: exact, then prefix, then word prefix, then any substring"""
+        key = self.keys[key_id]
+        pos = key.find(query)
+        if key == query:
+            tier = 0
+        elif pos == 0:
+            tier = 1
+        else:
+            tier = 3
+            at = pos
+            while at != -1:
+                if _is_word_start(key, at):
+                    tier = 2
+                    break
+                at = key.find(query, at + 1)
+        return (tier, pos, len(key), key_id)
+
+    def match(self, query):
+        """Key ids whose value contains query (case-insensitive), unordered"""
+        query = query.lower()
+        if not query:
+            return []
+        return [key_id for key_id in self._candidates(query) if query in self.keys[key_id]]
+
+    def search(self, query, limit=None):
+        """Row indexes whose value contains query (case-insensitive), best matches first"""
+        query = query.lower()
+        matches = self.match(query)
+        matches.sort(key=lambda key_id: self._rank(key_id, query))
+
+        results = []
+        for key_id in matches:
+            results.extend(self.rows[key_id])
+            if limit is not None and len(results) >= limit:
+                return results[:limit]
+        return results
+
+def _normalize(text):
+    """Lowercase words without punctuation ("Maliketh, the Black Blade" -> 'maliketh the black blade')"""
+    return ' '.join(re.findall(r'[a-z0-9]+', text.lower().replace("'", '')))
+
+def _trigrams(text):
+    """Distinct trigrams of each word, padded with spaces so word starts and ends count"""
+    grams = set()
+    for word in text.split():
+        padded = f' {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+class FuzzyIndex:
+    """Trigram similarity index for typo-tolerant lookup ('Falingstar' -> 'Fallingstar Beast').
+
+    Every distinct (normalized) string is reduced to the set of trigrams of
+    its words. A query shares trigrams with its candidates; one np.bincount
+    over the posting arrays of the query's trigrams counts them for every
+    string at once. The score averages the Dice coefficient (how alike the
+    whole strings are) with the share of the query's trigrams found (so a
+    query still being typed ranks the names it is the start of).
+    """
+
+    def __init__(self, entries, min_score=0.35):
+        """entries: (text, kind) pairs; the first spelling of each normalized text per kind is kept"""
+        self.min_score = min_score
+        self.texts = []
+        self.kinds = []
+        ids = {}
+        postings = {}
+        sizes = []
+        for text, kind in entries:
+            if not isinstance(text, str):
+                continue
+            key = (_normalize(text), kind)
+            if not key[0] or key in ids:
+                continue
+            text_id = ids[key] = len(self.texts)
+            self.texts.append(text)
+            self.kinds.append(kind)
+            grams = _trigrams(key[0])
+            sizes.append(len(grams))
+            for gram in grams:
+                postings.setdefault(gram, []).append(text_id)
+        self.sizes = np.array(sizes, dtype=np.float64)
+        self.postings = {gram: np.array(text_ids, dtype=np.int32) for gram, text_ids in postings.items()}
+        kinds = np.array(self.kinds, dtype=object)
+        self.masks = {kind: kinds == kind for kind in set(self.kinds)}
+
+    def __len__(self):
+        return len(self.texts)
+
+    def search(self, query, limit=5, kinds=None, min_score=None):
+        """[(text, kind, score)] best first, for scores of at least min_score (0..1)"""
+        grams = _trigrams(_normalize(query))
+        hits = [self.postings[gram] for gram in grams if gram in self.postings]
+        if not hits:
+            return []
+
+        shared = np.bincount(np.concatenate(hits), minlength=len(self.texts))
+        scores = (2 * shared / (len(grams) + self.sizes) + shared / len(grams)) / 2
+        if kinds is not None:
+            allowed = np.zeros(len(self.texts), dtype=bool)
+            for kind in kinds:
+                allowed |= self.masks.get(kind, False)
+            scores[~allowed] = 0
+
+        threshold = self.min_score if min_score is None else min_score
+        candidates = np.flatnonzero(scores >= threshold)
+        best = candidates[np.lexsort((candidates, -scores[candidates]))][:limit]  # Ties: first indexed wins
+        return [(self.texts[i], self.kinds[i], round(float(scores[i]), 3)) for i in best]
@@ -0,0 +1,147 @@
+"""Column schema of the enemy sheets, how they are read and the vectorized pass that normalizes them.
+
+read_sheet() parses one sheet of the workbook with its header row found.
+normalize_sheet() turns a raw sheet (every cell an object, as parsed) into
+typed float columns in one pass over the schema below. Sentinel cells do not
+survive as text: 'Immune' resistances and '∞' poise become explicit boolean
+mask columns next to the value column, and '-' / blank / text cells get the
+column's default.
+"""
+import numpy as np
+import pandas as pd
+
+SCHEMA_VERSION = 1  # Bump when the normalized layout changes (invalidates snapshots)
+
+# Sheet column -> value for blank, '-' or non-numeric cells
+NUMERIC_COLUMNS = {
+    # Defense (H-O)
+    'Phys': 0, 'Strike': 0, 'Slash': 0, 'Pierce': 0, 'Magic': 0, 'Fire': 0, 'Ltng': 0, 'Holy': 0,
+    # Damage negation (Q-X): same headers as defense, so they get read_excel's '.1' suffix
+    'Phys.1': 0, 'Strike.1': 0, 'Slash.1': 0, 'Pierce.1': 0, 'Magic.1': 0, 'Fire.1': 0, 'Ltng.1': 0, 'Holy.1': 0,
+    # Poise
+    'Base': 0, 'Effective': 0, 'Regen Delay': 0,
+    # Status multipliers
+    'Bleed.1': 0, 'Frost.1': 0, 'HP Burn Effect': 0,
+    'Weak Part': 0
+}
+
+# Status resistances: 'Immune' -> NaN + '<column> Immune' mask, other text -> NaN
+RESISTANCE_COLUMNS = ['Poison', 'Scarlet Rot', 'Bleed', 'Frost', 'Sleep', 'Madness', 'Deathblight']
+
+# Columns where '∞' / 'inf' means unbreakable: value 0 + '<column> Infinite' mask
+INFINITE_COLUMNS = ['Effective']
+
+def immune_column(column):
+    return f"{column} Immune"
+
+def infinite_column(column):
+    return f"{column} Infinite"
+
+# Text cells that are never numbers (lowercased); other text still goes through to_numeric ('300')
+SENTINELS = {'', '-', 'immune', '∞', 'inf'}
+
+def _parse(series):
+    """(floats, lowercased text) of a raw column: NaN for text cells, text None for the rest.
+
+    to_numeric(errors='coerce') is slow on mixed columns (every text cell
+    raises internally), so sentinel text is split off first and only the
+    numbers are converted.
+    """
+    n = len(series)
+    if pd.api.types.infer_dtype(series, skipna=True) in ('integer', 'floating', 'mixed-integer-float', 'empty'):
+        return pd.to_numeric(series, errors='coerce').to_numpy(dtype=np.float64), np.full(n, None, dtype=object)
+
+    values = series.to_numpy(dtype=object)
+    is_text = np.fromiter((isinstance(v, str) for v in values), dtype=bool, count=n)
+    text = np.full(n, None, dtype=object)
+    text[is_text] = [v.lower() for v in values[is_text]]
+
+    numbers = values.copy()
+    numbers[is_text] = np.nan
+    floats = pd.to_numeric(pd.Series(numbers), errors='coerce').to_numpy(dtype=np.float64)
+
+    spelled = is_text & ~np.isin(text, list(SENTINELS))
+    if spelled.any():
+        floats[spelled] = pd.to_numeric(pd.Series(values[spelled]), errors='coerce').to_numpy(dtype=np.float64)
+    return floats, text
+
+def _hp(df):
+    """dlcClear when it holds something other than '-', else Health (unparseable -> 0)"""
+    n = len(df)
+    health = _parse(df['Health'])[0] if 'Health' in df.columns else np.full(n, np.nan)
+    if 'dlcClear' not in df.columns:
+        return np.nan_to_num(health, nan=0.0)
+    dlc, dlc_text = _parse(df['dlcClear'])
+    use_dlc = df['dlcClear'].notna().to_numpy() & (dlc_text != '-')
+    return np.nan_to_num(np.where(use_dlc, dlc, health), nan=0.0)
+
+def normalize_sheet(df):
+    """Typed copy of a raw sheet: numeric columns, HP, ID and sentinel masks"""
+    # Drop rows without a name or placeholder rows
+    df = df[df['Name'].notna() & (df['Name'] != '???')].reset_index(drop=True)
+
+    columns = {name: df[name] for name in df.columns}
+    masks = {}
+
+    for name, default in NUMERIC_COLUMNS.items():
+        if name not in columns:
+            continue
+        values, text = _parse(df[name])
+        if name in INFINITE_COLUMNS:
+            infinite = np.isin(text, ['∞', 'inf']) | np.isinf(values)
+            values[infinite] = np.nan
+            masks[infinite_column(name)] = infinite
+        columns[name] = pd.Series(np.nan_to_num(values, nan=default), index=df.index)
+
+    for name in RESISTANCE_COLUMNS:
+        if name not in columns:
+            continue
+        values, text = _parse(df[name])
+        masks[immune_column(name)] = text == 'immune'
+        columns[name] = pd.Series(values, index=df.index)
+
+    columns['HP'] = pd.Series(_hp(df), index=df.index)
+
+    # Ensure ID exists
+    if 'ID' not in columns:
+        columns['ID'] = pd.Series(np.arange(1, len(df) + 1), index=df.index)
+
+    for name, mask in masks.items():
+        columns[name] = pd.Series(mask, index=df.index, dtype=bool)
+    return pd.DataFrame(columns, index=df.index)
+
+def _dedupe_columns(names):
+    """Name duplicate headers the way read_excel does ('Phys', 'Phys' -> 'Phys', 'Phys.1')"""
+    seen = {}
+    result = []
+    for name in names:
+        count = seen.get(name, 0)
+        unique = name if count == 0 else f"{name}.{count}"
+        while unique in seen:
+            count += 1
+            unique = f"{name}.{count}"
+        seen[name] = count + 1
+        seen.setdefault(unique, 1)
+        result.append(unique)
+    return result
+
+def read_sheet(workbook, ng):
+    """Parse one sheet once and find its header row in memory (instead of re-reading per guess)"""
+    raw = workbook.parse(sheet_name=ng, header=None, dtype=object)
+
+    # Try header rows 0,1,2 to handle files where column names start on row 2
+    for header_row in (1, 0, 2):  # Try 1 first (most common)
+        if header_row >= len(raw):
+            continue
+        names = [
+            f"Unnamed: {i}" if pd.isna(value) else value
+            for i, value in enumerate(raw.iloc[header_row])
+        ]
+        columns = [str(c).strip() for c in _dedupe_columns(names)]
+        if 'Name' in columns:
+            if header_row != 0:
+                print(f"   {ng}: Using header row {header_row}")
+            df = raw.iloc[header_row + 1:].reset_index(drop=True)
+            df.columns = columns
+            return df
+    return None
@@ -0,0 +1,164 @@
+"""Typed columnar snapshot of the Excel dataset.
+
+The compiled snapshot is one flat binary file of arrays plus a manifest:
+
+    snapshot/manifest.json       source hash, sheets, column kinds, array offsets
+    snapshot/<generation>.bin    every column array, 64-byte aligned
+
+The .bin file is memory-mapped once and each array is a zero-copy view into
+it; numeric columns are stored as-is. Object columns
+(names, locations, resistances mixing numbers with 'Immune', ...) are split
+into a float array, an index into a per-column string table, and an int flag,
+so they round-trip to the same Python values the Excel loader produced. The
+manifest is replaced last and atomically, so readers never see a half-written
+snapshot; a source hash or layout mismatch marks it stale. The manifest can
+carry extra JSON next to the arrays (the NG+ scaling tables, see ng_scaling.py).
+"""
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+FORMAT_VERSION = 1
+MANIFEST = 'manifest.json'
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _encode_object_column(values):
+    """Split an object column into (floats, string codes, string table, all-ints flag)"""
+    n = len(values)
+    floats = np.full(n, np.nan, dtype=np.float64)
+    codes = np.full(n, -1, dtype=np.int32)
+    table = {}
+    all_ints = True
+    for i, value in enumerate(values):
+        if isinstance(value, str):
+            codes[i] = table.setdefault(value, len(table))
+        elif isinstance(value, (int, float, np.integer, np.floating)) and not pd.isna(value):
+            floats[i] = value
+            all_ints = all_ints and isinstance(value, (int, np.integer))
+        elif value is not None and not pd.isna(value):
+            codes[i] = table.setdefault(str(value), len(table))  # Dates etc. survive as text
+    strings = np.array(list(table), dtype=str) if table else np.array([], dtype='U1')
+    return floats, codes, strings, all_ints
+
+def _decode_object_column(floats, codes, strings, all_ints):
+    out = floats.astype(object)
+    numeric = ~np.isnan(floats)
+    if all_ints and numeric.any():
+        out[numeric] = floats[numeric].astype(np.int64).astype(object)
+    has_text = codes >= 0
+    if has_text.any():
+        out[has_text] = strings[codes[has_text]].astype(object)
+    return out
+
+class _BlobWriter:
+    """Appends arrays to one file and records where each one lives"""
+    ALIGN = 64
+
+    def __init__(self, f):
+        self.f = f
+        self.offset = 0
+
+    def add(self, array):
+        array = np.ascontiguousarray(array)
+        padding = -self.offset % self.ALIGN
+        self.f.write(b'\0' * padding)
+        self.offset += padding
+        entry = {'offset': self.offset, 'dtype': array.dtype.str, 'shape': list(array.shape)}
+        self.f.write(array.tobytes())
+        self.offset += array.nbytes
+        return entry
+
+def write_snapshot(frames, directory, source_hash, layout='sheets', extra=None):
+    """Compile {sheet: DataFrame} (plus JSON-able extra data) into a snapshot directory"""
+    directory.mkdir(parents=True, exist_ok=True)
+    generation = f"{(source_hash or 'nosource')[:16]}-{int(time.time() * 1000)}"
+
+    sheets = {}
+    with open(directory / f"{generation}.bin", 'wb') as f:
+        blob = _BlobWriter(f)
+        for sheet, df in frames.items():
+            columns = []
+            for name in df.columns:
+                series = df[name]
+                if series.dtype.kind in 'fiub':
+                    columns.append({'name': name, 'kind': 'numeric', 'values': blob.add(series.to_numpy())})
+                else:
+                    floats, codes, strings, all_ints = _encode_object_column(series.tolist())
+                    columns.append({
+                        'name': name, 'kind': 'object', 'ints': all_ints,
+                        'floats': blob.add(floats), 'codes': blob.add(codes), 'strings': blob.add(strings)
+                    })
+            sheets[sheet] = {'rows': len(df), 'columns': columns}
+        f.flush()
+        os.fsync(f.fileno())
+
+    manifest = {
+        'format': FORMAT_VERSION,
+        'source_sha256': source_hash,
+        'generation': generation,
+        'created': time.time(),
+        'layout': layout,
+        'sheets': sheets,
+        'extra': extra
+    }
+    tmp = directory / (MANIFEST + '.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f)
+    os.replace(tmp, directory / MANIFEST)
+
+    # Older generations are garbage now (mmaps in other processes keep working on POSIX)
+    for entry in directory.glob('*.bin'):
+        if entry.stem != generation:
+            try:
+                entry.unlink()
+            except OSError:
+                pass
+    return manifest
+
+def read_manifest(directory):
+    try:
+        with open(directory / MANIFEST) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get('format') == FORMAT_VERSION else None
+
+def read_snapshot(directory, source_hash=None, layout='sheets'):
+    """Load ({sheet: DataFrame}, manifest), or None if missing, built from a different source file or layout"""
+    manifest = read_manifest(directory)
+    if manifest is None:
+        return None
+    if source_hash is not None and manifest['source_sha256'] != source_hash:
+        return None
+    if manifest.get('layout', 'sheets') != layout:
+        return None
+
+    path = directory / f"{manifest['generation']}.bin"
+    blob = np.memmap(path, dtype=np.uint8, mode='r') if path.stat().st_size else np.zeros(0, dtype=np.uint8)
+
+    def view(entry):
+        return np.ndarray(tuple(entry['shape']), dtype=np.dtype(entry['dtype']), buffer=blob, offset=entry['offset'])
+
+    frames = {}
+    for sheet, meta in manifest['sheets'].items():
+        data = {}
+        for column in meta['columns']:
+            if column['kind'] == 'numeric':
+                data[column['name']] = view(column['values'])
+            else:
+                data[column['name']] = _decode_object_column(
+                    view(column['floats']), view(column['codes']), view(column['strings']), column['ints']
+                )
+        # copy=False keeps numeric columns as views of the shared mapping (one copy per host, not per worker)
+        frames[sheet] = pd.DataFrame(data, columns=[c['name'] for c in meta['columns']], copy=False)
+    return frames, manifest
@@ -0,0 +1,7 @@
+"""Make the backend modules importable as the app imports them (flat, from backend/)"""
+import os
+import sys
+from pathlib import Path
+
+os.environ.setdefault('STARTUP_MODE', 'manual')  # Importing app must not load data/ or open the AI store
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,52 @@
+"""Derived NG+ tiers must be exactly the sheets they replace, from Excel and from a snapshot"""
+import pandas as pd
+import pytest
+from openpyxl import load_workbook
+
+from benchmarks.synthetic import HEADER, TIER_HP_SCALING, write_workbook
+from ng_scaling import TieredFrames, frames_identical
+from sheet_schema import normalize_sheet, read_sheet
+from snapshot import read_snapshot, write_snapshot
+
+PERTURBED = 'NG+3'
+PERTURBED_ROWS = (4, 17)  # Enemies whose Health breaks the tier's scaling rule
+HEALTH = HEADER.index('Health')
+
+@pytest.fixture(scope='module')
+def sheets(tmp_path_factory):
+    """{ng: normalized DataFrame} of a synthetic workbook with a few hand-edited NG+3 cells"""
+    path = write_workbook(tmp_path_factory.mktemp('workbook') / 'elden_ring_data.xlsx', rows=120)
+    workbook = load_workbook(path)
+    for row in PERTURBED_ROWS:
+        cell = workbook[PERTURBED].cell(row=row + 3, column=HEALTH + 1)  # Title and header rows come first
+        cell.value += 7
+    workbook.save(path)
+
+    excel = pd.ExcelFile(path)
+    return {ng: normalize_sheet(read_sheet(excel, ng)) for ng in TIER_HP_SCALING}
+
+def assert_tiers_match(frames, sheets):
+    assert list(frames) == list(sheets)
+    for ng, df in sheets.items():
+        assert frames_identical(frames[ng], df.reset_index(drop=True)), ng
+
+def test_every_tier_is_derived(sheets):
+    frames = TieredFrames.from_frames(sheets)
+    assert all(isinstance(tier, dict) for tier in frames.tiers.values())
+    assert list(frames.stored_frames()) == ['NG']
+    assert_tiers_match(frames, sheets)
+
+def test_perturbed_cells_are_overrides(sheets):
+    scale = TieredFrames.from_frames(sheets).tiers[PERTURBED]['Health']
+    assert scale.factor == TIER_HP_SCALING[PERTURBED]
+    assert scale.rows.tolist() == list(PERTURBED_ROWS)
+    assert scale.values == [int(sheets[PERTURBED]['Health'].iloc[row]) for row in PERTURBED_ROWS]
+
+def test_snapshot_round_trip(sheets, tmp_path):
+    tiered = TieredFrames.from_frames(sheets)
+    write_snapshot(tiered.stored_frames(), tmp_path, 'source', layout='tiers', extra=tiered.scaling_tables())
+    frames, manifest = read_snapshot(tmp_path, 'source', layout='tiers')
+
+    restored = TieredFrames.from_snapshot(frames, manifest['extra'], list(sheets))
+    assert restored.tiers[PERTURBED]['Health'].rows.tolist() == list(PERTURBED_ROWS)
+    assert_tiers_match(restored, sheets)
@@ -9,6 +9,7 @@ export default function EldenRingHelper() {
   const [ngLevel, setNgLevel] = useState('NG');
   const [currentView, setCurrentView] = useState('landing');
   const [searchResults, setSearchResults] = useState([]);
+  const [suggestions, setSuggestions] = useState([]);
   const [enemyData, setEnemyData] = useState(null);
   const [regionData, setRegionData] = useState(null);
   const [loading, setLoading] = useState(false);
@@ -34,6 +35,28 @@ export default function EldenRingHelper() {
     }
   };
 
+  // Stats arrive immediately; poll for the AI strategy while it is generated
+  // ('fallback' is a rule-based strategy shown until Claude's arrives)
+  const pollStrategy = async (data) => {
+    let status = data.ai_status;
+    while (status === 'pending' || status === 'fallback') {
+      try {
+        const response = await fetch(`${API_URL}/api/ai/status?key=${encodeURIComponent(data.ai_key)}&wait=20`);
+        const result = await response.json();
+        status = result.status;
+        if (status !== 'pending') {
+          setEnemyData(prev => (prev && prev.ai_key === data.ai_key)
+            ? { ...prev, ai_strategy: result.strategy, ai_status: status }
+            : prev);
+          fetchCacheStats();
+        }
+      } catch (error) {
+        console.error('Error polling AI strategy:', error);
+        return;
+      }
+    }
+  };
+
   const handleSearch = async () => {
   if (!searchQuery.trim()) return;
   setLoading(true);
@@ -55,20 +78,15 @@ export default function EldenRingHelper() {
       
       setSearchResults(uniqueEnemies);
       setCurrentView('search-results');
+    } else if (data.region_matches > 0) {
+      // Valid region with enemies (the search already checked the locations)
+      setRegionData({ name: searchQuery });
+      setCurrentView('region-choice');
     } else {
-      // Check if it's actually a valid region by trying to fetch region data
-      const regionResponse = await fetch(`${API_URL}/api/region/${encodeURIComponent(searchQuery)}/enemies?ng=${encodeURIComponent(ngLevel)}`);
-      const regionData = await regionResponse.json();
-      
-      if (regionData.enemies && regionData.enemies.length > 0) {
-        // Valid region with enemies
-        setRegionData({ name: searchQuery });
-        setCurrentView('region-choice');
-      } else {
-        // No enemies found and not a valid region - show error
-        setSearchResults([]);
-        setCurrentView('no-results');
-      }
+      // No enemies found and not a valid region - show error and close matches
+      setSearchResults([]);
+      setSuggestions(data.did_you_mean || []);
+      setCurrentView('no-results');
     }
   } catch (error) {
     console.error('Search error:', error);
@@ -87,6 +105,7 @@ export default function EldenRingHelper() {
     setEnemyData(data);
     setCurrentView('enemy');
     fetchCacheStats();
+    pollStrategy(data);
   } catch (error) {
     console.error('Error fetching enemy:', error);
   } finally {
@@ -100,6 +119,7 @@ export default function EldenRingHelper() {
       const response = await fetch(`${API_URL}/api/enemy/${encodeURIComponent(enemyData.name)}?ng=${encodeURIComponent(ngLevel)}&location=${encodeURIComponent(location)}`);
       const data = await response.json();
       setEnemyData({...data, all_instances: enemyData.all_instances || data.all_instances});
+      pollStrategy(data);
     } catch (error) {
       console.error('Error:', error);
     } finally {
@@ -120,10 +140,13 @@ export default function EldenRingHelper() {
   resistances: data.avg_resistances,  // ← Changed from hardcoded values
   poise: data.avg_poise,  // ← Now includes all poise data
   ai_strategy: data.ai_strategy,
+  ai_status: data.ai_status,
+  ai_key: data.ai_key,
   all_instances: []
 };
       setEnemyData(regionAsEnemy);
       setCurrentView('enemy');
+      pollStrategy(data);
     } catch (error) {
       console.error('Error:', error);
     } finally {
@@ -134,9 +157,10 @@ export default function EldenRingHelper() {
   const handleRegionEnemies = async () => {
     setLoading(true);
     try {
-      const response = await fetch(`${API_URL}/api/region/${encodeURIComponent(regionData.name)}/enemies?ng=${encodeURIComponent(ngLevel)}`);
+      // One bulk call: full details plus any already-cached strategies for every enemy
+      const response = await fetch(`${API_URL}/api/enemies/bulk?region=${encodeURIComponent(regionData.name)}&ng=${encodeURIComponent(ngLevel)}&ai=cached`);
       const data = await response.json();
-      setRegionData({ ...regionData, enemies: data.enemies });
+      setRegionData({ ...regionData, enemies: data.results });
       setCurrentView('region-enemies');
     } catch (error) {
       console.error('Error:', error);
@@ -219,6 +243,29 @@ export default function EldenRingHelper() {
         <p className="text-gray-400 text-lg">
           No enemies or regions found matching "<span className="text-amber-400">{searchQuery}</span>"
         </p>
+        {suggestions.length > 0 && (
+          <div className="mt-8">
+            <p className="text-gray-400 mb-4">Did you mean:</p>
+            <div className="flex flex-wrap justify-center gap-3">
+              {suggestions.map((suggestion, idx) => (
+                <button
+                  key={idx}
+                  onClick={() => {
+                    if (suggestion.kind === 'name') {
+                      handleEnemySelect(suggestion.text);
+                    } else {
+                      setRegionData({ name: suggestion.text });
+                      setCurrentView('region-choice');
+                    }
+                  }}
+                  className="px-4 py-2 bg-gray-800 border border-amber-500/30 rounded-lg hover:border-amber-500 transition-all text-amber-400"
+                >
+                  {suggestion.text}
+                </button>
+              ))}
+            </div>
+          </div>
+        )}
       </div>
     </div>
   );
@@ -477,6 +524,12 @@ export default function EldenRingHelper() {
   <button
     key={idx}
     onClick={async () => {
+      // Details and strategy already came with the region list
+      if (enemy.ai_status === 'ready') {
+        setEnemyData(enemy);
+        setCurrentView('enemy');
+        return;
+      }
       setLoading(true);
       try {
         const response = await fetch(`${API_URL}/api/enemy/${encodeURIComponent(enemy.name)}?ng=${encodeURIComponent(ngLevel)}&location=${encodeURIComponent(enemy.location)}`);
@@ -484,6 +537,7 @@ export default function EldenRingHelper() {
         setEnemyData(data);
         setCurrentView('enemy');
         fetchCacheStats();
+        pollStrategy(data);
       } catch (error) {
         console.error('Error:', error);
       } finally {
@@ -586,7 +640,9 @@ export default function EldenRingHelper() {
             <div className="bg-gray-800/70 backdrop-blur border border-amber-500/20 rounded-lg p-6">
               <div 
                 className="text-gray-300 text-sm leading-relaxed"
-                dangerouslySetInnerHTML={{ __html: formatAIText(enemyData.ai_strategy) }}
+                dangerouslySetInnerHTML={{ __html: enemyData.ai_status === 'pending'
+                  ? '<em>Generating strategy...</em>'
+                  : formatAIText(enemyData.ai_strategy) }}
               />
             </div>
           </div>